@@ -0,0 +1,11 @@
+"""
+Benchmarks for the YOLO plugin.
+
+The standalone scripts each compare the alternatives for a single optimisation
+(python benchmarks/<script>.py). The suite times the plugin's components on a
+dataset from the deterministic generator, writing the results as JSON to compare
+against a stored baseline:
+
+    python -m benchmarks.generate PATH [options]
+    python -m benchmarks.suite [--output FILE] [--baseline FILE] [options]
+"""
@@ -0,0 +1,63 @@
+"""
+Times opening a split written with to-yolo-od --columnar (memory-mapping
+its columns) and the peak memory allocated doing so, then the time to slice
+the annotations of every image from the mapped columns.
+
+Usage: python benchmarks/columnar_open.py [--dir PATH] [--boxes N] [--boxes-per-image N]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from wai.annotations.yolo.od import YOLOObjectTable
+from wai.annotations.yolo.od.util import COLUMNAR_FILES_FILENAME, ColumnarDataset, ColumnarWriter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=None, help="directory to create the fixture in")
+    parser.add_argument("--boxes", type=int, default=10_000_000)
+    parser.add_argument("--boxes-per-image", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    root = tempfile.mkdtemp(prefix="columnar-open-", dir=args.dir)
+    try:
+        # Write the split an image at a time, as YOLOODWriter does
+        num_images = args.boxes // args.boxes_per_image
+        table = YOLOObjectTable(
+            rng.integers(0, 80, args.boxes_per_image),
+            rng.random((args.boxes_per_image, 4)),
+            np.zeros(args.boxes_per_image + 1, dtype=np.int64),
+            np.empty((0, 2))
+        )
+        start = time.perf_counter()
+        writer = ColumnarWriter(root)
+        for image_id in range(num_images):
+            writer.append(f"{image_id:08d}.jpg", (1920, 1080), table)
+        writer.close()
+        print(f"{num_images} images x {args.boxes_per_image} boxes written in {time.perf_counter() - start:.1f}s")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        dataset = ColumnarDataset(f"{root}/{COLUMNAR_FILES_FILENAME}")
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"open: {elapsed * 1000:.2f} ms, {peak / 1024:.0f} KB allocated")
+
+        start = time.perf_counter()
+        num_boxes = sum(len(objects) for _, _, objects in dataset)
+        elapsed = time.perf_counter() - start
+        print(f"iterate: {num_boxes} boxes in {elapsed:.2f}s ({num_images / elapsed:.0f} images/s)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Times converting the annotations of synthetic images between YOLO and
+located objects, per-object (FromYOLOOD.to_located_object, and to_yolo_object
+below, which ToYOLOOD used to convert with) against per-image vectorised
+conversion (yolo_to_located_objects and located_objects_to_yolo).
+
+Usage: python benchmarks/coordinate_conversion.py [--sizes N [N ...]] [--vertices N] [--repeat N]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from typing import Dict
+
+from wai.annotations.domain.image.object_detection.util import get_object_label
+from wai.common.adams.imaging.locateobjects import LocatedObject
+
+from wai.annotations.yolo.od import YOLOObject, YOLOObjectTable
+from wai.annotations.yolo.od.component import FromYOLOOD
+from wai.annotations.yolo.od.util import located_objects_to_yolo, yolo_to_located_objects
+
+IMAGE_WIDTH, IMAGE_HEIGHT = 1920, 1080
+LABELS = ["person", "bicycle", "car", "dog"]
+
+
+def make_objects(rng: random.Random, num_objects: int, num_vertices: int):
+    objects = []
+    for index in range(num_objects):
+        if num_vertices == 0 or index % 2 == 0:
+            objects.append(YOLOObject(rng.randrange(len(LABELS)), rng.random(), rng.random(), rng.random(), rng.random()))
+        else:
+            px = [rng.random() for _ in range(num_vertices)]
+            py = [rng.random() for _ in range(num_vertices)]
+            width, height = max(px) - min(px), max(py) - min(py)
+            objects.append(
+                YOLOObject(rng.randrange(len(LABELS)), min(px) + width / 2, min(py) + height / 2, width, height, px, py)
+            )
+    return objects
+
+
+def get_class_index(labels: Dict[str, int], label: str) -> int:
+    # Appends unknown labels, as ToYOLOOD does by default
+    return labels.setdefault(label, len(labels))
+
+
+def to_yolo_object(
+        located_object: LocatedObject,
+        class_index: int,
+        image_width: int,
+        image_height: int,
+        use_polygon_format: bool
+) -> YOLOObject:
+    # The per-object reference conversion, which located_objects_to_yolo matches
+    px = None
+    py = None
+    if use_polygon_format:
+        if located_object.has_polygon():
+            px = located_object.get_polygon_x()
+            py = located_object.get_polygon_y()
+        else:
+            l = located_object
+            px = [l.x, l.x + l.width - 1, l.x + l.width - 1, l.x]
+            py = [l.y, l.y, l.y + l.height - 1, l.y + l.height - 1]
+        px = [x / image_width for x in px]
+        py = [y / image_height for y in py]
+
+    return YOLOObject(
+        class_index,
+        (located_object.x + located_object.width / 2) / image_width,
+        (located_object.y + located_object.height / 2) / image_height,
+        located_object.width / image_width,
+        located_object.height / image_height,
+        px,
+        py,
+    )
+
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000], help="objects per image")
+    parser.add_argument("--vertices", type=int, default=16, help="vertices per polygon object (0 for bbox only)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    # The per-object method only uses this attribute of its component
+    from_component = SimpleNamespace(labels=LABELS)
+    labels: Dict[str, int] = {}
+
+    print(f"{IMAGE_WIDTH}x{IMAGE_HEIGHT} images, {args.vertices} vertices per polygon, best of {args.repeat}")
+    print(f"{'direction':<12}{'objects':>10}{'per-object ms':>16}{'vectorised ms':>16}{'speed-up':>10}")
+    for size in args.sizes:
+        objects = make_objects(rng, size, args.vertices)
+        table = YOLOObjectTable.from_objects(objects)
+        located_objects = yolo_to_located_objects(table, LABELS, IMAGE_WIDTH, IMAGE_HEIGHT)
+
+        def from_per_object():
+            for obj in objects:
+                FromYOLOOD.to_located_object(
+                    from_component, obj, image_width=IMAGE_WIDTH, image_height=IMAGE_HEIGHT
+                )
+
+        def from_vectorised():
+            yolo_to_located_objects(table, LABELS, IMAGE_WIDTH, IMAGE_HEIGHT)
+
+        def to_per_object():
+            for located_object in located_objects:
+                to_yolo_object(
+                    located_object, get_class_index(labels, get_object_label(located_object)),
+                    IMAGE_WIDTH, IMAGE_HEIGHT, True
+                )
+
+        def to_vectorised():
+            class_indices = [get_class_index(labels, get_object_label(obj)) for obj in located_objects]
+            located_objects_to_yolo(located_objects, class_indices, IMAGE_WIDTH, IMAGE_HEIGHT, True)
+
+        for direction, per_object, vectorised in (
+                ("from-yolo", from_per_object, from_vectorised),
+                ("to-yolo", to_per_object, to_vectorised)
+        ):
+            per_object_time = best_time(per_object, args.repeat)
+            vectorised_time = best_time(vectorised, args.repeat)
+            print(
+                f"{direction:<12}{size:>10}{per_object_time * 1000:>16.3f}{vectorised_time * 1000:>16.3f}"
+                f"{per_object_time / vectorised_time:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
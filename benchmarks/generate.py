@@ -0,0 +1,187 @@
+"""
+Generates a synthetic YOLO dataset: images with label files in the
+'images'/'labels' directory layout read by from-yolo-od, plus a labels file
+of the class names. The output depends only on the options (including the
+seed), so the same dataset can be regenerated on any machine.
+
+Usage: python -m benchmarks.generate PATH [--images N] [--objects MIN MAX] [--polygon-fraction F]
+                                          [--vertices MIN MAX] [--depth N] [--classes N] [--seed N]
+"""
+import argparse
+import io
+import os
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+from PIL import Image as PILImage
+
+# The filename of the class names file, relative to the dataset directory
+LABELS_FILENAME = "labels.txt"
+
+# The dimensions the generated images are drawn from
+IMAGE_SIZES: Tuple[Tuple[int, int], ...] = ((64, 48), (96, 64), (128, 96))
+
+
+class DatasetSpec(NamedTuple):
+    """
+    The parameters of a synthetic dataset.
+    """
+    # The number of images
+    images: int = 1000
+
+    # The (inclusive) range of the number of objects per image
+    objects: Tuple[int, int] = (1, 20)
+
+    # The fraction of objects which are polygons rather than bounding-boxes
+    polygon_fraction: float = 0.5
+
+    # The (inclusive) range of the number of vertices per polygon
+    vertices: Tuple[int, int] = (3, 16)
+
+    # The number of directory levels the label files/images are nested in below 'labels'/'images'
+    depth: int = 0
+
+    # The number of sub-directories at each level
+    directories_per_level: int = 4
+
+    # The number of classes
+    classes: int = 10
+
+    # The seed of the generator
+    seed: int = 42
+
+
+def generate_label_line(rng: random.Random, spec: DatasetSpec) -> str:
+    """
+    Generates a line of a label file.
+
+    :param rng:
+                The random number generator.
+    :param spec:
+                The dataset parameters.
+    :return:
+                The annotation, in bbox or polygon format.
+    """
+    class_index = rng.randrange(spec.classes)
+
+    if rng.random() < spec.polygon_fraction:
+        num_vertices = rng.randint(*spec.vertices)
+        coordinates = [rng.random() for _ in range(2 * num_vertices)]
+        return f"{class_index} " + " ".join(f"{coordinate:f}" for coordinate in coordinates)
+
+    width, height = rng.uniform(0.01, 0.5), rng.uniform(0.01, 0.5)
+    centre_x, centre_y = rng.uniform(width / 2, 1 - width / 2), rng.uniform(height / 2, 1 - height / 2)
+    return f"{class_index} {centre_x!r} {centre_y!r} {width!r} {height!r}"
+
+
+def get_sub_directory(index: int, spec: DatasetSpec) -> str:
+    """
+    Gets the nested directory an image is placed in, spreading consecutive
+    images across the directories at each level.
+
+    :param index:
+                The index of the image.
+    :param spec:
+                The dataset parameters.
+    :return:
+                The directory, relative to 'labels'/'images'.
+    """
+    parts = []
+    for _ in range(spec.depth):
+        parts.append(f"d{index % spec.directories_per_level}")
+        index //= spec.directories_per_level
+    return os.path.join("", *parts)
+
+
+def generate_dataset(path: str, spec: DatasetSpec = DatasetSpec()) -> List[str]:
+    """
+    Generates a synthetic dataset.
+
+    :param path:
+                The directory to generate the dataset in.
+    :param spec:
+                The dataset parameters.
+    :return:
+                The label files, in generation order.
+    """
+    rng = random.Random(spec.seed)
+
+    # Encode each image size once
+    encoded_images: Dict[Tuple[int, int], bytes] = {}
+    for size in IMAGE_SIZES:
+        buffer = io.BytesIO()
+        PILImage.new("RGB", size, (127, 127, 127)).save(buffer, "PNG")
+        encoded_images[size] = buffer.getvalue()
+
+    label_files = []
+    for index in range(spec.images):
+        sub_directory = get_sub_directory(index, spec)
+        labels_path = os.path.join(path, "labels", sub_directory)
+        images_path = os.path.join(path, "images", sub_directory)
+        os.makedirs(labels_path, exist_ok=True)
+        os.makedirs(images_path, exist_ok=True)
+
+        with open(os.path.join(images_path, f"img{index:07d}.png"), "wb") as file:
+            file.write(encoded_images[rng.choice(IMAGE_SIZES)])
+
+        label_files.append(os.path.join(labels_path, f"img{index:07d}.txt"))
+        with open(label_files[-1], "w") as file:
+            file.write("\n".join(generate_label_line(rng, spec) for _ in range(rng.randint(*spec.objects))))
+
+    with open(os.path.join(path, LABELS_FILENAME), "w") as file:
+        file.write(",".join(f"class{index}" for index in range(spec.classes)))
+
+    return label_files
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the options for the dataset parameters to a parser.
+
+    :param parser:
+                The parser.
+    """
+    defaults = DatasetSpec()
+    parser.add_argument("--images", type=int, default=defaults.images)
+    parser.add_argument("--objects", type=int, nargs=2, default=defaults.objects, metavar=("MIN", "MAX"))
+    parser.add_argument("--polygon-fraction", type=float, default=defaults.polygon_fraction)
+    parser.add_argument("--vertices", type=int, nargs=2, default=defaults.vertices, metavar=("MIN", "MAX"))
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="directory levels below labels/images")
+    parser.add_argument("--directories-per-level", type=int, default=defaults.directories_per_level)
+    parser.add_argument("--classes", type=int, default=defaults.classes)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_arguments(args: argparse.Namespace) -> DatasetSpec:
+    """
+    Gets the dataset parameters from parsed options.
+
+    :param args:
+                The options parsed by a parser set up with add_spec_arguments.
+    :return:
+                The dataset parameters.
+    """
+    return DatasetSpec(
+        args.images,
+        tuple(args.objects),
+        args.polygon_fraction,
+        tuple(args.vertices),
+        args.depth,
+        args.directories_per_level,
+        args.classes,
+        args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="directory to generate the dataset in")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    label_files = generate_dataset(args.path, spec_from_arguments(args))
+    print(f"Generated {len(label_files)} images in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
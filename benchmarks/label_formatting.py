@@ -0,0 +1,89 @@
+"""
+Compares formatting YOLO label files with the per-object str(YOLOObject)
+path against the bulk format_yolo_labels serialiser used by YOLOODWriter,
+at full and reduced --precision.
+
+Usage: python benchmarks/label_formatting.py [--images N] [--objects N] [--vertices N] [--precision N]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from wai.annotations.yolo.od import YOLOObject, YOLOObjectTable
+from wai.annotations.yolo.od.util import format_yolo_labels
+
+
+def make_objects(rng: random.Random, num_objects: int, num_vertices: int):
+    objects = []
+    for index in range(num_objects):
+        if num_vertices == 0 or index % 2 == 0:
+            objects.append(YOLOObject(rng.randrange(80), rng.random(), rng.random(), rng.random(), rng.random()))
+        else:
+            px = [rng.random() for _ in range(num_vertices)]
+            py = [rng.random() for _ in range(num_vertices)]
+            width, height = max(px) - min(px), max(py) - min(py)
+            objects.append(YOLOObject(rng.randrange(80), min(px) + width / 2, min(py) + height / 2, width, height, px, py))
+    return objects
+
+
+def with_numpy_values(obj: YOLOObject) -> YOLOObject:
+    # As built by a processor working with NumPy arrays
+    return YOLOObject(
+        np.int64(obj.class_index),
+        np.float64(obj.centre_x), np.float64(obj.centre_y), np.float64(obj.width), np.float64(obj.height),
+        list(map(np.float64, obj.poly_x)) if obj.has_polygon() else None,
+        list(map(np.float64, obj.poly_y)) if obj.has_polygon() else None
+    )
+
+
+def time_formatting(images, format_image):
+    start = time.perf_counter()
+    total_bytes = sum(len(format_image(image)) for image in images)
+    return time.perf_counter() - start, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--objects", type=int, default=50, help="objects per image")
+    parser.add_argument("--vertices", type=int, default=40, help="vertices per polygon object (0 for bbox only)")
+    parser.add_argument("--precision", type=int, default=4, help="decimal places for the reduced-precision run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    images = [make_objects(rng, args.objects, args.vertices) for _ in range(args.images)]
+    tables = [YOLOObjectTable.from_objects(objects) for objects in images]
+
+    # Make sure the bulk serialiser is a drop-in replacement before timing it,
+    # including for objects built from NumPy values
+    numpy_images = [list(map(with_numpy_values, objects)) for objects in images[:10]]
+    assert all(
+        format_yolo_labels(objects) == "\n".join(map(str, objects))
+        for objects in images[:10] + numpy_images
+    )
+    assert all(
+        format_yolo_labels(numpy_objects) == format_yolo_labels(objects)
+        for numpy_objects, objects in zip(numpy_images, images)
+    )
+
+    runs = [
+        ("str(YOLOObject)", images, lambda objects: "\n".join(map(str, objects))),
+        ("bulk (objects)", images, format_yolo_labels),
+        ("bulk (table)", tables, format_yolo_labels),
+        (f"bulk (table, precision={args.precision})", tables, lambda table: format_yolo_labels(table, args.precision)),
+    ]
+
+    print(f"{args.images} images x {args.objects} objects ({args.vertices} vertices per polygon)")
+    print(f"{'method':<32}{'seconds':>10}{'MB':>10}{'speed-up':>10}")
+    baseline = None
+    for name, inputs, format_image in runs:
+        seconds, total_bytes = time_formatting(inputs, format_image)
+        baseline = baseline if baseline is not None else seconds
+        print(f"{name:<32}{seconds:>10.3f}{total_bytes / 1e6:>10.2f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Times materialising a set of image files into an output directory with each
+of the --link-mode options of to-yolo-od.
+
+Usage: python benchmarks/link_modes.py [--dir PATH] [--files N] [--size KB]
+
+The fixture is created under --dir (default: the system temp directory), so
+point it at the filesystem of interest (e.g. a tmpfs or ext4 mount).
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from wai.annotations.yolo.od.util import LINK_MODES, link_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=None, help="directory to create the fixture in")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=256, help="size of each file in KB")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="link-modes-", dir=args.dir)
+    try:
+        source_dir = os.path.join(root, "source")
+        os.makedirs(source_dir)
+        data = os.urandom(args.size * 1024)
+        sources = []
+        for index in range(args.files):
+            sources.append(os.path.join(source_dir, f"{index:06d}.jpg"))
+            with open(sources[-1], "wb") as file:
+                file.write(data)
+
+        print(f"{args.files} files x {args.size} KB in {root}")
+        print(f"{'mode':<10}{'seconds':>10}{'MB/s':>10}  used")
+        for link_mode in LINK_MODES:
+            output_dir = os.path.join(root, link_mode)
+            os.makedirs(output_dir)
+            used = set()
+            start = time.perf_counter()
+            for source in sources:
+                used.add(link_file(source, os.path.join(output_dir, os.path.basename(source)), link_mode))
+            elapsed = time.perf_counter() - start
+            throughput = args.files * args.size / 1024 / elapsed
+            print(f"{link_mode:<10}{elapsed:>10.3f}{throughput:>10.0f}  {', '.join(sorted(used))}")
+            shutil.rmtree(output_dir)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
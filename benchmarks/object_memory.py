@@ -0,0 +1,66 @@
+"""
+Compares the memory used by YOLO annotations held as YOLOObject dataclasses
+against the same annotations held in per-image YOLOObjectTable containers.
+
+Usage: python benchmarks/object_memory.py [--images N] [--objects N] [--vertices N]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from wai.annotations.yolo.od import YOLOObject
+from wai.annotations.yolo.od.util import parse_yolo_table
+
+
+def make_label_lines(rng: random.Random, num_objects: int, num_vertices: int):
+    lines = []
+    for index in range(num_objects):
+        if num_vertices == 0 or index % 2 == 0:
+            values = [rng.random() for _ in range(4)]
+        else:
+            values = [rng.random() for _ in range(2 * num_vertices)]
+        lines.append(" ".join([str(rng.randrange(80))] + ["%f" % value for value in values]))
+    return lines
+
+
+def measure(build):
+    gc.collect()
+    tracked_before = len(gc.get_objects())
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tracked = len(gc.get_objects()) - tracked_before
+    del result
+    gc.collect()
+    return current, peak, tracked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--objects", type=int, default=50, help="objects per image")
+    parser.add_argument("--vertices", type=int, default=40, help="vertices per polygon object (0 for bbox only)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    images = [make_label_lines(rng, args.objects, args.vertices) for _ in range(args.images)]
+
+    results = {
+        "dataclass": measure(lambda: [tuple(YOLOObject.from_string(line) for line in lines) for lines in images]),
+        "table": measure(lambda: [parse_yolo_table(lines) for lines in images]),
+    }
+
+    print(f"{args.images} images x {args.objects} objects ({args.vertices} vertices per polygon)")
+    print(f"{'representation':<16}{'retained MB':>14}{'peak MB':>12}{'bytes/object':>14}{'gc objects':>12}")
+    for name, (current, peak, tracked) in results.items():
+        print(
+            f"{name:<16}{current / 2 ** 20:>14.2f}{peak / 2 ** 20:>12.2f}"
+            f"{current / (args.images * args.objects):>14.1f}{tracked:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
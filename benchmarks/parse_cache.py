@@ -0,0 +1,81 @@
+"""
+Times the per-file work from-yolo-od does for a label file before reading the
+image data (locating the image, probing its dimensions and parsing the labels)
+against fetching the same results from a warm --cache-dir parse cache.
+
+Usage: python benchmarks/parse_cache.py [--dir PATH] [--files N] [--objects N] [--vertices N]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from PIL import Image as PILImage
+
+from wai.annotations.yolo.od.util import (
+    CachedLabels,
+    ImageIndex,
+    LabelCache,
+    read_image_size,
+    read_yolo_label_file,
+    stat_label_file
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=None, help="directory to create the fixture in")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--objects", type=int, default=20, help="annotations per label file")
+    parser.add_argument("--vertices", type=int, default=16, help="vertices per polygon (0 for bbox only)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    root = tempfile.mkdtemp(prefix="parse-cache-", dir=args.dir)
+    try:
+        labels_dir = os.path.join(root, "labels")
+        images_dir = os.path.join(root, "images")
+        os.makedirs(labels_dir)
+        os.makedirs(images_dir)
+        PILImage.new("RGB", (64, 48)).save(os.path.join(root, "image.png"))
+        label_files = []
+        for index in range(args.files):
+            shutil.copyfile(os.path.join(root, "image.png"), os.path.join(images_dir, f"{index:06d}.png"))
+            label_files.append(os.path.join(labels_dir, f"{index:06d}.txt"))
+            with open(label_files[-1], "w") as file:
+                for _ in range(args.objects):
+                    values = [rng.random() for _ in range(2 * args.vertices if args.vertices > 0 else 4)]
+                    file.write(f"{rng.randrange(10)} " + " ".join(f"{value:f}" for value in values) + "\n")
+
+        # Cold: what the reader does without a cache (and to fill it)
+        cache = LabelCache(os.path.join(root, "cache"), 1024 * 1024 * 1024)
+        image_index = ImageIndex()
+        start = time.perf_counter()
+        for label_file in label_files:
+            image_file = image_index.locate_image(label_file)
+            stat = stat_label_file(label_file, image_file)
+            labels = CachedLabels(image_file, read_image_size(image_file), read_yolo_label_file(label_file))
+            cache.put(label_file, stat, labels)
+        cold = time.perf_counter() - start
+        cache.close()
+
+        # Warm: validating and decoding the cached results
+        cache = LabelCache(os.path.join(root, "cache"), 1024 * 1024 * 1024)
+        start = time.perf_counter()
+        hits = sum(cache.get(label_file) is not None for label_file in label_files)
+        warm = time.perf_counter() - start
+        cache.close()
+
+        print(f"{args.files} label files x {args.objects} annotations, {args.vertices} vertices per polygon")
+        print(f"{'run':<6}{'seconds':>10}{'files/s':>12}")
+        print(f"{'cold':<6}{cold:>10.3f}{args.files / cold:>12.0f}")
+        print(f"{'warm':<6}{warm:>10.3f}{args.files / warm:>12.0f}  ({hits} hits, {cold / warm:.1f}x)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
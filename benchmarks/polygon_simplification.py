@@ -0,0 +1,203 @@
+"""
+Measures simplifying dense polygons (as traced from masks) with
+simplify_polygons, as to-yolo-od does with --simplify-tolerance and
+--max-vertices: the size of the label files, the time to simplify and
+format them, the time to read them back (in bulk, and line by line with
+YOLOObject.from_string), and the loss of IoU between the simplified and
+original polygons (rasterised on a grid over each polygon's bounding-box).
+
+Usage: python -m benchmarks.polygon_simplification [--images N] [--objects N] [--vertices N]
+                                                   [--tolerances T [T ...]] [--max-vertices N [N ...]]
+                                                   [--iou-objects N] [--grid N] [--seed N]
+"""
+import argparse
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from wai.annotations.yolo.od import YOLOObject, YOLOObjectTable
+from wai.annotations.yolo.od.util import format_yolo_labels, parse_yolo_table, simplify_polygons
+
+# The resolution of the masks the polygons are traced from
+IMAGE_WIDTH, IMAGE_HEIGHT = 1920, 1080
+
+
+def make_table(rng: np.random.Generator, num_objects: int, num_vertices: int) -> YOLOObjectTable:
+    """
+    Generates the annotations of an image: irregular blobs whose outlines
+    follow the pixel grid, like polygons traced from masks.
+
+    :param rng:
+                The random number generator.
+    :param num_objects:
+                The number of objects.
+    :param num_vertices:
+                The number of vertices per polygon.
+    :return:
+                The annotations.
+    """
+    angles = np.linspace(0, 2 * np.pi, num_vertices, endpoint=False)
+    polygons = []
+    for _ in range(num_objects):
+        # A radius varying smoothly around the centre, with a few lobes
+        harmonics = np.arange(1, 6)
+        amplitudes = rng.uniform(0, 0.15, len(harmonics)) / harmonics
+        phases = rng.uniform(0, 2 * np.pi, len(harmonics))
+        lobes = amplitudes[:, None] * np.sin(harmonics[:, None] * angles + phases[:, None])
+        radii = rng.uniform(0.05, 0.2) * (1 + np.sum(lobes, axis=0))
+        centre_x, centre_y = rng.uniform(0.25, 0.75, 2)
+        xs = np.clip(np.round((centre_x + radii * np.cos(angles)) * IMAGE_WIDTH) / IMAGE_WIDTH, 0, 1)
+        ys = np.clip(np.round((centre_y + radii * np.sin(angles)) * IMAGE_HEIGHT) / IMAGE_HEIGHT, 0, 1)
+        polygons.append(np.stack((xs, ys), axis=1))
+
+    minimums = np.array([polygon.min(axis=0) for polygon in polygons])
+    maximums = np.array([polygon.max(axis=0) for polygon in polygons])
+    point_offsets = np.arange(num_objects + 1, dtype=np.int64) * num_vertices
+
+    return YOLOObjectTable(
+        rng.integers(0, 10, num_objects),
+        np.concatenate(((minimums + maximums) / 2, maximums - minimums), axis=1),
+        point_offsets,
+        np.concatenate(polygons)
+    )
+
+
+def rasterise(polygon: np.ndarray, minimum: np.ndarray, maximum: np.ndarray, grid: int) -> np.ndarray:
+    """
+    Rasterises a polygon (even-odd rule) by sampling the centres of a grid of cells.
+
+    :param polygon:
+                The (K, 2) vertices.
+    :param minimum:
+                The top-left of the area to rasterise.
+    :param maximum:
+                The bottom-right of the area to rasterise.
+    :param grid:
+                The number of cells along each side.
+    :return:
+                The (grid, grid) mask.
+    """
+    xs = minimum[0] + (np.arange(grid) + 0.5) * (maximum[0] - minimum[0]) / grid
+    ys = minimum[1] + (np.arange(grid) + 0.5) * (maximum[1] - minimum[1]) / grid
+    starts, ends = polygon, np.roll(polygon, -1, axis=0)
+
+    # Where each edge crosses each row (infinity if it doesn't)
+    crosses = (starts[:, 1] <= ys[:, None]) != (ends[:, 1] <= ys[:, None])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fractions = (ys[:, None] - starts[:, 1]) / (ends[:, 1] - starts[:, 1])
+        crossings = np.where(crosses, starts[:, 0] + fractions * (ends[:, 0] - starts[:, 0]), np.inf)
+    crossings.sort(axis=1)
+
+    mask = np.empty((grid, grid), dtype=bool)
+    for row in range(grid):
+        mask[row] = np.searchsorted(crossings[row], xs) % 2 == 1
+    return mask
+
+
+def iou_losses(original: YOLOObjectTable, simplified: YOLOObjectTable, grid: int) -> List[float]:
+    """
+    Calculates the IoU lost by simplifying each polygon.
+
+    :param original:
+                The original annotations.
+    :param simplified:
+                The simplified annotations.
+    :param grid:
+                The resolution to rasterise each polygon at.
+    :return:
+                1 - IoU of each polygon.
+    """
+    losses = []
+    for index in range(len(original)):
+        polygon = original.polygon(index)
+        minimum, maximum = polygon.min(axis=0), polygon.max(axis=0)
+        before = rasterise(polygon, minimum, maximum, grid)
+        after = rasterise(simplified.polygon(index), minimum, maximum, grid)
+        losses.append(1 - np.count_nonzero(before & after) / max(np.count_nonzero(before | after), 1))
+    return losses
+
+
+def measure(tables: List[YOLOObjectTable], tolerance: float, max_vertices: Optional[int], iou_objects: int, grid: int):
+    """
+    Simplifies, formats and reads back the annotations of all images.
+
+    :return:
+                The number of vertices, bytes, simplification/format/read times
+                and the mean and maximum IoU loss.
+    """
+    start = time.perf_counter()
+    simplified = tables
+    if tolerance > 0 or max_vertices is not None:
+        simplified = [simplify_polygons(table, tolerance, max_vertices) for table in tables]
+    simplify_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contents = [format_yolo_labels(table) for table in simplified]
+    format_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for content in contents:
+        parse_yolo_table(content.split("\n"), True)
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for content in contents:
+        [YOLOObject.from_string(line, use_polygon_format=True) for line in content.split("\n")]
+    from_string_seconds = time.perf_counter() - start
+
+    losses = []
+    for table, simplified_table in zip(tables, simplified):
+        if len(losses) >= iou_objects:
+            break
+        losses += iou_losses(table, simplified_table, grid)
+
+    return (
+        sum(len(table.points) for table in simplified),
+        sum(len(content) for content in contents),
+        simplify_seconds,
+        format_seconds,
+        parse_seconds,
+        from_string_seconds,
+        float(np.mean(losses)),
+        float(np.max(losses)),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--objects", type=int, default=10, help="objects per image")
+    parser.add_argument("--vertices", type=int, default=2000, help="vertices per polygon")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.0002, 0.0005, 0.001, 0.002],
+                        help="simplification tolerances to measure (normalised)")
+    parser.add_argument("--max-vertices", type=int, nargs="+", default=[200, 50], help="vertex budgets to measure")
+    parser.add_argument("--iou-objects", type=int, default=100, help="number of polygons to measure the IoU loss of")
+    parser.add_argument("--grid", type=int, default=256, help="resolution to rasterise polygons at for the IoU")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    tables = [make_table(rng, args.objects, args.vertices) for _ in range(args.images)]
+
+    runs = [("none", 0.0, None)]
+    runs += [(f"tolerance={tolerance:g}", tolerance, None) for tolerance in args.tolerances]
+    runs += [(f"max-vertices={max_vertices}", 0.0, max_vertices) for max_vertices in args.max_vertices]
+
+    print(f"{args.images} images x {args.objects} objects ({args.vertices} vertices per polygon)")
+    print(
+        f"{'simplification':<22}{'vertices':>10}{'MB':>8}{'simplify s':>12}{'format s':>10}"
+        f"{'parse s':>10}{'from_string s':>15}{'IoU loss':>10}{'max':>8}"
+    )
+    for name, tolerance, max_vertices in runs:
+        vertices, num_bytes, simplify_s, format_s, parse_s, from_string_s, mean_loss, max_loss = measure(
+            tables, tolerance, max_vertices, args.iou_objects, args.grid
+        )
+        print(
+            f"{name:<22}{vertices:>10}{num_bytes / 1e6:>8.2f}{simplify_s:>12.3f}{format_s:>10.3f}"
+            f"{parse_s:>10.3f}{from_string_s:>15.3f}{mean_loss:>10.4f}{max_loss:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Times from-yolo-od's reader on storage with a high per-call latency (as on
+network filesystems or FUSE-mounted object storage), simulated by delaying
+every open, stat and directory listing. Compares reading in-line with thread
+workers keeping several files in flight, and checks every run produces the
+same elements in the same order.
+
+Usage: python -m benchmarks.read_latency [--latency MS] [--workers N [N ...]] [--max-in-flight N]
+                                         [--lazy-images] [--dir PATH] [dataset options]
+"""
+import argparse
+import builtins
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from wai.annotations.core.specifier.util import instantiate_stage_as_pipeline
+from wai.annotations.core.stream import Pipeline
+
+from wai.annotations.yolo.od.specifier import YOLOODInputFormatSpecifier
+
+from .generate import add_spec_arguments, generate_dataset, spec_from_arguments
+
+
+@contextmanager
+def injected_latency(seconds: float):
+    """
+    Delays every open, stat and directory listing (in any thread) by a fixed time.
+
+    :param seconds:
+                The delay per call.
+    """
+    originals = {
+        (builtins, "open"): builtins.open,
+        (os, "stat"): os.stat,
+        (os, "scandir"): os.scandir,
+    }
+
+    def delayed(function):
+        def call(*args, **kwargs):
+            time.sleep(seconds)
+            return function(*args, **kwargs)
+        return call
+
+    for (module, name), function in originals.items():
+        setattr(module, name, delayed(function))
+    try:
+        yield
+    finally:
+        for (module, name), function in originals.items():
+            setattr(module, name, function)
+
+
+def read_all(label_files: List[str], workers: int, max_in_flight: int, lazy_images: bool) -> list:
+    """
+    Reads label files (and their images) with from-yolo-od's reader.
+
+    :param label_files:
+                The label files.
+    :param workers:
+                The number of thread workers (1 to read in-line).
+    :param max_in_flight:
+                The maximum number of files handed to the workers at once (0 for the default).
+    :param lazy_images:
+                Whether to only read the image dimensions.
+    :return:
+                The filename, image size and annotation count of each element, in order.
+    """
+    options = ["--workers", str(workers), "--worker-type", "thread", "--max-in-flight", str(max_in_flight)]
+    if lazy_images:
+        options.append("--lazy-images")
+    stage = instantiate_stage_as_pipeline(YOLOODInputFormatSpecifier, ["-i", label_files[0]] + options)
+    reader = stage.processors[0]
+
+    elements = []
+    Pipeline(processors=[reader]).process(
+        [(label_file, False) for label_file in label_files],
+        lambda element: elements.append((element[0].filename, element[0].size, len(element[1])))
+    )
+    return elements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=2.0, help="delay per filesystem call, in milliseconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-in-flight", type=int, default=0, help="0 for the reader's default")
+    parser.add_argument("--lazy-images", action="store_true")
+    parser.add_argument("--dir", default=None, help="directory to create the dataset in")
+    add_spec_arguments(parser)
+    parser.set_defaults(images=300)
+    args = parser.parse_args()
+
+    spec = spec_from_arguments(args)
+    root = tempfile.mkdtemp(prefix="read-latency-", dir=args.dir)
+    try:
+        label_files = generate_dataset(root, spec)
+
+        print(f"{spec.images} images, {args.latency:g}ms per open/stat/listing")
+        print(f"{'workers':<10}{'seconds':>10}{'images/s':>12}{'speed-up':>10}")
+        expected: Optional[list] = None
+        baseline = None
+        for workers in args.workers:
+            with injected_latency(args.latency / 1000):
+                start = time.perf_counter()
+                elements = read_all(label_files, workers, args.max_in_flight, args.lazy_images)
+                duration = time.perf_counter() - start
+
+            if expected is None:
+                expected, baseline = elements, duration
+            elif elements != expected:
+                raise Exception(f"Reading with {workers} workers gave different elements (or order)")
+
+            print(f"{workers:<10}{duration:>10.3f}{spec.images / duration:>12.0f}{baseline / duration:>9.1f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Times the YOLO plugin's components on a synthetic dataset (see
+benchmarks/generate.py), each on its own and end-to-end, and writes the
+results as JSON. Given a baseline (the JSON of an earlier run), also reports
+the change in each scenario, exiting with status 1 if any is slower than the
+baseline by more than the tolerance.
+
+Scenarios:
+- from_string: YOLOObject.from_string on every line of every label file
+- reader: YOLOODReader reading the label files and images
+- from_yolo: FromYOLOOD converting the read elements to located objects
+- from_yolo_lazy: FromYOLOOD wrapping the read annotations, to be converted when first accessed
+- to_yolo: ToYOLOOD converting the located objects back to YOLO
+- to_yolo_pass_through: ToYOLOOD writing the unconverted annotations of from_yolo_lazy straight back
+- writer: YOLOODWriter writing the converted elements
+- end_to_end: from-yolo-od to to-yolo-od as a single pipeline
+
+from_yolo and to_yolo convert every annotation (as a stage between them which
+accesses the annotations makes them), so they compare with runs from before
+the annotations were passed through.
+
+Usage: python -m benchmarks.suite [--output FILE] [--baseline FILE] [--tolerance F] [--repeat N]
+                                  [--scenarios NAME [NAME ...]] [--dir PATH] [dataset options]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from wai.annotations.core.specifier.util import instantiate_stage_as_pipeline
+from wai.annotations.core.stream import Pipeline
+
+from wai.annotations.yolo.od import YOLOObject
+from wai.annotations.yolo.od.specifier import YOLOODInputFormatSpecifier, YOLOODOutputFormatSpecifier
+
+from .generate import LABELS_FILENAME, DatasetSpec, add_spec_arguments, generate_dataset, spec_from_arguments
+
+# The version of the results format
+RESULTS_VERSION = 1
+
+# The names of the scenarios, in the order they are run
+SCENARIOS: Tuple[str, ...] = (
+    "from_string",
+    "reader",
+    "from_yolo",
+    "from_yolo_lazy",
+    "to_yolo",
+    "to_yolo_pass_through",
+    "writer",
+    "end_to_end"
+)
+
+
+def time_runs(run: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> List[float]:
+    """
+    Times repeated runs of a scenario.
+
+    :param run:
+                The scenario.
+    :param repeat:
+                The number of times to run it.
+    :param setup:
+                Untimed preparation before each run, if any.
+    :return:
+                The duration of each run, in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def process(pipeline: Pipeline, source: Optional[list] = None) -> list:
+    """
+    Runs a pipeline, collecting the elements it outputs if it has no sink.
+
+    :param pipeline:
+                The pipeline.
+    :param source:
+                The elements to feed it, or None to use its source.
+    :return:
+                The output elements.
+    """
+    output = []
+    pipeline.process(source, output.append if not pipeline.has_sink else None)
+    return output
+
+
+def convert_objects(elements: list) -> list:
+    """
+    Converts the located objects of elements output by FromYOLOOD, which are
+    otherwise only converted when first accessed.
+
+    :param elements:
+                The elements.
+    :return:
+                The same elements.
+    """
+    for _, located_objects in elements:
+        if located_objects is not None:
+            len(located_objects.data)
+    return elements
+
+
+def run_suite(
+        path: str,
+        label_files: List[str],
+        scenarios: Tuple[str, ...],
+        repeat: int,
+        use_polygon_format: bool
+) -> Dict[str, List[float]]:
+    """
+    Runs the scenarios on a generated dataset.
+
+    :param path:
+                The directory of the dataset.
+    :param label_files:
+                The label files of the dataset.
+    :param scenarios:
+                The scenarios to run.
+    :param repeat:
+                The number of times to run each scenario.
+    :param use_polygon_format:
+                Whether to write the annotations in polygon format.
+    :return:
+                The run times of each scenario.
+    """
+    inputs_file = os.path.join(path, "inputs.txt")
+    with open(inputs_file, "w") as file:
+        file.write("\n".join(label_files))
+    output_path = os.path.join(path, "output")
+
+    def clear_output():
+        # Keep the directories, which the writer only creates once
+        for directory, _, filenames in os.walk(output_path):
+            for filename in filenames:
+                os.remove(os.path.join(directory, filename))
+
+    source_stage = instantiate_stage_as_pipeline(
+        YOLOODInputFormatSpecifier,
+        ["-I", inputs_file, "-l", os.path.join(path, LABELS_FILENAME)]
+    )
+    sink_stage = instantiate_stage_as_pipeline(
+        YOLOODOutputFormatSpecifier,
+        ["-o", output_path, "-l", os.path.join(path, f"output-{LABELS_FILENAME}")]
+        + (["-p"] if use_polygon_format else [])
+    )
+    reader, from_yolo = source_stage.processors
+    to_yolo, = sink_stage.processors
+
+    # The input of each stand-alone scenario is the output of the one before
+    lines = []
+    for label_file in label_files:
+        with open(label_file) as file:
+            lines.extend(file.read().splitlines())
+    elements = [(label_file, False) for label_file in label_files]
+    read_elements = process(Pipeline(processors=[reader]), elements)
+    located_elements = convert_objects(process(Pipeline(processors=[from_yolo]), read_elements))
+    lazy_elements = process(Pipeline(processors=[from_yolo]), read_elements)
+    converted_elements = process(Pipeline(processors=[to_yolo]), located_elements)
+
+    runs = {
+        "from_string": (lambda: [YOLOObject.from_string(line) for line in lines], None),
+        "reader": (lambda: process(Pipeline(processors=[reader]), elements), None),
+        "from_yolo": (lambda: convert_objects(process(Pipeline(processors=[from_yolo]), read_elements)), None),
+        "from_yolo_lazy": (lambda: process(Pipeline(processors=[from_yolo]), read_elements), None),
+        "to_yolo": (lambda: process(Pipeline(processors=[to_yolo]), located_elements), None),
+        "to_yolo_pass_through": (lambda: process(Pipeline(processors=[to_yolo]), lazy_elements), None),
+        "writer": (lambda: process(Pipeline(sink=sink_stage.sink), converted_elements), clear_output),
+        "end_to_end": (
+            lambda: Pipeline(
+                source_stage.source,
+                source_stage.processors + sink_stage.processors,
+                sink_stage.sink
+            ).process(),
+            clear_output
+        ),
+    }
+
+    return {
+        scenario: time_runs(runs[scenario][0], repeat, runs[scenario][1])
+        for scenario in scenarios
+    }
+
+
+def make_results(spec: DatasetSpec, use_polygon_format: bool, times: Dict[str, List[float]]) -> dict:
+    """
+    Formats the results of a suite run as JSON-serialisable data.
+
+    :param spec:
+                The parameters of the dataset.
+    :param use_polygon_format:
+                Whether the annotations were written in polygon format.
+    :param times:
+                The run times of each scenario.
+    :return:
+                The results.
+    """
+    return {
+        "version": RESULTS_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "dataset": {**spec._asdict(), "use_polygon_format": use_polygon_format},
+        "scenarios": {
+            scenario: {
+                "best_s": min(scenario_times),
+                "median_s": statistics.median(scenario_times),
+                "images_per_s": spec.images / min(scenario_times),
+                "times_s": scenario_times,
+            }
+            for scenario, scenario_times in times.items()
+        },
+    }
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Prints the change in each scenario's best time from a baseline.
+
+    :param results:
+                The results of this run.
+    :param baseline:
+                The results of the baseline run.
+    :param tolerance:
+                The fractional slow-down beyond which a scenario is a regression.
+    :return:
+                The scenarios which regressed.
+    """
+    # Compare the dataset parameters as they are stored (tuples become lists)
+    if json.loads(json.dumps(results["dataset"])) != baseline["dataset"]:
+        print("warning: the baseline was run on a different dataset", file=sys.stderr)
+
+    regressions = []
+    print(f"{'scenario':<22}{'baseline s':>12}{'current s':>12}{'change':>10}")
+    for scenario, result in results["scenarios"].items():
+        if scenario not in baseline["scenarios"]:
+            continue
+        baseline_time = baseline["scenarios"][scenario]["best_s"]
+        change = result["best_s"] / baseline_time - 1
+        regressed = change > tolerance
+        if regressed:
+            regressions.append(scenario)
+        print(
+            f"{scenario:<22}{baseline_time:>12.4f}{result['best_s']:>12.4f}{change:>+10.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=None, help="file to write the JSON results to (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slow-down regarded as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--polygon-format", action="store_true", help="write the annotations in polygon format")
+    parser.add_argument("--dir", default=None, help="directory to create the dataset in")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_arguments(args)
+    scenarios = tuple(scenario for scenario in SCENARIOS if scenario in args.scenarios)
+
+    root = tempfile.mkdtemp(prefix="yolo-suite-", dir=args.dir)
+    try:
+        label_files = generate_dataset(root, spec)
+        times = run_suite(root, label_files, scenarios, args.repeat, args.polygon_format)
+    finally:
+        shutil.rmtree(root)
+
+    results = make_results(spec, args.polygon_format, times)
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if len(compare_results(results, baseline, args.tolerance)) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,13 +37,21 @@ setup(
     author='Corey Sterling',
     author_email='coreytsterling@gmail.com',
     install_requires=[
-        "wai.annotations.core>=0.1.4"
+        "wai.annotations.core>=0.1.4",
+        "numpy>=1.16"
     ],
     entry_points={
         "wai.annotations.plugins": [
             # Image Object Detection Formats
             "from-yolo-od=wai.annotations.yolo.od.specifier:YOLOODInputFormatSpecifier",
             "to-yolo-od=wai.annotations.yolo.od.specifier:YOLOODOutputFormatSpecifier",
-        ]
+            "from-yolo-od-shards=wai.annotations.yolo.od.specifier:YOLOODShardInputFormatSpecifier",
+            "to-yolo-od-shards=wai.annotations.yolo.od.specifier:YOLOODShardOutputFormatSpecifier",
+            "from-yolo-od-columnar=wai.annotations.yolo.od.specifier:YOLOODColumnarInputFormatSpecifier",
+        ],
+        "console_scripts": [
+            "yolo-od-scan=wai.annotations.yolo.od.scan:main",
+            "yolo-od-merge=wai.annotations.yolo.od.merge:main",
+        ],
     }
 )
@@ -1 +1 @@
-from ._format import YOLOODFormat
+from ._format import YOLOODFormat, YOLOObject, YOLOObjectTable
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
 
 from wai.annotations.domain.image import Image
 
@@ -127,4 +129,180 @@ class YOLOObject:
             return self.to_bbox()
 
 
-YOLOODFormat = Tuple[Image, Tuple[YOLOObject]]
+class YOLOObjectTable(Sequence[YOLOObject]):
+    """
+    Compact representation of all YOLO annotations for a single image. Rather
+    than a Python object per annotation, the annotations are held in contiguous
+    NumPy arrays. Indexing the table materialises a YOLOObject on demand.
+    """
+    __slots__ = ("class_indices", "boxes", "point_offsets", "points")
+
+    def __init__(
+            self,
+            class_indices: np.ndarray,
+            boxes: np.ndarray,
+            point_offsets: np.ndarray,
+            points: np.ndarray
+    ):
+        # The (N,) class index of each annotation
+        self.class_indices: np.ndarray = class_indices
+
+        # The (N, 4) centre-x, centre-y, width, height of each annotation
+        self.boxes: np.ndarray = boxes
+
+        # The (N + 1) offsets of each annotation's vertices into the points buffer
+        # (annotations without a polygon have no vertices)
+        self.point_offsets: np.ndarray = point_offsets
+
+        # The (M, 2) buffer of interleaved x/y polygon vertices
+        self.points: np.ndarray = points
+
+    @classmethod
+    def empty(cls) -> 'YOLOObjectTable':
+        """
+        Creates a table with no annotations.
+
+        :return: the empty table
+        :rtype: YOLOObjectTable
+        """
+        return cls(
+            np.empty(0, dtype=np.int64),
+            np.empty((0, 4), dtype=np.float64),
+            np.zeros(1, dtype=np.int64),
+            np.empty((0, 2), dtype=np.float64)
+        )
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[YOLOObject]) -> 'YOLOObjectTable':
+        """
+        Packs the given YOLO objects into a table.
+
+        :param objects: the objects to pack
+        :type objects: Iterable[YOLOObject]
+        :return: the table
+        :rtype: YOLOObjectTable
+        """
+        objects = tuple(objects)
+        if len(objects) == 0:
+            return cls.empty()
+
+        point_counts = [len(obj.poly_x) if obj.has_polygon() else 0 for obj in objects]
+        point_offsets = np.zeros(len(objects) + 1, dtype=np.int64)
+        np.cumsum(point_counts, out=point_offsets[1:])
+
+        points = np.empty((point_offsets[-1], 2), dtype=np.float64)
+        for obj, start, end in zip(objects, point_offsets[:-1].tolist(), point_offsets[1:].tolist()):
+            if start != end:
+                points[start:end, 0] = obj.poly_x
+                points[start:end, 1] = obj.poly_y
+
+        return cls(
+            np.array([obj.class_index for obj in objects], dtype=np.int64),
+            np.array([[obj.centre_x, obj.centre_y, obj.width, obj.height] for obj in objects], dtype=np.float64),
+            point_offsets,
+            points
+        )
+
+    def has_polygon(self, index: int) -> bool:
+        """
+        Returns whether polygon information is present for an annotation.
+
+        :param index: the index of the annotation
+        :type index: int
+        :return: True if present
+        :rtype: bool
+        """
+        return self.point_offsets[index + 1] > self.point_offsets[index]
+
+    def polygon(self, index: int) -> np.ndarray:
+        """
+        Gets a view of the polygon vertices of an annotation.
+
+        :param index: the index of the annotation
+        :type index: int
+        :return: the (K, 2) array of vertices (empty if no polygon is present)
+        :rtype: np.ndarray
+        """
+        return self.points[self.point_offsets[index]:self.point_offsets[index + 1]]
+
+    def take(self, indices: np.ndarray) -> 'YOLOObjectTable':
+        """
+        Creates a table of a subset of the annotations.
+
+        :param indices: the indices of the annotations to keep, in order
+        :type indices: np.ndarray
+        :return: the table
+        :rtype: YOLOObjectTable
+        """
+        starts = self.point_offsets[:-1][indices]
+        counts = self.point_offsets[1:][indices] - starts
+        point_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(counts, out=point_offsets[1:])
+
+        # The index of each kept vertex in this table's points buffer
+        point_indices = np.repeat(starts - point_offsets[:-1], counts) + np.arange(point_offsets[-1])
+
+        return YOLOObjectTable(
+            self.class_indices[indices],
+            self.boxes[indices],
+            point_offsets,
+            self.points[point_indices]
+        )
+
+    def to_objects(self) -> Tuple[YOLOObject, ...]:
+        """
+        Materialises all annotations as YOLO objects.
+
+        :return: the objects
+        :rtype: tuple
+        """
+        xs = self.points[:, 0].tolist()
+        ys = self.points[:, 1].tolist()
+        offsets = self.point_offsets.tolist()
+
+        objects = []
+        for index, (class_index, box) in enumerate(zip(self.class_indices.tolist(), self.boxes.tolist())):
+            start, end = offsets[index], offsets[index + 1]
+            if start != end:
+                objects.append(YOLOObject(class_index, *box, xs[start:end], ys[start:end]))
+            else:
+                objects.append(YOLOObject(class_index, *box, None, None))
+
+        return tuple(objects)
+
+    def __len__(self) -> int:
+        return len(self.class_indices)
+
+    def __getitem__(self, index):
+        # Slicing returns a table of views onto this table's buffers
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return YOLOObjectTable.from_objects(self[i] for i in range(start, stop, step))
+            stop = max(start, stop)
+            point_start, point_stop = self.point_offsets[start], self.point_offsets[stop]
+            return YOLOObjectTable(
+                self.class_indices[start:stop],
+                self.boxes[start:stop],
+                self.point_offsets[start:stop + 1] - point_start,
+                self.points[point_start:point_stop]
+            )
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Annotation index {index} out of range for {len(self)} annotations")
+
+        polygon = self.polygon(index)
+        return YOLOObject(
+            int(self.class_indices[index]),
+            *self.boxes[index].tolist(),
+            polygon[:, 0].tolist() if len(polygon) > 0 else None,
+            polygon[:, 1].tolist() if len(polygon) > 0 else None
+        )
+
+    def __iter__(self) -> Iterator[YOLOObject]:
+        return iter(self.to_objects())
+
+
+YOLOODFormat = Tuple[Image, Sequence[YOLOObject]]
@@ -1,21 +1,29 @@
-from functools import partial
-from typing import List, Optional
+from typing import Optional, Union
 
 from wai.annotations.core.component import ProcessorComponent
 from wai.annotations.core.stream import ThenFunction, DoneFunction
-from wai.annotations.core.stream.util import ProcessState, RequiresNoFinalisation
+from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.domain.image.object_detection import ImageObjectDetectionInstance
 from wai.annotations.domain.image.object_detection.util import set_object_label
 
-from wai.common.adams.imaging.locateobjects import LocatedObjects, LocatedObject
+from wai.common.adams.imaging.locateobjects import LocatedObject
 from wai.common.cli.options import TypedOption
 from wai.common.geometry import Polygon, Point
 
-from .._format import YOLOODFormat, YOLOObject
+from .._format import YOLOODFormat, YOLOObject, YOLOObjectTable
+from ..util import (
+    ClassIndexError,
+    ClassLabels,
+    NullStats,
+    Stats,
+    YOLOLocatedObjects,
+    create_stats,
+    read_class_names,
+    report_stats
+)
 
 
 class FromYOLOOD(
-    RequiresNoFinalisation,
     ProcessorComponent[YOLOODFormat, ImageObjectDetectionInstance]
 ):
     """
@@ -26,11 +34,15 @@ class FromYOLOOD(
         "-l", "--labels",
         type=str,
         metavar="PATH",
-        help="Path to the labels file"
+        help="Path to the labels file: comma-separated labels, a labels CSV file (Index,Label), one label per "
+             "line (classes.txt), or the 'names' of a data.yaml file (requires PyYAML)"
     )
 
     # Mapping from class index to label
-    labels: List[str] = ProcessState(lambda self: self.read_labels_file())
+    labels: ClassLabels = ProcessState(lambda self: self.read_labels_file())
+
+    # The instrumentation statistics (enabled by the WAI_YOLO_STATS environment variable)
+    _stats: Union[Stats, NullStats] = ProcessState(lambda self: create_stats(type(self).__name__))
 
     def process_element(
             self,
@@ -41,11 +53,25 @@ class FromYOLOOD(
         # Unpack the external format
         image_info, yolo_objects = element
 
-        # Convert YOLO objects to located objects
+        # Wrap the YOLO objects as located objects (negatives have none), which are only
+        # converted if accessed, so ToYOLOOD can write the YOLO objects back unchanged
         located_objects = None
-        if len(yolo_objects) > 0:
-            to_located_object = partial(self.to_located_object, image_width=image_info.width, image_height=image_info.height)
-            located_objects = LocatedObjects(map(to_located_object, yolo_objects))
+        if yolo_objects is not None and len(yolo_objects) > 0:
+            with self._stats.time("convert"):
+                if not isinstance(yolo_objects, YOLOObjectTable):
+                    yolo_objects = YOLOObjectTable.from_objects(yolo_objects)
+                try:
+                    self.labels.validate(yolo_objects.class_indices)
+                except ClassIndexError as e:
+                    raise ClassIndexError(f"{e} (in the annotations of {image_info.filename})") from None
+                located_objects = YOLOLocatedObjects(
+                    table=yolo_objects,
+                    labels=self.labels,
+                    image_width=image_info.width,
+                    image_height=image_info.height
+                )
+            self._stats.count("objects", len(yolo_objects))
+        self._stats.count("images")
 
         then(
             ImageObjectDetectionInstance(
@@ -54,24 +80,32 @@ class FromYOLOOD(
             )
         )
 
-    def read_labels_file(self) -> List[str]:
+    def finish(
+            self,
+            then: ThenFunction[ImageObjectDetectionInstance],
+            done: DoneFunction
+    ):
+        report_stats(self._stats, self.logger)
+        done()
+
+    def read_labels_file(self) -> ClassLabels:
         """
         Parses the labels file if one is given.
 
         :return:
-                    The label mapping.
+                    The label mapping (empty if there's no labels file, so
+                    class indices are used as the labels).
         """
-        # If no label file is given, return an empty mapping
         if self.labels_file is None:
-            return []
+            return ClassLabels()
 
-        # Read and parse the labels file
-        with open(self.labels_file, "r") as labels_file:
-            return [x.strip() for x in labels_file.read().split(",")]
+        return ClassLabels(read_class_names(self.labels_file), self.labels_file)
 
     def to_located_object(self, object: YOLOObject, *, image_width: int, image_height: int) -> LocatedObject:
         """
-        Converts the YOLO object to a located object.
+        Converts a single YOLO object to a located object. Whole images are
+        converted at once (when first accessed) by YOLOLocatedObjects, which
+        gives the same results.
 
         :param object:
                     The YOLO object.
@@ -79,7 +113,7 @@ class FromYOLOOD(
                     The located object.
         """
         # Get the object label (just uses the class index if no mapping is provided)
-        label: str = self.labels[object.class_index] if len(self.labels) > 0 else str(object.class_index)
+        label: str = self.labels[object.class_index]
 
         # Get the boundary co-ordinates
         width = round(object.width * image_width)
@@ -1,5 +1,8 @@
-from functools import partial
-from typing import Dict, Optional
+from argparse import Namespace
+from collections import Counter
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
 
 from wai.annotations.core.component import ProcessorComponent
 from wai.annotations.core.stream import OutputElementType, ThenFunction, DoneFunction
@@ -7,10 +10,26 @@ from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.domain.image.object_detection import ImageObjectDetectionInstance
 from wai.annotations.domain.image.object_detection.util import get_object_label
 
-from wai.common.adams.imaging.locateobjects import LocatedObject
+from wai.common.cli import OptionsList
 from wai.common.cli.options import TypedOption, FlagOption
 
-from .._format import YOLOODFormat, YOLOObject
+from .._format import YOLOODFormat, YOLOObjectTable
+from ..util import (
+    MAX_ARRAY_CLASS_INDEX,
+    ClassLabels,
+    Manifest,
+    NullStats,
+    Stats,
+    YOLOLocatedObjects,
+    box_outlines,
+    create_stats,
+    located_objects_to_yolo,
+    read_label_indices,
+    report_stats,
+    simplify_polygons,
+    write_labels_csv_file,
+    write_labels_file
+)
 
 
 class ToYOLOOD(
@@ -41,8 +60,77 @@ class ToYOLOOD(
         help="Outputs the annotations in polygon format rather than bbox one."
     )
 
+    # Path to an existing labels file/labels CSV file to take the label-index mapping from
+    preload_labels_file: Optional[str] = TypedOption(
+        "--preload-labels",
+        type=str,
+        metavar="PATH",
+        help="Path to a labels file or labels CSV file (e.g. written by a previous conversion) to take the "
+             "class indices from, so they are stable across separate runs"
+    )
+
+    # The manifest to keep the class indices in across incremental conversions
+    labels_manifest_filename: Optional[str] = TypedOption(
+        "--labels-manifest",
+        type=str,
+        metavar="MANIFEST",
+        help="Keeps the class index of each label in this manifest (the one given to --manifest of to-yolo-od), so "
+             "incremental conversions give labels the same class indices as the label files already written"
+    )
+
+    # What to do with labels which aren't in the preloaded mapping
+    unknown_labels: str = TypedOption(
+        "--unknown-labels",
+        type=str,
+        choices=["append", "skip", "error"],
+        default="append",
+        help="What to do with annotations whose label isn't in the preloaded labels: add the label with the "
+             "next class index, skip the annotation, or stop with an error"
+    )
+
+    # The distance polygon vertices may be moved by simplification
+    simplify_tolerance: float = TypedOption(
+        "--simplify-tolerance",
+        type=float,
+        default=0.0,
+        metavar="DISTANCE",
+        help="With polygon format, simplifies the polygons (Douglas-Peucker), removing vertices which lie within "
+             "this distance (in normalised co-ordinates) of the simplified outline"
+    )
+
+    # The maximum number of vertices to keep per polygon
+    max_vertices: Optional[int] = TypedOption(
+        "--max-vertices",
+        type=int,
+        metavar="COUNT",
+        help="With polygon format, keeps at most this many vertices (at least 3) per polygon, dropping the least "
+             "significant to the polygon's shape"
+    )
+
+    # The manifest keeping the class indices, if any
+    _manifest: Optional[Manifest] = ProcessState(
+        lambda self: Manifest(self.labels_manifest_filename) if self.labels_manifest_filename is not None else None
+    )
+
     # Label-index mapping accumulator
-    labels: Dict[str, int] = ProcessState(lambda self: {})
+    labels: Dict[str, int] = ProcessState(lambda self: self.preload_labels())
+
+    # The number of annotations skipped for each unknown label
+    skipped_labels: Counter = ProcessState(lambda self: Counter())
+
+    # The class index for each class index of the labels annotations are passed through from
+    # (-1 for annotations to skip, -2 for labels not seen yet)
+    _class_index_maps: Dict[ClassLabels, np.ndarray] = ProcessState(lambda self: {})
+
+    # The instrumentation statistics (enabled by the WAI_YOLO_STATS environment variable)
+    _stats: Union[Stats, NullStats] = ProcessState(lambda self: create_stats(type(self).__name__))
+
+    def __init__(self, _namespace: Union[Namespace, OptionsList, None] = None, **internal: Any):
+        super().__init__(_namespace, **internal)
+
+        # Without preloaded labels every label is unknown, so every annotation would be rejected/skipped
+        if self.unknown_labels != "append" and self.preload_labels_file is None:
+            raise ValueError(f"--unknown-labels {self.unknown_labels} requires --preload-labels")
 
     def process_element(
             self,
@@ -52,67 +140,299 @@ class ToYOLOOD(
     ):
         image_info, located_objects = element
 
+        self._stats.count("images")
+
         if located_objects is None or len(located_objects) == 0:
-            return then((image_info, tuple()))
+            return then((image_info, YOLOObjectTable.empty()))
+
+        # YOLO annotations read by from-yolo-od, and not accessed since, are written back unchanged
+        if isinstance(located_objects, YOLOLocatedObjects) and located_objects.table is not None:
+            with self._stats.time("pass_through"):
+                yolo_objects = self.pass_through(image_info.filename, located_objects)
+            self._stats.count("objects", len(yolo_objects))
+            return then((image_info, self.simplify(yolo_objects)))
+
+        with self._stats.time("convert"):
+            # Look up the class indices of the whole image, only resolving unknown labels if there are any
+            labels = [get_object_label(located_object) for located_object in located_objects]
+            class_indices = list(map(self.labels.get, labels))
+            if None in class_indices:
+                class_indices = self.resolve_unknown_labels(image_info.filename, labels, class_indices)
+                if None in class_indices:
+                    self.count_skipped(
+                        Counter(label for label, class_index in zip(labels, class_indices) if class_index is None)
+                    )
+                    located_objects = [
+                        located_object
+                        for located_object, class_index in zip(located_objects, class_indices)
+                        if class_index is not None
+                    ]
+                    class_indices = [class_index for class_index in class_indices if class_index is not None]
 
-        to_yolo_object = partial(self.to_yolo_object, image_width=image_info.width, image_height=image_info.height)
-        yolo_objects = tuple(map(to_yolo_object, located_objects))
+            yolo_objects = located_objects_to_yolo(
+                located_objects,
+                class_indices,
+                image_info.width,
+                image_info.height,
+                self.use_polygon_format
+            )
+        self._stats.count("objects", len(located_objects))
 
-        then((image_info, yolo_objects))
+        then((image_info, self.simplify(yolo_objects)))
 
     def finish(self, then: ThenFunction[OutputElementType], done: DoneFunction):
         # Write the labels file
         if self.labels_file is not None:
-            with open(self.labels_file, "w") as labels_file:
-                labels_file.write(",".join(self.labels.keys()))
+            if list(self.labels.values()) != list(range(len(self.labels))):
+                self.logger.warning(
+                    "Preloaded class indices aren't contiguous from 0, so the labels file doesn't match them "
+                    "(use a labels CSV file instead)"
+                )
+            write_labels_file(self.labels_file, self.labels)
 
         # Write the labels CSV file
         if self.labels_csv_file is not None:
-            with open(self.labels_csv_file, "w") as labels_csv_file:
-                labels_csv_file.write("Index,Label")
-                for label, index in self.labels.items():
-                    labels_csv_file.write(f"\n{index},{label}")
+            write_labels_csv_file(self.labels_csv_file, self.labels)
+
+        if len(self.skipped_labels) > 0:
+            self.logger.warning(
+                "Skipped annotations with unknown labels: "
+                + ", ".join(f"{label} ({count})" for label, count in self.skipped_labels.most_common())
+            )
+
+        if self._manifest is not None:
+            self._manifest.close()
+
+        report_stats(self._stats, self.logger)
 
         done()
 
-    def to_yolo_object(self, located_object: LocatedObject, *, image_width: int, image_height: int) -> YOLOObject:
+    def preload_labels(self) -> Dict[str, int]:
+        """
+        Reads the initial label-index mapping from the preloaded labels
+        file, if one is given, and the class indices recorded in the
+        manifest by previous runs, if any.
+
+        :return:
+                    The label mapping.
+        """
+        labels = read_label_indices(self.preload_labels_file) if self.preload_labels_file is not None else {}
+        if self._manifest is None:
+            return labels
+
+        recorded_labels = self._manifest.read_labels()
+        for label, class_index in recorded_labels.items():
+            if labels.setdefault(label, class_index) != class_index:
+                raise ValueError(
+                    f"Label '{label}' has class index {labels[label]} in {self.preload_labels_file}, but "
+                    f"{class_index} in the manifest of the previous conversion"
+                )
+        if len(set(labels.values())) != len(labels):
+            raise ValueError(
+                f"The labels of {self.preload_labels_file} and the manifest of the previous conversion "
+                f"give different labels the same class index"
+            )
+
+        # Preloaded labels the previous runs didn't use are now in use
+        for label, class_index in labels.items():
+            if label not in recorded_labels:
+                self._manifest.record_label(label, class_index)
+
+        return labels
+
+    def simplify(self, yolo_objects: YOLOObjectTable) -> YOLOObjectTable:
+        """
+        Simplifies the polygons of the annotations of an image, if asked to.
+
+        :param yolo_objects:
+                    The annotations.
+        :return:
+                    The annotations with simplified polygons.
         """
-        Converts a single located object into a YOLO object.
-
-        :param located_object:
-                    The located object to convert.
-        :param image_width:
-                    The image width (for normalisation).
-        :param image_height:
-                    The image height (for normalisation).
+        if not self.use_polygon_format or (self.simplify_tolerance == 0 and self.max_vertices is None):
+            return yolo_objects
+
+        with self._stats.time("simplify"):
+            simplified = simplify_polygons(yolo_objects, self.simplify_tolerance, self.max_vertices)
+        self._stats.count("vertices_removed", len(yolo_objects.points) - len(simplified.points))
+
+        return simplified
+
+    def pass_through(self, filename: str, located_objects: YOLOLocatedObjects) -> YOLOObjectTable:
+        """
+        Converts YOLO annotations read by from-yolo-od straight back to YOLO,
+        without converting them to located objects: the co-ordinates are kept
+        as they are (rather than rounded to pixels), and only the class indices
+        are mapped to this converter's labels. In polygon format, the outlines
+        written for boxes are those the conversion gives (on the pixel grid).
+
+        :param filename:
+                    The filename of the image.
+        :param located_objects:
+                    The unconverted located objects, holding the YOLO annotations.
+        :return:
+                    The YOLO annotations.
+        """
+        table = located_objects.table
+        mapped_indices = self.map_class_indices(filename, located_objects.labels, table.class_indices)
+
+        # Drop the annotations with skipped labels
+        is_skipped = mapped_indices < 0
+        if np.any(is_skipped):
+            skipped_indices, counts = np.unique(table.class_indices[is_skipped], return_counts=True)
+            self.count_skipped(dict(zip(located_objects.labels.lookup(skipped_indices), counts.tolist())))
+            kept = np.flatnonzero(~is_skipped)
+            table = table.take(kept)
+            mapped_indices = mapped_indices[kept]
+
+        # Without polygon format, only the boxes are written
+        if not self.use_polygon_format:
+            return YOLOObjectTable(
+                mapped_indices,
+                table.boxes,
+                np.zeros(len(table) + 1, dtype=np.int64),
+                np.empty((0, 2), dtype=np.float64)
+            )
+
+        point_counts = np.diff(table.point_offsets)
+        is_bbox = point_counts == 0
+        if not np.any(is_bbox):
+            return YOLOObjectTable(mapped_indices, table.boxes, table.point_offsets, table.points)
+
+        # Write boxes as their outline (top-left, top-right, bottom-right, bottom-left), with the
+        # same pixel corners as converting them to located objects and back
+        point_counts[is_bbox] = 4
+        point_offsets = np.zeros(len(table) + 1, dtype=np.int64)
+        np.cumsum(point_counts, out=point_offsets[1:])
+        points = np.empty((point_offsets[-1], 2), dtype=np.float64)
+
+        is_polygon = ~is_bbox
+        source_counts = np.diff(table.point_offsets)[is_polygon]
+        points[
+            np.repeat(point_offsets[:-1][is_polygon] - table.point_offsets[:-1][is_polygon], source_counts)
+            + np.arange(len(table.points))
+        ] = table.points
+
+        outlines = box_outlines(table.boxes[is_bbox], located_objects.image_width, located_objects.image_height)
+        points[(point_offsets[:-1][is_bbox, np.newaxis] + np.arange(4)).ravel()] = outlines
+
+        return YOLOObjectTable(mapped_indices, table.boxes, point_offsets, points)
+
+    def map_class_indices(self, filename: str, source_labels: ClassLabels, class_indices: np.ndarray) -> np.ndarray:
+        """
+        Maps the class indices of annotations passed through from another set
+        of labels to class indices of this converter. The mapping is cached, so
+        only labels not seen before are looked up.
+
+        :param filename:
+                    The filename of the image.
+        :param source_labels:
+                    The labels of the class indices.
+        :param class_indices:
+                    The class indices.
+        :return:
+                    The class index of each annotation, or -1 for annotations to skip.
+        """
+        # Malformed (negative or huge) class indices are mapped on their own, rather than sizing the cached mapping
+        if class_indices.min() < 0 or class_indices.max() >= MAX_ARRAY_CLASS_INDEX:
+            unique, first_rows, inverse = np.unique(class_indices, return_index=True, return_inverse=True)
+            order = np.argsort(first_rows)
+            labels = source_labels.lookup(unique[order])
+            resolved = list(map(self.labels.get, labels))
+            if None in resolved:
+                resolved = self.resolve_unknown_labels(filename, labels, resolved)
+            mapped = np.empty(len(unique), dtype=np.int64)
+            mapped[order] = [-1 if class_index is None else class_index for class_index in resolved]
+            return mapped[inverse]
+
+        mapping = self._class_index_maps.get(source_labels, None)
+        size = int(class_indices.max()) + 1
+        if mapping is None or size > len(mapping):
+            start = 0 if mapping is None else len(mapping)
+            extension = np.array(
+                [self.labels.get(label, -2) for label in source_labels.lookup(np.arange(start, size))],
+                dtype=np.int64
+            )
+            mapping = extension if mapping is None else np.concatenate((mapping, extension))
+            self._class_index_maps[source_labels] = mapping
+
+        mapped_indices = mapping[class_indices]
+        if not np.any(mapped_indices == -2):
+            return mapped_indices
+
+        # Resolve the labels not seen before, in the order they appear
+        unseen, first_rows = np.unique(class_indices[mapped_indices == -2], return_index=True)
+        unseen = unseen[np.argsort(first_rows)]
+        labels = source_labels.lookup(unseen)
+        resolved = list(map(self.labels.get, labels))
+        if None in resolved:
+            resolved = self.resolve_unknown_labels(filename, labels, resolved)
+        mapping[unseen] = [-1 if class_index is None else class_index for class_index in resolved]
+
+        return mapping[class_indices]
+
+    def count_skipped(self, counts: Dict[str, int]):
+        """
+        Counts the annotations skipped for having unknown labels.
+
+        :param counts:
+                    The number of annotations skipped for each label.
+        """
+        for label, count in counts.items():
+            self.skipped_labels[label] += count
+            self._stats.count("skipped_objects", count)
+
+    def resolve_unknown_labels(
+            self,
+            filename: str,
+            labels: List[str],
+            class_indices: List[Optional[int]]
+    ) -> List[Optional[int]]:
+        """
+        Applies the unknown-label policy to the labels of an image which
+        aren't in the label mapping.
+
+        :param filename:
+                    The filename of the image.
+        :param labels:
+                    The labels.
+        :param class_indices:
+                    The class index of each label (None for unknown labels).
+        :return:
+                    The class index of each label, or None for labels whose
+                    annotations should be skipped.
+        """
+        if self.unknown_labels == "append":
+            return [
+                self.get_class_index(label) if class_index is None else class_index
+                for label, class_index in zip(labels, class_indices)
+            ]
+
+        if self.unknown_labels == "error":
+            unknown = sorted({label for label, class_index in zip(labels, class_indices) if class_index is None})
+            raise ValueError(
+                f"Unknown label(s) {', '.join(unknown)} in the annotations of {filename} "
+                f"(not in {self.preload_labels_file})"
+            )
+
+        # Skip the annotations with unknown labels
+        return class_indices
+
+    def get_class_index(self, label: str) -> int:
+        """
+        Gets the class index for a label, adding it to the label mapping
+        if it hasn't been seen before.
+
+        :param label:
+                    The label.
         :return:
-                    The YOLO object.
+                    The class index.
         """
-        # Update the label mapping
-        label = get_object_label(located_object)
-        if label not in self.labels:
-            self.labels[label] = len(self.labels)
-        class_index = self.labels[label]
-
-        px = None
-        py = None
-        if self.use_polygon_format:
-            if located_object.has_polygon():
-                px = located_object.get_polygon_x()
-                py = located_object.get_polygon_y()
-            else:
-                l = located_object
-                px = [l.x, l.x + l.width - 1, l.x + l.width - 1, l.x]
-                py = [l.y, l.y, l.y + l.height - 1, l.y + l.height - 1]
-            px = [x / image_width for x in px]
-            py = [y / image_height for y in py]
-
-        return YOLOObject(
-            class_index,
-            (located_object.x + located_object.width / 2) / image_width,
-            (located_object.y + located_object.height / 2) / image_height,
-            located_object.width / image_width,
-            located_object.height / image_height,
-            px,
-            py,
-        )
+        class_index = self.labels.get(label, None)
+        if class_index is None:
+            # Preloaded class indices needn't be contiguous, so take the next one after the largest
+            class_index = max(self.labels.values(), default=-1) + 1
+            self.labels[label] = class_index
+            if self._manifest is not None:
+                self._manifest.record_label(label, class_index)
+        return class_index
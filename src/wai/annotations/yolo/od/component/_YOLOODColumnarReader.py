@@ -0,0 +1,60 @@
+import os
+from typing import Optional
+
+from wai.annotations.core.component.util import AnnotationFileProcessor
+from wai.annotations.core.stream import ThenFunction
+
+from wai.common.cli.options import TypedOption, FlagOption
+
+from .._format import YOLOODFormat
+from ..util import ColumnarDataset, get_images_path
+from ._YOLOODReader import load_image, read_negative
+
+
+class YOLOODColumnarReader(AnnotationFileProcessor[YOLOODFormat]):
+    """
+    Reader of the columnar files written by YOLOODWriter --columnar. The
+    columns are memory-mapped, so each image's annotations are sliced from
+    them without parsing, and the image dimensions are taken from the file
+    table rather than the images.
+    """
+    # The relative path to the data image files from the columnar files
+    relative_path_to_data_images: Optional[str] = TypedOption(
+        "--image-path-rel",
+        type=str,
+        metavar="PATH",
+        help="Relative path to image files from the columnar files"
+    )
+
+    # Whether to defer reading image data until it is needed
+    lazy_images: bool = FlagOption(
+        "--lazy-images",
+        help="Defers reading the image data until it is written"
+    )
+
+    def read_annotation_file(
+            self,
+            filename: str,
+            then: ThenFunction[YOLOODFormat]
+    ):
+        dataset = ColumnarDataset(filename)
+        images_path = get_images_path(dataset.path, self.relative_path_to_data_images)
+
+        for image_filename, image_size, objects in dataset:
+            image_filename = os.path.join(images_path, image_filename)
+
+            # Skip annotations without an image, as YOLOODReader does
+            if not os.path.exists(image_filename):
+                self.logger.warning(
+                    "Failed to locate image for: %s in %s" % (os.path.basename(image_filename), filename)
+                )
+                continue
+
+            then((load_image(image_filename, self.lazy_images, image_size), objects))
+
+    def read_negative_file(
+            self,
+            filename: str,
+            then: ThenFunction[YOLOODFormat]
+    ):
+        then(read_negative(filename, self.lazy_images))
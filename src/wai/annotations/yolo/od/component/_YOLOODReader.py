@@ -1,14 +1,34 @@
 import os
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Deque, Optional, Tuple, Union
 
 from wai.annotations.core.component.util import AnnotationFileProcessor
-from wai.annotations.core.stream import ThenFunction
+from wai.annotations.core.stream import ThenFunction, DoneFunction
+from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.domain.image import Image
-from wai.annotations.domain.image.util import get_associated_image
 
 from wai.common.cli.options import TypedOption, FlagOption
 
-from .._format import YOLOODFormat, YOLOObject
+from .._format import YOLOODFormat
+from ..util import (
+    CachedLabels,
+    ImageIndex,
+    LabelCache,
+    LazyImage,
+    Manifest,
+    NULL_STATS,
+    NullStats,
+    Partition,
+    SourceRecord,
+    Stats,
+    create_stats,
+    make_source_record,
+    read_yolo_label_file,
+    report_stats,
+    set_source_record,
+    stat_label_file
+)
 
 
 class YOLOODReader(AnnotationFileProcessor[YOLOODFormat]):
@@ -29,62 +49,595 @@ class YOLOODReader(AnnotationFileProcessor[YOLOODFormat]):
         help="Reads the annotations in polygon format rather than using auto-detection of bbox or polygon format."
     )
 
+    # Whether to defer reading image data until it is needed
+    lazy_images: bool = FlagOption(
+        "--lazy-images",
+        help="Only reads the image dimensions up-front, deferring reading the image data until it is written"
+    )
+
+    # The number of workers to read files with
+    num_workers: int = TypedOption(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of workers to parse label files and load images with in parallel"
+    )
+
+    # The type of workers to use
+    worker_type: str = TypedOption(
+        "--worker-type",
+        type=str,
+        choices=["process", "thread"],
+        default="process",
+        help="Whether parallel workers are processes, or threads (which suit I/O-bound storage)"
+    )
+
+    # The maximum number of files handed to the workers at once
+    max_in_flight: int = TypedOption(
+        "--max-in-flight",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Maximum number of files handed to the workers at once, beyond which reading waits for the oldest "
+             "(0 for 4 per worker). For high-latency storage, use many thread workers so this many label reads, "
+             "image lookups and image loads are in progress together"
+    )
+
+    # The manifest of previously-converted files, for incremental conversion
+    manifest_filename: Optional[str] = TypedOption(
+        "--incremental",
+        type=str,
+        metavar="MANIFEST",
+        help="Skips label files (and negatives) whose files are unchanged since they were recorded in this "
+             "manifest (written by to-yolo-od --manifest)"
+    )
+
+    # The directory of the persistent parse cache
+    cache_dir: Optional[str] = TypedOption(
+        "--cache-dir",
+        type=str,
+        metavar="DIR",
+        help="Directory to cache parsed label files (and the location and dimensions of their images) in, "
+             "so unchanged files are not re-parsed by later runs"
+    )
+
+    # The maximum size of the parse cache
+    cache_size: int = TypedOption(
+        "--cache-size",
+        type=int,
+        default=1024,
+        metavar="MB",
+        help="Maximum size of the annotations held in the cache, in megabytes (least-recently used "
+             "entries beyond this are evicted)"
+    )
+
+    # The slice of the input files to read
+    shard_index: int = TypedOption(
+        "--shard-index",
+        type=int,
+        default=0,
+        metavar="INDEX",
+        help="Index of the slice of the input files to read (0 to --shard-count - 1), for splitting a "
+             "conversion across machines"
+    )
+
+    # The number of slices to split the input files into
+    shard_count: int = TypedOption(
+        "--shard-count",
+        type=int,
+        default=1,
+        metavar="COUNT",
+        help="Number of disjoint slices to split the input files into, by a stable hash of their path "
+             "relative to the 'labels' (or for negatives, 'images') directory, so each machine of a "
+             "conversion reads a different slice (combine the outputs with yolo-od-merge)"
+    )
+
+    # The pool of workers, if reading in parallel
+    _executor: Optional[Executor] = ProcessState(lambda self: self.create_executor())
+
+    # Whether the pool of workers has been created (so finishing a run which never used it doesn't create it)
+    _executor_created: bool = ProcessState(lambda self: False)
+
+    # The files submitted to the workers, in stream order, with the details to cache their results by
+    _pending: Deque[Tuple[Future, str, Optional[tuple]]] = ProcessState(lambda self: deque())
+
+    # The persistent parse cache, if enabled
+    _label_cache: Optional[LabelCache] = ProcessState(lambda self: self.create_label_cache())
+
+    # The index used to locate the images for label files
+    _image_index: ImageIndex = ProcessState(lambda self: ImageIndex(self.relative_path_to_data_images))
+
+    # The manifest, if converting incrementally
+    _manifest: Optional[Manifest] = ProcessState(
+        lambda self: Manifest(self.manifest_filename) if self.manifest_filename is not None else None
+    )
+
+    # The number of files skipped as unchanged
+    _num_unchanged: int = ProcessState(lambda self: 0)
+
+    # The slice of the input files to read, if split
+    _partition: Optional[Partition] = ProcessState(
+        lambda self: Partition(self.shard_index, self.shard_count)
+        if self.shard_count != 1 or self.shard_index != 0 else None
+    )
+
+    # The instrumentation statistics (enabled by the WAI_YOLO_STATS environment variable)
+    _stats: Union[Stats, NullStats] = ProcessState(lambda self: create_stats(type(self).__name__))
+
+    def process_element(
+            self,
+            element: Tuple[str, bool],
+            then: ThenFunction[YOLOODFormat],
+            done: DoneFunction
+    ):
+        # Skip files in other slices before doing any work on them
+        filename, is_negative = element
+        if self._partition is not None and not self._partition.contains(filename):
+            return
+
+        # Read in-line if not working in parallel
+        if self._executor is None:
+            return super().process_element(element, then, done)
+
+        # Hand the file to the workers
+        job = self.prepare_negative(filename) if is_negative else self.prepare_annotation(filename)
+        if job is None:
+            return
+        function, args, cache_details = job
+        self._pending.append((self._executor.submit(function, *args), filename, cache_details))
+
+        # Forward completed files in order, blocking once too many are in flight
+        max_in_flight = self.max_in_flight if self.max_in_flight > 0 else 4 * self.num_workers
+        while len(self._pending) >= max_in_flight or (len(self._pending) > 0 and self._pending[0][0].done()):
+            self.forward_pending(then)
+
+    def finish(self, then: ThenFunction[YOLOODFormat], done: DoneFunction):
+        # Wait for all in-flight files before finishing
+        while len(self._pending) > 0:
+            self.forward_pending(then)
+
+        if self._executor_created and self._executor is not None:
+            self._executor.shutdown()
+
+        if self._label_cache is not None:
+            self._label_cache.close()
+            self.logger.info(
+                "Parse cache: %d hits, %d misses, %d entries evicted"
+                % (self._label_cache.hits, self._label_cache.misses, self._label_cache.evictions)
+            )
+
+        if self._manifest is not None:
+            self._manifest.close()
+            self.logger.info("Skipped %d files unchanged since the last conversion" % self._num_unchanged)
+
+        if self._partition is not None:
+            self.logger.info(
+                "Read shard %d of %d (skipped %d files in other shards)"
+                % (self._partition.shard_index, self._partition.shard_count, self._partition.num_skipped)
+            )
+
+        self.logger.info(
+            "Image index saved %d filesystem calls (%d directory scans instead of %d existence checks)"
+            % (
+                self._image_index.filesystem_calls_saved,
+                self._image_index.directory_scans,
+                self._image_index.stat_calls_avoided
+            )
+        )
+
+        self._stats.count("directory_scans", self._image_index.directory_scans)
+        report_stats(self._stats, self.logger)
+
+        done()
+
     def read_annotation_file(
             self,
             filename: str,
             then: ThenFunction[YOLOODFormat]
     ):
+        job = self.prepare_annotation(filename)
+        if job is None:
+            return
+        function, args, cache_details = job
+        then(self.cache_result(function(*args), cache_details))
 
-        # Split the filename into path, basename, ext
-        path, basename = os.path.split(filename)
-        basename, extension = os.path.splitext(basename)
-
-        # Use the provided relative path if given, otherwise default to the same
-        # sub-structure from a "labels" directory down in an "images" directory
-        relative_path = self.relative_path_to_data_images
-        if relative_path is None:
-            relative_path = os.path.join("..", "images")
-            abs_path = os.path.abspath(path)
-            path_parts = os.path.split(abs_path)
-            relevant_path_parts = []
-            while abs_path:
-                abs_path, path_part = os.path.split(abs_path)
-                if path_part == "labels":
-                    break
-                relevant_path_parts.append(path_part)
-            if len(relevant_path_parts) == len(path_parts):
-                raise Exception(f"No 'labels' directory found in path of {abs_path}")
-            for path_part in reversed(relevant_path_parts):
-                relative_path = os.path.join("..", relative_path, path_part)
-
-        # Join the path with the relative path to the data-image
-        image_path = os.path.join(path, relative_path)
-
-        # Find the image
-        image_filename = get_associated_image(
-            os.path.join(image_path, basename)
-        )
+    def read_negative_file(
+            self,
+            filename: str,
+            then: ThenFunction[YOLOODFormat]
+    ):
+        job = self.prepare_negative(filename)
+        if job is None:
+            return
+        function, args, _ = job
+        then(function(*args))
+
+    def prepare_annotation(self, filename: str) -> Optional[Tuple[Callable[..., YOLOODFormat], tuple, Optional[tuple]]]:
+        """
+        Works out how to read a label file: from the parse cache if it holds
+        an up-to-date result, otherwise by locating its image and parsing it.
+
+        :param filename:
+                    The label file.
+        :return:
+                    The function to read the file with, its arguments and the
+                    details to cache its result by (if it should be cached), or
+                    None if the file should be skipped.
+        """
+        self._stats.count("label_files")
+
+        # Use the cached result if the files haven't changed
+        cached_labels = None
+        if self._label_cache is not None:
+            with self._stats.time("cache_lookup"):
+                cached_labels = self._label_cache.get(filename)
+        if cached_labels is not None:
+            source_record = self.get_changed_source_record(filename, cached_labels.image_path)
+            if source_record is False:
+                return None
+            return read_cached_annotation, (cached_labels, self.lazy_images, source_record, self.worker_stats), None
 
+        # Without the cache or manifest, which need the image beforehand, thread workers also locate it
+        if self._label_cache is None and self._manifest is None and self.uses_thread_workers:
+            return (
+                locate_and_read_annotation,
+                (filename, self._image_index, self.use_polygon_format, self.lazy_images, self.worker_stats),
+                None
+            )
+
+        with self._stats.time("locate_image"):
+            image_filename = self.locate_image(filename)
         if image_filename is None:
+            return None
+
+        source_record = self.get_changed_source_record(filename, image_filename)
+        if source_record is False:
+            return None
+
+        # Take the state of the files before they are read, so changes while reading invalidate the entry
+        cache_details = None
+        if self._label_cache is not None:
+            stat = stat_label_file(filename, image_filename)
+            self._stats.count("stat_calls", 2)
+            if stat is not None:
+                cache_details = (filename, image_filename, stat)
+
+        return (
+            read_annotation,
+            (filename, image_filename, self.use_polygon_format, self.lazy_images, source_record, self.worker_stats),
+            cache_details
+        )
+
+    def prepare_negative(self, filename: str) -> Optional[Tuple[Callable[..., YOLOODFormat], tuple, None]]:
+        """
+        Works out how to read a negative image.
+
+        :param filename:
+                    The image file.
+        :return:
+                    The function to read the image with, its arguments and None
+                    (negatives aren't cached), or None if the image should be skipped.
+        """
+        self._stats.count("negative_files")
+
+        source_record = self.get_changed_source_record(filename)
+        if source_record is False:
+            return None
+
+        return read_negative, (filename, self.lazy_images, source_record, self.worker_stats), None
+
+    def forward_pending(self, then: ThenFunction[YOLOODFormat]):
+        """
+        Waits for the oldest file submitted to the workers, and forwards its result.
+
+        :param then:
+                    The function to forward the result to.
+        """
+        future, filename, cache_details = self._pending.popleft()
+        with self._stats.time("wait_for_workers"):
+            result = future.result()
+
+        # Images located by the workers may be missing
+        if result is None:
             self.logger.warning("Failed to locate image for: %s" % filename)
             return
 
-        # Read the YOLO annotations
-        objects = []
-        with open(filename, "r") as file:
-            for line in file.readlines():
-                objects.append(YOLOObject.from_string(line, use_polygon_format=self.use_polygon_format))
+        then(self.cache_result(result, cache_details))
 
-        # Read the image
-        image = Image.from_file(image_filename)
+    def cache_result(self, result: YOLOODFormat, cache_details: Optional[tuple]) -> YOLOODFormat:
+        """
+        Adds the result of reading a label file to the parse cache.
 
-        then((image, tuple(objects)))
+        :param result:
+                    The image and annotations read from the label file.
+        :param cache_details:
+                    The label file, image file and their state before reading,
+                    or None if the result shouldn't be cached.
+        :return:
+                    The result.
+        """
+        if cache_details is not None:
+            filename, image_filename, stat = cache_details
+            image, objects = result
+            self._label_cache.put(filename, stat, CachedLabels(image_filename, image.size, objects))
 
-    def read_negative_file(
+        return result
+
+    def create_label_cache(self) -> Optional[LabelCache]:
+        """
+        Opens the persistent parse cache.
+
+        :return:
+                    The cache, or None if not caching.
+        """
+        if self.cache_dir is None:
+            return None
+
+        # Cached results depend on how label files are parsed and images located
+        return LabelCache(
+            self.cache_dir,
+            self.cache_size * 1024 * 1024,
+            f"use_polygon_format={bool(self.use_polygon_format)};image_path_rel={self.relative_path_to_data_images}"
+        )
+
+    @property
+    def uses_thread_workers(self) -> bool:
+        """
+        Whether files are read by a pool of threads.
+        """
+        return self._executor is not None and self.worker_type == "thread"
+
+    @property
+    def worker_stats(self) -> Union[Stats, NullStats]:
+        """
+        The statistics for the reading functions to record their sub-steps in.
+        Worker processes can't update the statistics of the main process, so
+        their time is only recorded as the time spent waiting for them.
+        """
+        if self._executor is not None and self.worker_type == "process":
+            return NULL_STATS
+
+        return self._stats
+
+    def create_executor(self) -> Optional[Executor]:
+        """
+        Creates the pool of workers to read with.
+
+        :return:
+                    The executor, or None if reading in-line.
+        """
+        if self.num_workers <= 1:
+            return None
+
+        self._executor_created = True
+
+        if self.worker_type == "thread":
+            return ThreadPoolExecutor(self.num_workers)
+
+        return ProcessPoolExecutor(self.num_workers)
+
+    def get_changed_source_record(
             self,
             filename: str,
-            then: ThenFunction[YOLOODFormat]
-    ):
-        image_info = Image.from_file(filename)
+            image_filename: Optional[str] = None
+    ) -> Union[SourceRecord, None, bool]:
+        """
+        Records the current state of an input file (and its image) when converting
+        incrementally, checking it against the manifest.
+
+        :param filename:
+                    The label file (or image, for negatives).
+        :param image_filename:
+                    The image associated with the label file, if any.
+        :return:
+                    The source record, False if the files are unchanged since they
+                    were last converted (and so should be skipped), or None if not
+                    converting incrementally.
+        """
+        if self._manifest is None:
+            return None
+
+        with self._stats.time("manifest_check"):
+            source_record = make_source_record(filename, image_filename)
+            unchanged = self._manifest.is_unchanged(source_record)
+        self._stats.count("stat_calls", 1 if image_filename is None else 2)
+
+        if unchanged:
+            self._num_unchanged += 1
+            return False
+
+        return source_record
+
+    def locate_image(self, filename: str) -> Optional[str]:
+        """
+        Locates the image for a label file, warning if it can't be found.
+
+        :param filename:
+                    The label file.
+        :return:
+                    The image filename, or None if it couldn't be found.
+        """
+        image_filename = self._image_index.locate_image(filename)
+
+        if image_filename is None:
+            self.logger.warning("Failed to locate image for: %s" % filename)
+
+        return image_filename
+
+
+def read_annotation(
+        filename: str,
+        image_filename: str,
+        use_polygon_format: bool = False,
+        lazy_images: bool = False,
+        source_record: Optional[SourceRecord] = None,
+        stats: Union[Stats, NullStats] = NULL_STATS
+) -> YOLOODFormat:
+    """
+    Reads a YOLO label file and its associated image. Defined at module-level
+    so it can be run by worker processes.
+
+    :param filename:
+                The label file.
+    :param image_filename:
+                The image associated with the label file.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :param lazy_images:
+                Whether to defer reading the image data until it is needed.
+    :param source_record:
+                The source record to attach to the image, if any.
+    :param stats:
+                The statistics to record the sub-steps in.
+    :return:
+                The image and its annotations.
+    """
+    # Read the YOLO annotations
+    with stats.time("parse_labels"):
+        objects = read_yolo_label_file(filename, use_polygon_format)
+    stats.count("objects", len(objects))
+    if stats is not NULL_STATS:
+        stats.count("label_bytes_read", os.path.getsize(filename))
+
+    # Read the image
+    with stats.time("load_image"):
+        image = load_image(image_filename, lazy_images)
+    count_image_bytes_read(image, stats)
+    if source_record is not None:
+        set_source_record(image, source_record)
+
+    return image, objects
+
+
+def locate_and_read_annotation(
+        filename: str,
+        image_index: ImageIndex,
+        use_polygon_format: bool = False,
+        lazy_images: bool = False,
+        stats: Union[Stats, NullStats] = NULL_STATS
+) -> Optional[YOLOODFormat]:
+    """
+    Locates the image of a YOLO label file, and reads them both. Used by
+    thread workers, so the image lookups of many files are in progress at
+    once along with their reads.
+
+    :param filename:
+                The label file.
+    :param image_index:
+                The index to locate the image with.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :param lazy_images:
+                Whether to defer reading the image data until it is needed.
+    :param stats:
+                The statistics to record the sub-steps in.
+    :return:
+                The image and its annotations, or None if the image couldn't be found.
+    """
+    with stats.time("locate_image"):
+        image_filename = image_index.locate_image(filename)
+    if image_filename is None:
+        return None
+
+    return read_annotation(filename, image_filename, use_polygon_format, lazy_images, None, stats)
+
+
+def read_cached_annotation(
+        cached_labels: CachedLabels,
+        lazy_images: bool = False,
+        source_record: Optional[SourceRecord] = None,
+        stats: Union[Stats, NullStats] = NULL_STATS
+) -> YOLOODFormat:
+    """
+    Reads the image of a label file whose annotations were found in the parse
+    cache. Defined at module-level so it can be run by worker processes.
+
+    :param cached_labels:
+                The cached result of reading the label file.
+    :param lazy_images:
+                Whether to defer reading the image data until it is needed.
+    :param source_record:
+                The source record to attach to the image, if any.
+    :param stats:
+                The statistics to record the sub-steps in.
+    :return:
+                The image and its annotations.
+    """
+    stats.count("objects", len(cached_labels.objects))
+
+    with stats.time("load_image"):
+        image = load_image(cached_labels.image_path, lazy_images, cached_labels.image_size)
+    count_image_bytes_read(image, stats)
+    if source_record is not None:
+        set_source_record(image, source_record)
+
+    return image, cached_labels.objects
+
+
+def read_negative(
+        filename: str,
+        lazy_images: bool = False,
+        source_record: Optional[SourceRecord] = None,
+        stats: Union[Stats, NullStats] = NULL_STATS
+) -> YOLOODFormat:
+    """
+    Reads a negative image (one without annotations).
+
+    :param filename:
+                The image file.
+    :param lazy_images:
+                Whether to defer reading the image data until it is needed.
+    :param source_record:
+                The source record to attach to the image, if any.
+    :param stats:
+                The statistics to record the sub-steps in.
+    :return:
+                The image without annotations.
+    """
+    with stats.time("load_image"):
+        image = load_image(filename, lazy_images)
+    count_image_bytes_read(image, stats)
+    if source_record is not None:
+        set_source_record(image, source_record)
+
+    return image, None
+
+
+def count_image_bytes_read(image: Image, stats: Union[Stats, NullStats]):
+    """
+    Counts the image data read from disk (none for lazy images, whose data
+    is read later, if at all).
+
+    :param image:
+                The loaded image.
+    :param stats:
+                The statistics to count the data in.
+    """
+    if not isinstance(image, LazyImage) and image.data is not None:
+        stats.count("image_bytes_read", len(image.data))
+
+
+def load_image(filename: str, lazy: bool = False, size: Optional[Tuple[int, int]] = None) -> Image:
+    """
+    Loads an image from disk.
+
+    :param filename:
+                The image file.
+    :param lazy:
+                Whether to only read the image dimensions, deferring reading
+                the image data until it is needed.
+    :param size:
+                The known dimensions of the image, if any, which saves
+                reading them from the image.
+    :return:
+                The image.
+    """
+    if lazy:
+        return LazyImage(filename, size=size)
+
+    if size is not None:
+        with open(filename, "rb") as file:
+            return Image(filename, file.read(), None, size)
 
-        then((image_info, None))
+    return Image.from_file(filename)
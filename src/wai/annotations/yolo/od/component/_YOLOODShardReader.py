@@ -0,0 +1,49 @@
+from typing import Optional
+
+from wai.annotations.core.component.util import AnnotationFileProcessor
+from wai.annotations.core.stream import ThenFunction
+from wai.annotations.domain.image import Image
+
+from wai.common.cli.options import FlagOption
+
+from .._format import YOLOODFormat, YOLOObjectTable
+from ..util import iterate_shard, parse_yolo_table, split_label_lines
+from ._YOLOODReader import read_negative
+
+
+class YOLOODShardReader(AnnotationFileProcessor[YOLOODFormat]):
+    """
+    Reader of YOLO object-detection shards written by YOLOODShardWriter.
+    """
+    # whether to output polygon format rather than bbox one
+    use_polygon_format: Optional[bool] = FlagOption(
+        "-p", "--use-polygon-format",
+        help="Reads the annotations in polygon format rather than using auto-detection of bbox or polygon format."
+    )
+
+    def read_annotation_file(
+            self,
+            filename: str,
+            then: ThenFunction[YOLOODFormat]
+    ):
+        for key, image_name, image_data, label_data in iterate_shard(filename):
+            # Skip annotations without an image, as YOLOODReader does
+            if image_data is None:
+                self.logger.warning("Failed to locate image for: %s in %s" % (key, filename))
+                continue
+
+            # Images without a label entry are negatives
+            objects = (
+                parse_yolo_table(split_label_lines(label_data.decode()), self.use_polygon_format)
+                if label_data is not None
+                else YOLOObjectTable.empty()
+            )
+
+            then((Image(image_name, image_data), objects))
+
+    def read_negative_file(
+            self,
+            filename: str,
+            then: ThenFunction[YOLOODFormat]
+    ):
+        then(read_negative(filename))
@@ -0,0 +1,160 @@
+import os
+import tarfile
+from argparse import Namespace
+from typing import Any, Optional, Union
+
+from wai.annotations.core.component.util import (
+    SeparateFileWriter,
+    SplitSink,
+    SplitState,
+    ExpectsDirectory
+)
+from wai.annotations.domain.image import Image
+
+from wai.common.cli import OptionsList
+from wai.common.cli.options import TypedOption
+
+from .._format import YOLOODFormat
+from ..util import (
+    LazyImage,
+    LABELS_EXTENSION,
+    add_shard_bytes,
+    add_shard_entry,
+    format_shard_filename,
+    format_yolo_labels
+)
+
+
+class YOLOODShardWriter(
+    ExpectsDirectory,
+    SeparateFileWriter[YOLOODFormat],
+    SplitSink[YOLOODFormat]
+):
+    """
+    Writer of YOLO files into sequential tar shards. Each image is stored
+    beside its label file, under the names they would have in the
+    'images' and 'labels' directories written by YOLOODWriter.
+    """
+    # The maximum number of images in each shard
+    shard_size: int = TypedOption(
+        "--shard-size",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="Maximum number of images to write to each shard"
+    )
+
+    # The prefix of the shard filenames
+    shard_prefix: str = TypedOption(
+        "--shard-prefix",
+        type=str,
+        default="shard",
+        metavar="PREFIX",
+        help="Prefix of the shard filenames, which are numbered sequentially (PREFIX-000000.tar, ...)"
+    )
+
+    # The number of decimal places to write co-ordinates with
+    precision: Optional[int] = TypedOption(
+        "--precision",
+        type=int,
+        metavar="DIGITS",
+        help="Number of decimal places to write co-ordinates with (smaller files). "
+             "Default is full precision for bounding-boxes and 6 places for polygons"
+    )
+
+    # The shard currently being written for each split
+    _shard: Optional[tarfile.TarFile] = SplitState(lambda self: None)
+
+    # The index of the current shard for each split
+    _shard_index: int = SplitState(lambda self: -1)
+
+    # The number of images written to the current shard for each split
+    _shard_image_count: int = SplitState(lambda self: 0)
+
+    def __init__(self, _namespace: Union[Namespace, OptionsList, None] = None, **internal: Any):
+        super().__init__(_namespace, **internal)
+
+        # Samples are keyed by their image entry, so shards without images can't be read back
+        if self.annotations_only:
+            raise ValueError(
+                "--annotations-only can't be used with to-yolo-od-shards, as from-yolo-od-shards needs "
+                "the image of each sample (e.g. for its size); use to-yolo-od --annotations-only instead"
+            )
+
+    def consume_element_for_split(
+            self,
+            element: YOLOODFormat
+    ):
+        # Unpack the instance
+        image_info, yolo_objects = element
+
+        shard = self.get_shard()
+
+        # Write the image
+        self.write_image_entry(shard, image_info)
+
+        # Write the annotations, skipping negatives as YOLOODWriter does
+        if len(yolo_objects) > 0:
+            add_shard_bytes(
+                shard,
+                f"{os.path.splitext(image_info.filename)[0]}{LABELS_EXTENSION}",
+                format_yolo_labels(yolo_objects, self.precision).encode()
+            )
+
+        self._shard_image_count += 1
+
+    def finish_split(self):
+        self.close_shard()
+
+    @classmethod
+    def get_help_text_for_output_option(cls) -> str:
+        return "output directory to write the shards to"
+
+    def get_shard(self) -> tarfile.TarFile:
+        """
+        Gets the shard to write the next image to for the current split,
+        starting a new shard if the current one is full.
+
+        :return:
+                    The shard.
+        """
+        if self._shard is not None and self._shard_image_count >= self.shard_size:
+            self.close_shard()
+
+        if self._shard is None:
+            self._shard_index += 1
+            self._shard_image_count = 0
+            self._shard = tarfile.open(
+                os.path.join(
+                    self.get_split_path(self.split_label, self.output_path),
+                    format_shard_filename(self.shard_prefix, self._shard_index)
+                ),
+                "w"
+            )
+
+        return self._shard
+
+    def close_shard(self):
+        """
+        Closes the current shard of the current split, if one is open.
+        """
+        if self._shard is not None:
+            self._shard.close()
+            self._shard = None
+
+    @staticmethod
+    def write_image_entry(shard: tarfile.TarFile, image_info: Image):
+        """
+        Writes an image into a shard, streaming it from its source file if
+        it hasn't been read into memory.
+
+        :param shard:
+                    The shard to write to.
+        :param image_info:
+                    The image.
+        """
+        if isinstance(image_info, LazyImage) and not image_info.is_loaded:
+            with open(image_info.source_path, "rb") as file:
+                add_shard_entry(shard, image_info.filename, file, os.fstat(file.fileno()).st_size)
+        elif image_info.data is not None:
+            add_shard_bytes(shard, image_info.filename, image_info.data)
@@ -1,49 +1,687 @@
 import os
-from functools import partial
+import threading
+from argparse import Namespace
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
 
 from wai.annotations.core.component.util import (
     SeparateFileWriter,
     SplitSink,
     SplitState,
-    ExpectsDirectory,
-    RequiresNoSplitFinalisation
+    ExpectsDirectory
 )
+from wai.annotations.core.domain import Data
+from wai.annotations.core.stream.util import ProcessState
+from wai.annotations.domain.image import Image, ImageFormat
+
+from wai.common.cli import OptionsList
+from wai.common.cli.options import FlagOption, TypedOption
 
-from .._format import YOLOODFormat
+from .._format import YOLOODFormat, YOLOObject
+from ..util import (
+    BackgroundWriter,
+    ColumnarWriter,
+    DEDUP_POLICIES,
+    FirstCopy,
+    HashCache,
+    LazyImage,
+    LINK_MODES,
+    Manifest,
+    NULL_STATS,
+    NullStats,
+    Stats,
+    create_stats,
+    format_yolo_labels,
+    get_resized_size,
+    get_source_record,
+    hash_data,
+    hash_file,
+    link_file,
+    merge_label_lines,
+    report_stats,
+    resize_image,
+    set_source_record
+)
 
 
 class YOLOODWriter(
     ExpectsDirectory,
-    RequiresNoSplitFinalisation,
     SeparateFileWriter[YOLOODFormat],
     SplitSink[YOLOODFormat]
 ):
     """
     Writer of YOLO files.
     """
+    # How to materialise the images in the output directory
+    link_mode: str = TypedOption(
+        "--link-mode",
+        type=str,
+        choices=list(LINK_MODES),
+        default="copy",
+        help="How to write images whose source file is known (i.e. read with --lazy-images). "
+             "Modes other than 'copy' avoid copying the data, falling back to copying where unsupported"
+    )
+
+    # The number of background threads to write files with
+    writer_threads: int = TypedOption(
+        "--writer-threads",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Number of background threads to write image and label files with (0 writes them in-line)"
+    )
+
+    # The number of decimal places to write co-ordinates with
+    precision: Optional[int] = TypedOption(
+        "--precision",
+        type=int,
+        metavar="DIGITS",
+        help="Number of decimal places to write co-ordinates with (smaller files). "
+             "Default is full precision for bounding-boxes and 6 places for polygons"
+    )
+
+    # The manifest to record the converted input files in
+    manifest_filename: Optional[str] = TypedOption(
+        "--manifest",
+        type=str,
+        metavar="MANIFEST",
+        help="Records the input files of each written image in this manifest, so they can be skipped by "
+             "from-yolo-od --incremental the next time the conversion is run. Also records the split of each "
+             "file, which later runs reuse (give it to --labels-manifest too, to keep the class indices). Can't be "
+             "used with --columnar"
+    )
+
+    # Whether to also write the annotations of each split as columnar files
+    columnar: bool = FlagOption(
+        "--columnar",
+        help="Also writes the annotations of each split to memory-mappable columnar NumPy files "
+             "(yolo.*.npy in the labels directory), which from-yolo-od-columnar reads without parsing"
+    )
+
+    # The maximum length of the longest side of the written images
+    max_size: Optional[int] = TypedOption(
+        "--max-size",
+        type=int,
+        metavar="PIXELS",
+        help="Scales images down (keeping their aspect ratio) so their longest side is at most this many "
+             "pixels. The annotations are normalised, so they stay valid"
+    )
+
+    # The format to write the images in
+    image_format: Optional[str] = TypedOption(
+        "--format",
+        type=str,
+        choices=[image_format.name.lower() for image_format in ImageFormat],
+        help="Re-encodes images which aren't in this format (changing their extension)"
+    )
+
+    # The quality of JPEG encoding
+    quality: int = TypedOption(
+        "--quality",
+        type=int,
+        default=90,
+        metavar="QUALITY",
+        help="Quality (1 to 95) of images encoded as JPEG by --max-size/--format"
+    )
+
+    # The number of processes to scale/re-encode images with
+    resize_workers: int = TypedOption(
+        "--resize-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Number of processes to decode, scale and encode images with for --max-size/--format "
+             "(0 for one per CPU, 1 to do it in-line)"
+    )
+
+    # How to write images whose content is the same as an image already written
+    dedup: Optional[str] = TypedOption(
+        "--dedup",
+        type=str,
+        choices=list(DEDUP_POLICIES),
+        help="Writes each distinct image (by content) once, in the split it is first seen in. Later copies in "
+             "the same split are linked to it with their own annotations ('link': hard-links, or --link-mode if "
+             "symlink/reflink), left out ('skip'), or left out with their annotations added to the first copy's "
+             "('merge'). Copies in other splits are always left out, so splits don't share images"
+    )
+
+    # The cache of the content hashes of image files
+    dedup_cache: Optional[str] = TypedOption(
+        "--dedup-cache",
+        type=str,
+        metavar="FILE",
+        help="SQLite file caching the content hashes of image files for --dedup (by path, modification time "
+             "and size), so unchanged files aren't read to hash them the next time the conversion is run"
+    )
+
     labels_split_path: str = SplitState(lambda self: self.split_path("labels"))
     images_split_path: str = SplitState(lambda self: self.split_path("images"))
 
+    # The writer of the columnar files of each split, if enabled
+    _columnar_writer: Optional[ColumnarWriter] = SplitState(
+        lambda self: ColumnarWriter(self.labels_split_path) if self.columnar else None
+    )
+
+    # The number of images written with each link mode
+    _link_mode_counts: Counter = ProcessState(lambda self: Counter())
+    _link_mode_counts_lock: threading.Lock = ProcessState(lambda self: threading.Lock())
+
+    # The background writer, if writing files asynchronously
+    _background_writer: Optional[BackgroundWriter] = ProcessState(
+        lambda self: BackgroundWriter(self.writer_threads) if self.writer_threads > 0 else None
+    )
+
+    # The manifest, if recording the converted input files
+    _manifest: Optional[Manifest] = ProcessState(
+        lambda self: Manifest(self.manifest_filename) if self.manifest_filename is not None else None
+    )
+
+    # The pool of processes scaling/re-encoding images, if in parallel
+    _resize_executor: Optional[ProcessPoolExecutor] = ProcessState(lambda self: self.create_resize_executor())
+
+    # The images being scaled/re-encoded, in stream order, with the details to write them with
+    _pending_images: Deque[Tuple[Future, Image, str, Optional[str], Optional[str]]] = ProcessState(
+        lambda self: deque()
+    )
+
+    # The cache of the content hashes of image files, if deduplicating with one
+    _hash_cache: Optional[HashCache] = ProcessState(
+        lambda self: HashCache(self.dedup_cache) if self.dedup is not None and self.dedup_cache is not None else None
+    )
+
+    # Where the first copy of each distinct image was written, by content hash
+    _first_copies: Dict[str, FirstCopy] = ProcessState(lambda self: {})
+
+    # The duplicate images, written once the first copies are: the content hash, the image,
+    # the image file to link and label file to write (if linked), and the annotations
+    _duplicates: List[Tuple[str, Image, Optional[str], Optional[str], Optional[str]]] = ProcessState(
+        lambda self: []
+    )
+
+    # The numbers of duplicate images, those in another split to their first copy, and the bytes not written
+    _dedup_counts: Counter = ProcessState(lambda self: Counter())
+
+    # The instrumentation statistics (enabled by the WAI_YOLO_STATS environment variable)
+    _stats: Union[Stats, NullStats] = ProcessState(lambda self: create_stats(type(self).__name__))
+
+    def __init__(self, _namespace: Union[Namespace, OptionsList, None] = None, **internal: Any):
+        super().__init__(_namespace, **internal)
+
+        # Incremental runs only convert the changed files, so they would replace the columnar files of
+        # the whole dataset with those of the changed files
+        if self.columnar and self.manifest_filename is not None:
+            raise ValueError(
+                "--columnar can't be used with --manifest, as incremental conversions would rewrite the "
+                "columnar files with only the changed files"
+            )
+
+        if self.dedup == "merge" and self.columnar:
+            raise ValueError(
+                "--dedup merge can't be used with --columnar, as the annotations of the first copy "
+                "are already in the columnar files when its duplicates are merged into it"
+            )
+
+    def consume_element(self, element: YOLOODFormat):
+        # Only needed when splitting, as otherwise every file is written to the same place
+        source_record = get_source_record(element[0]) if self._manifest is not None and self.is_splitting else None
+        if source_record is None:
+            return super().consume_element(element)
+
+        # Files written by a previous run are written to the same split again, so their outputs are
+        # replaced rather than left behind in another split
+        split = self._manifest.get_split(source_record.source_path)
+        if split is None:
+            self._manifest.record_split(source_record.source_path, self.split_label)
+            return super().consume_element(element)
+
+        if split not in self.split_table:
+            raise ValueError(
+                f"{source_record.source_path} was written to split '{split}' by a previous conversion, "
+                f"which isn't one of --split-names"
+            )
+
+        # Write to the recorded split without moving the other files on to their next split
+        split_index = self.split_index
+        self.split_index = self.split_schedule.index(split)
+        try:
+            self.consume_element_for_split_with_exit_stack(element)
+        finally:
+            self.split_index = split_index
+
     def consume_element_for_split(
             self,
             element: YOLOODFormat
     ):
         # Unpack the instance
         image_info, yolo_objects = element
+        self._stats.count("images")
+
+        # Work out how the image is written, if it is scaled or re-encoded
+        output_image = self.get_output_image(image_info)
+
+        # Format the filename
+        labels_filename = os.path.join(self.labels_split_path, f"{os.path.splitext(image_info.filename)[0]}.txt")
+
+        # Leave copies of images already written to be handled once the first copy is written
+        if self.dedup is not None and self.defer_duplicate(image_info, output_image, yolo_objects, labels_filename):
+            return
 
-        # Write the image
-        self.write_data_file(image_info, self.images_split_path)
+        # Add the image (including negatives) to the columnar files
+        if self._columnar_writer is not None:
+            self._columnar_writer.append(output_image.filename, output_image.size, yolo_objects)
 
         # If the image is a negative, skip writing the annotations
         if len(yolo_objects) == 0:
+            self.write_image(image_info, output_image, self.images_split_path, None, None)
             return
 
-        # Format the filename
-        labels_filename = f"{os.path.splitext(image_info.filename)[0]}.txt"
+        # Format the annotations
+        with self._stats.time("format_labels"):
+            labels_text = format_yolo_labels(yolo_objects, self.precision)
+        self._stats.count("objects", len(yolo_objects))
+
+        # Write the image and annotations file
+        self.write_image(image_info, output_image, self.images_split_path, labels_filename, labels_text)
+
+    def defer_duplicate(
+            self,
+            image_info: Image,
+            output_image: Image,
+            yolo_objects: Sequence[YOLOObject],
+            labels_filename: str
+    ) -> bool:
+        """
+        Records where the first copy of each distinct image is written, and
+        sets aside later copies to be written (according to the dedup policy)
+        once all first copies have been.
+
+        :param image_info:
+                    The image.
+        :param output_image:
+                    The details the image is written with (from get_output_image).
+        :param yolo_objects:
+                    The annotations of the image.
+        :param labels_filename:
+                    The label file of the image.
+        :return:
+                    Whether the image is a duplicate (and so shouldn't be written now).
+        """
+        with self._stats.time("hash_image"):
+            digest = self.hash_image(image_info)
+
+        # Images without data can't be compared
+        if digest is None:
+            return False
+
+        image_filename = os.path.join(self.images_split_path, output_image.filename)
+        first_copy = self._first_copies.get(digest)
+        if first_copy is None:
+            self._first_copies[digest] = FirstCopy(self.split_label, image_filename, labels_filename)
+            return False
+
+        self._dedup_counts["duplicates"] += 1
+        if first_copy.split != self.split_label:
+            self._dedup_counts["other_split"] += 1
+
+        # Only copies in the same split as the first (and with a different filename to it) are linked
+        linked = (
+            self.dedup == "link"
+            and first_copy.split == self.split_label
+            and image_filename != first_copy.image_filename
+        )
+        if linked and self._columnar_writer is not None:
+            self._columnar_writer.append(output_image.filename, output_image.size, yolo_objects)
+
+        # The annotations of duplicates which aren't linked or merged aren't written anywhere
+        if not linked and self.dedup != "merge" and len(yolo_objects) > 0:
+            self._dedup_counts["dropped_objects"] += len(yolo_objects)
+            if self.dedup == "link":
+                self.logger.warning(
+                    f"Left out {image_info.filename} and its {len(yolo_objects)} annotations, as its image "
+                    f"is the same as {first_copy.image_filename}"
+                )
+
+        labels_text = None
+        if len(yolo_objects) > 0 and (linked or self.dedup == "merge"):
+            with self._stats.time("format_labels"):
+                labels_text = format_yolo_labels(yolo_objects, self.precision)
+
+        self._duplicates.append((
+            digest,
+            image_info,
+            image_filename if linked else None,
+            labels_filename if linked and labels_text is not None else None,
+            labels_text
+        ))
+
+        return True
+
+    def hash_image(self, image_info: Image) -> Optional[str]:
+        """
+        Gets the content hash of an image, reading images not already in
+        memory from their source file in chunks (or getting the hash from
+        the cache, if enabled).
+
+        :param image_info:
+                    The image.
+        :return:
+                    The hex digest of the content, or None if the image has no data.
+        """
+        if isinstance(image_info, LazyImage) and not image_info.is_loaded:
+            if self._hash_cache is not None:
+                return self._hash_cache.hash_file(image_info.source_path)
+            return hash_file(image_info.source_path)
+
+        return hash_data(image_info.data) if image_info.data is not None else None
+
+    def write_duplicates(self):
+        """
+        Writes the duplicate images according to the dedup policy, once the
+        first copies they refer to have been written.
+        """
+        # Duplicates are never copied, so hard-link them unless symbolic/reflinks were asked for
+        link_mode = self.link_mode if self.link_mode in ("symlink", "reflink") else "hardlink"
+
+        for digest, image_info, image_filename, labels_filename, labels_text in self._duplicates:
+            first_copy = self._first_copies[digest]
+            saved = True
+
+            if image_filename is not None and not self.annotations_only:
+                used_link_mode = link_file(first_copy.image_filename, image_filename, link_mode)
+                self._link_mode_counts[used_link_mode] += 1
+                saved = used_link_mode != "copy"
+                self._dedup_counts["linked"] += 1
+
+            if labels_filename is not None:
+                write_text_file(labels_filename, labels_text)
+            elif self.dedup == "merge" and labels_text is not None:
+                text = ""
+                if os.path.exists(first_copy.labels_filename):
+                    with open(first_copy.labels_filename, "r") as file:
+                        text = file.read()
+                write_text_file(first_copy.labels_filename, merge_label_lines(text, labels_text))
+                self._dedup_counts["merged"] += 1
+
+            if saved and not self.annotations_only:
+                self._dedup_counts["bytes_saved"] += get_data_file_size(image_info)
+
+            if self._manifest is not None:
+                source_record = get_source_record(image_info)
+                if source_record is not None:
+                    self._manifest.record(source_record)
+
+    def get_output_image(self, image_info: Image) -> Image:
+        """
+        Works out the filename, format and size an image is written with.
+
+        :param image_info:
+                    The image.
+        :return:
+                    The image itself if it is written unchanged (or not at all),
+                    otherwise an image (without data) with the details it is
+                    written with.
+        """
+        if self.annotations_only or (self.max_size is None and self.image_format is None):
+            return image_info
+
+        # Images without data (or a source file to read it from) aren't written, as before
+        if not isinstance(image_info, LazyImage) and image_info.data is None:
+            return image_info
+
+        image_format = ImageFormat[self.image_format.upper()] if self.image_format is not None else image_info.format
+        size = get_resized_size(image_info.size, self.max_size) if image_info.width > 0 else image_info.size
+        if image_format is image_info.format and size == image_info.size:
+            return image_info
 
-        # Write the annotations file
-        with open(os.path.join(self.labels_split_path, labels_filename), "w") as labels_file:
-            labels_file.write("\n".join(map(str, yolo_objects)))
+        filename = image_info.filename
+        if image_format is not image_info.format:
+            filename = image_format.replace_extension(filename)
+
+        return Image(filename, None, image_format, size)
+
+    def write_image(
+            self,
+            image_info: Image,
+            output_image: Image,
+            images_path: str,
+            labels_filename: Optional[str],
+            labels_text: Optional[str]
+    ):
+        """
+        Writes the files for an element, first scaling/re-encoding the image
+        (on the process pool, if enabled) if it isn't written unchanged.
+
+        :param image_info:
+                    The image.
+        :param output_image:
+                    The details the image is written with (from get_output_image).
+        :param images_path:
+                    The directory to write the image to.
+        :param labels_filename:
+                    The label file to write, or None for negatives.
+        :param labels_text:
+                    The contents of the label file.
+        """
+        if output_image is image_info:
+            return self.submit(self.write_element, image_info, images_path, labels_filename, labels_text)
+
+        # Workers read images not already in memory themselves
+        source = image_info.source_path if isinstance(image_info, LazyImage) and not image_info.is_loaded \
+            else image_info.data
+        args = (source, output_image.size, output_image.format.pil_format_string, self.quality)
+
+        if self._resize_executor is None:
+            with self._stats.time("resize_image"):
+                result = resize_image(*args)
+            return self.write_resized_image(result, image_info, output_image, images_path, labels_filename, labels_text)
+
+        self._pending_images.append((
+            self._resize_executor.submit(resize_image, *args),
+            image_info,
+            output_image,
+            images_path,
+            labels_filename,
+            labels_text
+        ))
+
+        # Write completed images in order, blocking once too many are in progress
+        while (
+                len(self._pending_images) >= 4 * self.num_resize_workers
+                or (len(self._pending_images) > 0 and self._pending_images[0][0].done())
+        ):
+            self.write_pending_image()
+
+    def write_pending_image(self):
+        """
+        Waits for the oldest image being scaled/re-encoded, then writes it.
+        """
+        future, *details = self._pending_images.popleft()
+        with self._stats.time("resize_wait"):
+            result = future.result()
+        self.write_resized_image(result, *details)
+
+    def write_resized_image(
+            self,
+            result: Tuple[bytes, Tuple[int, int]],
+            image_info: Image,
+            output_image: Image,
+            images_path: str,
+            labels_filename: Optional[str],
+            labels_text: Optional[str]
+    ):
+        """
+        Writes the files for an element whose image has been scaled/re-encoded.
+
+        :param result:
+                    The encoded image and its size.
+        :param image_info:
+                    The original image.
+        :param output_image:
+                    The details the image is written with.
+        :param images_path:
+                    The directory to write the image to.
+        :param labels_filename:
+                    The label file to write, or None for negatives.
+        :param labels_text:
+                    The contents of the label file.
+        """
+        data, size = result
+        resized_image = Image(output_image.filename, data, output_image.format, size)
+        set_source_record(resized_image, get_source_record(image_info))
+        self._stats.count("images_resized")
+
+        self.submit(self.write_element, resized_image, images_path, labels_filename, labels_text)
+
+    def create_resize_executor(self) -> Optional[ProcessPoolExecutor]:
+        """
+        Creates the pool of processes to scale/re-encode images with, if
+        images are scaled/re-encoded in parallel.
+
+        :return:
+                    The pool, or None to scale/re-encode images in-line.
+        """
+        if self.annotations_only or (self.max_size is None and self.image_format is None):
+            return None
+
+        if self.num_resize_workers == 1:
+            return None
+
+        return ProcessPoolExecutor(self.num_resize_workers)
+
+    @property
+    def num_resize_workers(self) -> int:
+        """
+        The number of processes to scale/re-encode images with.
+        """
+        return self.resize_workers if self.resize_workers > 0 else os.cpu_count() or 1
+
+    def write_element(
+            self,
+            image_info: Data,
+            images_path: str,
+            labels_filename: Optional[str],
+            labels_text: Optional[str]
+    ):
+        """
+        Writes the files for an element, then records its input files in
+        the manifest (if any), so that inputs are only recorded once their
+        outputs are complete.
+
+        :param image_info:
+                    The image.
+        :param images_path:
+                    The directory to write the image to.
+        :param labels_filename:
+                    The label file to write, or None for negatives.
+        :param labels_text:
+                    The contents of the label file.
+        """
+        with self._stats.time("write_image"):
+            self.write_data_file(image_info, images_path)
+
+        if labels_filename is not None:
+            with self._stats.time("write_labels"):
+                write_text_file(labels_filename, labels_text)
+            self._stats.count("label_files_written")
+            self._stats.count("label_bytes_written", len(labels_text))
+
+        if self._manifest is not None:
+            source_record = get_source_record(image_info)
+            if source_record is not None:
+                self._manifest.record(source_record)
+
+    def submit(self, task, *args):
+        """
+        Performs a file-writing task, in the background if enabled.
+
+        :param task:
+                    The task to perform.
+        :param args:
+                    The arguments to the task.
+        """
+        if self._background_writer is None:
+            task(*args)
+        else:
+            self._background_writer.submit(task, *args)
+
+    def write_data_file(self, data_file: Data, path: str):
+        if self.annotations_only:
+            return
+
+        if self._stats is not NULL_STATS:
+            self._stats.count("images_written")
+            self._stats.count("image_bytes_written", get_data_file_size(data_file))
+
+        # Images without a source file can only be written from their data
+        if self.link_mode == "copy" or not isinstance(data_file, LazyImage):
+            return super().write_data_file(data_file, path)
+
+        used_link_mode = link_file(data_file.source_path, os.path.join(path, data_file.filename), self.link_mode)
+        with self._link_mode_counts_lock:
+            self._link_mode_counts[used_link_mode] += 1
+
+    def finish_split(self):
+        if self._columnar_writer is not None:
+            self._columnar_writer.close()
+
+    def finish(self):
+        try:
+            # Write the images still being scaled/re-encoded
+            while len(self._pending_images) > 0:
+                self.write_pending_image()
+            if self._resize_executor is not None:
+                self._resize_executor.shutdown()
+
+            super().finish()
+
+            # Wait for any outstanding writes, raising the first error that occurred
+            if self._background_writer is not None:
+                self._background_writer.finish()
+
+            # Write the duplicates now their first copies are complete
+            with self._stats.time("write_duplicates"):
+                self.write_duplicates()
+        finally:
+            if self._hash_cache is not None:
+                self._hash_cache.close()
+
+            # Keep the records of the files that were written, even on error
+            if self._manifest is not None:
+                self._manifest.close()
+
+        if self._manifest is not None:
+            self.logger.info("Recorded %d input files in the manifest" % self._manifest.num_recorded)
+
+        if len(self._link_mode_counts) > 0:
+            self.logger.info(
+                "Images written by link mode: "
+                + ", ".join(f"{mode}={count}" for mode, count in self._link_mode_counts.items())
+            )
+
+        if self.dedup is not None:
+            self.log_dedup_summary()
+
+        report_stats(self._stats, self.logger)
+
+    def log_dedup_summary(self):
+        """
+        Logs how many duplicate images were found and how many bytes of
+        images were saved by not writing them in full.
+        """
+        counts = self._dedup_counts
+        self.logger.info(
+            f"Found {len(self._first_copies)} distinct images and {counts['duplicates']} duplicates "
+            f"({counts['other_split']} in a different split to their first copy, left out); "
+            f"linked {counts['linked']}, merged the annotations of {counts['merged']}, "
+            f"left out {counts['dropped_objects']} annotations of the others; "
+            f"saved {counts['bytes_saved']} bytes of images ({counts['bytes_saved'] / 2 ** 20:.1f} MiB)"
+        )
+
+        if self._hash_cache is not None:
+            self.logger.info(
+                f"Hash cache: {self._hash_cache.hits} hits, {self._hash_cache.misses} misses"
+            )
 
     @classmethod
     def get_help_text_for_output_option(cls) -> str:
@@ -61,3 +699,32 @@ class YOLOODWriter(
         split_base_path = os.path.join(self.output_path, path)
         self.create_split_directories(split_base_path)
         return self.get_split_path(self.split_label, split_base_path)
+
+
+def get_data_file_size(data_file: Data) -> int:
+    """
+    Gets the size of the data of a data-file, without reading it from
+    disk if it hasn't been already.
+
+    :param data_file:
+                The data-file.
+    :return:
+                The size of the data, in bytes.
+    """
+    if isinstance(data_file, LazyImage) and not data_file.is_loaded:
+        return os.path.getsize(data_file.source_path)
+
+    return len(data_file.data) if data_file.data is not None else 0
+
+
+def write_text_file(filename: str, text: str):
+    """
+    Writes text to a file.
+
+    :param filename:
+                The file to write.
+    :param text:
+                The text to write.
+    """
+    with open(filename, "w") as file:
+        file.write(text)
@@ -3,5 +3,8 @@ Conversion components to/from the YOLO object detection format.
 """
 from ._FromYOLOOD import FromYOLOOD
 from ._ToYOLOOD import ToYOLOOD
+from ._YOLOODColumnarReader import YOLOODColumnarReader
 from ._YOLOODReader import YOLOODReader
+from ._YOLOODShardReader import YOLOODShardReader
+from ._YOLOODShardWriter import YOLOODShardWriter
 from ._YOLOODWriter import YOLOODWriter
@@ -0,0 +1,161 @@
+"""
+Combines the outputs of a to-yolo-od conversion which was split across
+machines (with from-yolo-od --shard-index/--shard-count) into one dataset:
+the images and label files of each split are gathered into the same
+directories, the labels/labels CSV files are combined, and any columnar
+files are concatenated. If the conversions gave the same label different
+class indices, the class indices of the later outputs are changed to those
+of the first (labels the first didn't see get the next indices).
+
+Usage: yolo-od-merge [options] -o OUTPUT INPUT [INPUT ...]
+       python -m wai.annotations.yolo.od.merge [options] -o OUTPUT INPUT [INPUT ...]
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .util import (
+    LINK_MODES,
+    list_output_files,
+    merge_columnar,
+    merge_file,
+    merge_label_indices,
+    read_label_indices,
+    write_labels_csv_file,
+    write_labels_file
+)
+
+
+def read_output_labels(path: str, labels_file: Optional[str], labels_csv_file: Optional[str]) -> Dict[str, int]:
+    """
+    Reads the label mapping written by a conversion, preferring its labels
+    CSV file (which holds the class indices explicitly).
+
+    :param path:
+                The output directory of the conversion.
+    :param labels_file:
+                The labels file, relative to the output directory.
+    :param labels_csv_file:
+                The labels CSV file, relative to the output directory.
+    :return:
+                The class index of each label.
+    """
+    for filename in (labels_csv_file, labels_file):
+        if filename is not None and os.path.exists(os.path.join(path, filename)):
+            return read_label_indices(os.path.join(path, filename))
+
+    raise FileNotFoundError(f"No labels file or labels CSV file found in {path}")
+
+
+def merge(
+        inputs: List[str],
+        output: str,
+        labels_file: Optional[str] = None,
+        labels_csv_file: Optional[str] = None,
+        link_mode: str = "copy",
+        num_workers: int = 1
+):
+    """
+    Combines the outputs of a split conversion.
+
+    :param inputs:
+                The output directories of the conversions.
+    :param output:
+                The directory to write the combined dataset to.
+    :param labels_file:
+                The labels file, relative to each output directory (if any).
+    :param labels_csv_file:
+                The labels CSV file, relative to each output directory (if any).
+    :param link_mode:
+                How to materialise the files which aren't changed.
+    :param num_workers:
+                The number of threads to copy files with.
+    """
+    # Work out the class indices of the combined dataset
+    remaps = [None] * len(inputs)
+    merged_labels = None
+    if labels_file is not None or labels_csv_file is not None:
+        mappings = [read_output_labels(path, labels_file, labels_csv_file) for path in inputs]
+        merged_labels, remaps = merge_label_indices(mappings)
+
+    # The labels files aren't copied with the other files, even if they're inside the labels directory
+    excluded = {os.path.normpath(filename) for filename in (labels_file, labels_csv_file) if filename is not None}
+
+    # Check no two conversions wrote the same file before writing any
+    sources: Dict[str, int] = {}
+    columnar_sources: Dict[str, List[int]] = {}
+    jobs = []
+    for input_index, path in enumerate(inputs):
+        # Recreate the (split) directories, even those left empty
+        for root, _, _ in os.walk(path):
+            os.makedirs(os.path.join(output, os.path.relpath(root, path)), exist_ok=True)
+
+        files, columnar_paths = list_output_files(path)
+        for relative_path, is_label_file in files:
+            if relative_path in excluded:
+                continue
+            if relative_path in sources:
+                raise Exception(f"{relative_path} was written by both {inputs[sources[relative_path]]} and {path}")
+            sources[relative_path] = input_index
+            jobs.append((
+                os.path.join(path, relative_path),
+                os.path.join(output, relative_path),
+                is_label_file,
+                remaps[input_index],
+                link_mode
+            ))
+        for columnar_path in columnar_paths:
+            columnar_sources.setdefault(columnar_path, []).append(input_index)
+
+    with ThreadPoolExecutor(max(num_workers, 1)) as executor:
+        num_remapped = sum(executor.map(lambda job: merge_file(*job), jobs))
+
+    for columnar_path, input_indices in sorted(columnar_sources.items()):
+        os.makedirs(os.path.join(output, columnar_path), exist_ok=True)
+        num_images = merge_columnar(
+            [os.path.join(inputs[input_index], columnar_path) for input_index in input_indices],
+            [remaps[input_index] for input_index in input_indices],
+            os.path.join(output, columnar_path)
+        )
+        print(f"Combined the columnar files of {columnar_path} ({num_images} images)")
+
+    if merged_labels is not None:
+        if labels_file is not None:
+            if list(merged_labels.values()) != list(range(len(merged_labels))):
+                print("Class indices aren't contiguous from 0, so the labels file doesn't match them")
+            write_labels_file(os.path.join(output, labels_file), merged_labels)
+        if labels_csv_file is not None:
+            write_labels_csv_file(os.path.join(output, labels_csv_file), merged_labels)
+
+    print(
+        f"Merged {len(jobs)} files from {len(inputs)} outputs into {output}"
+        + (f" ({num_remapped} label files given new class indices)" if num_remapped > 0 else "")
+    )
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="yolo-od-merge",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="+", metavar="INPUT", help="output directories of the split conversion")
+    parser.add_argument("-o", "--output", required=True, metavar="DIR",
+                        help="directory to write the combined dataset to")
+    parser.add_argument("-l", "--labels", metavar="PATH",
+                        help="labels file written by each conversion, relative to its output directory "
+                             "(the combined one is written to the same place)")
+    parser.add_argument("-c", "--labels-csv", metavar="PATH",
+                        help="labels CSV file written by each conversion, relative to its output directory "
+                             "(the combined one is written to the same place)")
+    parser.add_argument("--link-mode", choices=list(LINK_MODES), default="copy",
+                        help="how to materialise images and unchanged label files in the output directory")
+    parser.add_argument("--workers", type=int, default=1, metavar="N", help="number of threads to copy files with")
+    parsed = parser.parse_args(args)
+
+    merge(parsed.inputs, parsed.output, parsed.labels, parsed.labels_csv, parsed.link_mode, parsed.workers)
+
+
+if __name__ == "__main__":
+    main()
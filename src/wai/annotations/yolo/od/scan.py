@@ -0,0 +1,212 @@
+"""
+Checks a YOLO dataset without converting it: streams over the label files
+(in parallel with --workers), reporting malformed lines, class indices outside
+the labels, boxes/polygons outside the image, empty label files and a class
+histogram as JSON. Images are only located (--check-images), or their headers
+read (--read-image-headers), when asked. Exits with status 1 if any problems
+were found.
+
+Usage: yolo-od-scan [options] INPUT [INPUT ...]
+       python -m wai.annotations.yolo.od.scan [options] INPUT [INPUT ...]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from .util import ImageIndex, LabelFileScan, ScanReport, read_class_names, scan_label_files
+
+# The number of label files handed to a worker at a time
+CHUNK_SIZE = 256
+
+
+def is_in_labels_directory(filename: str) -> bool:
+    """
+    Whether a file lies below a 'labels' directory.
+
+    :param filename:
+                The file.
+    :return:
+                True if any directory in its (absolute) path is named 'labels'.
+    """
+    return "labels" in os.path.dirname(os.path.abspath(filename)).split(os.sep)
+
+
+def iterate_label_files(
+        inputs: List[str],
+        inputs_files: List[str],
+        labels_file: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Gets the label files to check.
+
+    :param inputs:
+                Label files, glob patterns, or directories to check all .txt files
+                below a 'labels' directory in.
+    :param inputs_files:
+                Files listing further inputs, one per line.
+    :param labels_file:
+                The labels file, which is never checked as a label file.
+    :return:
+                The label files.
+    """
+    for inputs_file in inputs_files:
+        with open(inputs_file, "r") as file:
+            inputs = inputs + [line.strip() for line in file if line.strip() != ""]
+
+    excluded = os.path.realpath(labels_file) if labels_file is not None else None
+
+    for pattern in inputs:
+        is_directory = os.path.isdir(pattern)
+        if is_directory:
+            pattern = os.path.join(pattern, "**", "*.txt")
+        for filename in sorted(glob.glob(pattern, recursive=True)):
+            # Directories also hold the class-names file (labels.txt/classes.txt) at their root
+            if is_directory and not is_in_labels_directory(filename):
+                continue
+            if excluded is not None and os.path.realpath(filename) == excluded:
+                continue
+            yield filename
+
+
+def scan(
+        label_files: Iterator[str],
+        report: ScanReport,
+        use_polygon_format: bool = False,
+        labels: Optional[List[Optional[str]]] = None,
+        check_images: bool = False,
+        read_image_headers: bool = False,
+        relative_path_to_data_images: Optional[str] = None,
+        num_workers: int = 1,
+        worker_type: str = "process"
+):
+    """
+    Checks label files, adding the results to a report.
+
+    :param label_files:
+                The label files.
+    :param report:
+                The report to add the results to.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :param labels:
+                The labels, to check the class indices against.
+    :param check_images:
+                Whether to check each label file has an image.
+    :param read_image_headers:
+                Whether to read the dimensions of the images from their headers (implies check_images).
+    :param relative_path_to_data_images:
+                The relative path from the label files to their images, or None for the
+                'labels'/'images' layout.
+    :param num_workers:
+                The number of workers to check files with.
+    :param worker_type:
+                Whether the workers are processes or threads.
+    """
+    check_images = check_images or read_image_headers
+    image_index = ImageIndex(relative_path_to_data_images) if check_images else None
+    num_labels = len(labels) if labels is not None else None
+
+    executor: Optional[Executor] = None
+    if num_workers > 1:
+        executor = ThreadPoolExecutor(num_workers) if worker_type == "thread" else ProcessPoolExecutor(num_workers)
+
+    # The chunks handed to the workers, in order
+    pending: Deque[Future] = deque()
+
+    def add_results(results: List[LabelFileScan]):
+        for result in results:
+            report.add(result, check_images)
+
+    def submit(chunk: List[Tuple[str, Optional[str]]]):
+        args = (chunk, use_polygon_format, num_labels, read_image_headers)
+        if executor is None:
+            return add_results(scan_label_files(*args))
+        pending.append(executor.submit(scan_label_files, *args))
+        while len(pending) >= 4 * num_workers or (len(pending) > 0 and pending[0].done()):
+            add_results(pending.popleft().result())
+
+    try:
+        chunk = []
+        for label_file in label_files:
+            image_filename = None
+            if image_index is not None:
+                try:
+                    image_filename = image_index.locate_image(label_file)
+                except Exception as e:
+                    report.add_missing_image(label_file, str(e))
+                else:
+                    if image_filename is None:
+                        report.add_missing_image(label_file)
+            chunk.append((label_file, image_filename))
+            if len(chunk) == CHUNK_SIZE:
+                submit(chunk)
+                chunk = []
+        if len(chunk) > 0:
+            submit(chunk)
+
+        while len(pending) > 0:
+            add_results(pending.popleft().result())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="yolo-od-scan",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="*", metavar="INPUT",
+                        help="label files, glob patterns, or directories to check all .txt files below a 'labels' "
+                             "directory in")
+    parser.add_argument("-I", "--inputs-file", action="append", default=[], metavar="FILENAME",
+                        help="file listing further inputs, one per line")
+    parser.add_argument("-l", "--labels", metavar="PATH",
+                        help="labels file (any format from-yolo-od reads) to check class indices against")
+    parser.add_argument("-p", "--use-polygon-format", action="store_true",
+                        help="read the annotations in polygon format rather than auto-detecting")
+    parser.add_argument("--check-images", action="store_true", help="check each label file has an image")
+    parser.add_argument("--read-image-headers", action="store_true",
+                        help="also read the dimensions of each image from its header (implies --check-images)")
+    parser.add_argument("--image-path-rel", metavar="PATH", help="relative path to image files from annotations")
+    parser.add_argument("--workers", type=int, default=1, metavar="N", help="number of workers to check files with")
+    parser.add_argument("--worker-type", choices=["process", "thread"], default="process",
+                        help="whether the workers are processes, or threads")
+    parser.add_argument("--max-issues", type=int, default=1000, metavar="N",
+                        help="maximum number of problems to list individually (all are counted)")
+    parser.add_argument("-o", "--output", metavar="FILE", help="file to write the JSON report to (default: stdout)")
+    parsed = parser.parse_args(args)
+
+    labels = read_class_names(parsed.labels) if parsed.labels is not None else None
+    report = ScanReport(labels, parsed.max_issues)
+    scan(
+        iterate_label_files(parsed.inputs, parsed.inputs_file, parsed.labels),
+        report,
+        parsed.use_polygon_format,
+        labels,
+        parsed.check_images,
+        parsed.read_image_headers,
+        parsed.image_path_rel,
+        parsed.workers,
+        parsed.worker_type
+    )
+
+    if parsed.output is None:
+        json.dump(report.to_json(), sys.stdout, indent=2)
+        print()
+    else:
+        with open(parsed.output, "w") as file:
+            json.dump(report.to_json(), file, indent=2)
+
+    if report.num_issues > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
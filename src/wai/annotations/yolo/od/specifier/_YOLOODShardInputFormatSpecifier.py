@@ -0,0 +1,26 @@
+from typing import Type, Tuple
+
+from wai.annotations.core.component import Component
+from wai.annotations.core.domain import DomainSpecifier
+from wai.annotations.core.specifier import SourceStageSpecifier
+
+
+class YOLOODShardInputFormatSpecifier(SourceStageSpecifier):
+    """
+    Specifier of the components for reading the YOLO
+    object detection format from tar shards.
+    """
+    @classmethod
+    def description(cls) -> str:
+        return "Reads image object-detection annotations in the YOLO format from tar shards"
+
+    @classmethod
+    def components(cls) -> Tuple[Type[Component], ...]:
+        from wai.annotations.core.component.util import LocalFilenameSource
+        from ..component import FromYOLOOD, YOLOODShardReader
+        return LocalFilenameSource, YOLOODShardReader, FromYOLOOD
+
+    @classmethod
+    def domain(cls) -> Type[DomainSpecifier]:
+        from wai.annotations.domain.image.object_detection import ImageObjectDetectionDomainSpecifier
+        return ImageObjectDetectionDomainSpecifier
@@ -1,2 +1,5 @@
+from ._YOLOODColumnarInputFormatSpecifier import YOLOODColumnarInputFormatSpecifier
 from ._YOLOODInputFormatSpecifier import YOLOODInputFormatSpecifier
 from ._YOLOODOutputFormatSpecifier import YOLOODOutputFormatSpecifier
+from ._YOLOODShardInputFormatSpecifier import YOLOODShardInputFormatSpecifier
+from ._YOLOODShardOutputFormatSpecifier import YOLOODShardOutputFormatSpecifier
@@ -0,0 +1,89 @@
+import queue
+import threading
+from itertools import count
+from typing import Any, Callable, List, Optional, Tuple
+
+# Sentinel placed on the queue to stop a writer thread
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Performs (file-writing) tasks on a pool of background threads, so the
+    submitting thread can carry on with other work. Tasks are queued in a
+    bounded queue, and each thread takes tasks from the queue in batches.
+    """
+    def __init__(self, num_threads: int, batch_size: int = 32, max_queued: Optional[int] = None):
+        # The maximum number of tasks a thread takes from the queue at once
+        self._batch_size: int = batch_size
+
+        # The queue of submitted tasks (bounded so producers can't run too far ahead)
+        self._queue: queue.Queue = queue.Queue(max_queued if max_queued is not None else 16 * num_threads)
+
+        # The sequence number of the next submitted task
+        self._sequence = count()
+
+        # Errors raised by tasks, with the sequence number of the failed task
+        self._errors: List[Tuple[int, BaseException]] = []
+        self._errors_lock: threading.Lock = threading.Lock()
+
+        # Start the writer threads
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._run, name=f"{type(self).__name__}-{index}", daemon=True)
+            for index in range(num_threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, task: Callable[..., Any], *args: Any):
+        """
+        Queues a task for execution, blocking if the queue is full.
+
+        :param task:
+                    The task to perform.
+        :param args:
+                    The arguments to the task.
+        """
+        if len(self._threads) == 0:
+            raise RuntimeError(f"Can't submit tasks to a finished {type(self).__name__}")
+
+        self._queue.put((next(self._sequence), task, args))
+
+    def finish(self):
+        """
+        Waits for all submitted tasks to complete and stops the writer threads.
+        If any tasks failed, re-raises the error from the earliest-submitted one.
+        """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        if len(self._errors) > 0:
+            sequence, error = min(self._errors, key=lambda sequence_and_error: sequence_and_error[0])
+            raise error
+
+    def _run(self):
+        """
+        Main loop of each writer thread.
+        """
+        while True:
+            # Wait for a task, then take any others that are already queued
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                if item is _STOP:
+                    return
+
+                sequence, task, args = item
+                try:
+                    task(*args)
+                except BaseException as error:
+                    with self._errors_lock:
+                        self._errors.append((sequence, error))
@@ -0,0 +1,133 @@
+import sys
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Without fixed labels, class indices beyond this (e.g. malformed ones) are looked up one at a
+# time rather than added to the array, so a single huge index doesn't add an entry for every
+# index below it
+MAX_ARRAY_CLASS_INDEX = 1 << 16
+
+
+class ClassIndexError(ValueError):
+    """
+    Error for annotations whose class index has no label.
+    """
+    pass
+
+
+class ClassLabels:
+    """
+    Lookup table from class index to label. The labels are held in an array
+    so the labels of all annotations of an image are looked up at once, and
+    indices without a label use their index as the label, formatted once and
+    interned. If no labels are given, any class index is valid (as before,
+    negative indices included); otherwise indices beyond the labels are
+    rejected.
+    """
+    def __init__(self, labels: Sequence[Optional[str]] = (), source: Optional[str] = None):
+        # Whether the labels were given (so the valid class indices are limited to them)
+        self.is_fixed: bool = len(labels) > 0
+
+        # Where the labels came from, for error messages
+        self.source: Optional[str] = source
+
+        self._labels: List[str] = []
+        self._array: np.ndarray = np.empty(0, dtype=object)
+        self._extend(labels)
+
+        # The labels of class indices outside the array (only without fixed labels)
+        self._sparse: Dict[int, str] = {}
+
+    def _extend(self, labels: Sequence[Optional[str]]):
+        """
+        Adds labels for the next class indices.
+
+        :param labels:
+                    The labels, or None to use the class index.
+        """
+        start = len(self._labels)
+        self._labels.extend(
+            sys.intern(str(index)) if label is None else label
+            for index, label in enumerate(labels, start)
+        )
+        self._array = np.array(self._labels, dtype=object)
+
+    def _ensure_valid(self, low: int, high: int) -> bool:
+        """
+        Checks the range of class indices has labels, adding fallback labels
+        for new indices if the labels aren't fixed.
+
+        :param low:
+                    The smallest class index.
+        :param high:
+                    The largest class index.
+        :return:
+                    Whether all the indices are in the array (otherwise they
+                    have to be looked up one at a time).
+        """
+        if low >= 0 and high < len(self._labels):
+            return True
+
+        if self.is_fixed:
+            index = low if low < 0 else high
+            raise ClassIndexError(
+                f"Class index {index} is out of range for the {len(self._labels)} labels"
+                + (f" in {self.source}" if self.source is not None else "")
+            )
+
+        if len(self._labels) <= high < MAX_ARRAY_CLASS_INDEX:
+            self._extend([None] * (high + 1 - len(self._labels)))
+
+        return low >= 0 and high < len(self._labels)
+
+    def _get_label(self, class_index: int) -> str:
+        """
+        Gets the label of a single class index which is known to be valid.
+
+        :param class_index:
+                    The class index.
+        :return:
+                    The label.
+        """
+        if 0 <= class_index < len(self._labels):
+            return self._labels[class_index]
+
+        label = self._sparse.get(class_index, None)
+        if label is None:
+            label = self._sparse[class_index] = sys.intern(str(class_index))
+        return label
+
+    def __len__(self) -> int:
+        return len(self._labels) if self.is_fixed else 0
+
+    def __getitem__(self, class_index: int) -> str:
+        self._ensure_valid(class_index, class_index)
+        return self._get_label(class_index)
+
+    def validate(self, class_indices: np.ndarray):
+        """
+        Checks the given class indices all have labels, without looking them up.
+
+        :param class_indices:
+                    The class indices.
+        """
+        if len(class_indices) > 0:
+            self._ensure_valid(int(class_indices.min()), int(class_indices.max()))
+
+    def lookup(self, class_indices: np.ndarray) -> List[str]:
+        """
+        Gets the labels of the given class indices.
+
+        :param class_indices:
+                    The class indices.
+        :return:
+                    The label of each class index.
+        """
+        if len(class_indices) == 0:
+            return []
+
+        if self._ensure_valid(int(class_indices.min()), int(class_indices.max())):
+            return self._array[class_indices].tolist()
+
+        return [self._get_label(class_index) for class_index in class_indices.tolist()]
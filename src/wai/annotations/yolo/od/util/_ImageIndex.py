@@ -0,0 +1,178 @@
+import os
+import threading
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from wai.annotations.domain.image import ImageFormat
+
+
+def get_images_path(labels_path: str, relative_path_to_data_images: Optional[str] = None) -> str:
+    """
+    Gets the directory containing the images for the label files in a directory.
+
+    :param labels_path:
+                The directory containing the label files.
+    :param relative_path_to_data_images:
+                The relative path from the label files to their images, or None to
+                mirror the sub-structure of the "labels" directory in an "images"
+                directory.
+    :return:
+                The images directory.
+    """
+    # Use the provided relative path if given, otherwise default to the same
+    # sub-structure from a "labels" directory down in an "images" directory
+    relative_path = relative_path_to_data_images
+    if relative_path is None:
+        relative_path = os.path.join("..", "images")
+        abs_path = os.path.abspath(labels_path)
+        relevant_path_parts = []
+        while True:
+            parent_path, path_part = os.path.split(abs_path)
+            if path_part == "labels":
+                break
+            if parent_path == abs_path:
+                raise Exception(f"No 'labels' directory found in path of {os.path.abspath(labels_path)}")
+            relevant_path_parts.append(path_part)
+            abs_path = parent_path
+        for path_part in reversed(relevant_path_parts):
+            relative_path = os.path.join("..", relative_path, path_part)
+
+    # Join the path with the relative path to the data-image
+    return os.path.join(labels_path, relative_path)
+
+
+class ImageIndex:
+    """
+    Locates the images associated with label files. Each images directory is listed
+    once, instead of probing the filesystem for every candidate extension of every
+    image, and the images directory for each labels directory is cached. Images
+    not found in the listing are still probed for, so names which only match on
+    case-insensitive filesystems are found as before. Can be used from multiple
+    threads (each directory is still only listed once).
+    """
+    def __init__(self, relative_path_to_data_images: Optional[str] = None):
+        # The relative path from the label files to their images
+        self._relative_path_to_data_images: Optional[str] = relative_path_to_data_images
+
+        # The candidate image extensions, in the order get_associated_image checks them
+        self._extensions: Tuple[str, ...] = tuple(
+            extension
+            for image_format in ImageFormat
+            for extension in image_format.possible_extensions
+        )
+
+        # Cache from labels directory to images directory
+        self._images_paths: Dict[str, str] = {}
+
+        # Cache from images directory to the names of the files it contains
+        self._listings: Dict[str, FrozenSet[str]] = {}
+
+        # The number of existence checks get_associated_image would have made
+        self.stat_calls_avoided: int = 0
+
+        # The number of directory listings made instead
+        self.directory_scans: int = 0
+
+        # Guards the caches and counters, and the lock of each directory being listed
+        self._lock: threading.Lock = threading.Lock()
+        self._listing_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def filesystem_calls_saved(self) -> int:
+        """
+        The number of filesystem calls saved compared to probing for each image.
+        """
+        return self.stat_calls_avoided - self.directory_scans
+
+    def locate_image(self, label_filename: str) -> Optional[str]:
+        """
+        Locates the image associated with a label file. Gives the same result
+        as get_associated_image.
+
+        :param label_filename:
+                    The label file.
+        :return:
+                    The image filename, or None if it couldn't be found.
+        """
+        # Split the filename into path, basename, ext
+        path, basename = os.path.split(label_filename)
+        basename, extension = os.path.splitext(basename)
+
+        images_path = self.get_images_path(path)
+        listing = self.get_listing(images_path)
+
+        # Check each candidate extension in turn
+        image_filename = None
+        calls_avoided = len(self._extensions)
+        for index, extension in enumerate(self._extensions, 1):
+            image_name = f"{basename}.{extension}"
+            if image_name in listing:
+                image_filename = f"{os.path.join(images_path, basename)}.{extension}"
+                calls_avoided = index
+                break
+
+        # The listing only holds exact names, so probe the filesystem for names which
+        # differ by case (matching on case-insensitive filesystems) as well
+        if image_filename is None and len(listing) > 0:
+            calls_avoided = 0
+            for extension in self._extensions:
+                candidate = f"{os.path.join(images_path, basename)}.{extension}"
+                if os.path.exists(candidate):
+                    image_filename = candidate
+                    break
+
+        with self._lock:
+            self.stat_calls_avoided += calls_avoided
+
+        return image_filename
+
+    def get_images_path(self, labels_path: str) -> str:
+        """
+        Gets the (cached) images directory for a labels directory.
+
+        :param labels_path:
+                    The directory containing the label files.
+        :return:
+                    The images directory.
+        """
+        images_path = self._images_paths.get(labels_path, None)
+        if images_path is None:
+            images_path = get_images_path(labels_path, self._relative_path_to_data_images)
+            self._images_paths[labels_path] = images_path
+        return images_path
+
+    def get_listing(self, images_path: str) -> FrozenSet[str]:
+        """
+        Gets the (cached) names of the files in an images directory.
+
+        :param images_path:
+                    The images directory.
+        :return:
+                    The set of filenames in the directory.
+        """
+        listing = self._listings.get(images_path, None)
+        if listing is not None:
+            return listing
+
+        # Other threads wait for the directory being listed, rather than listing it again
+        with self._lock:
+            listing_lock = self._listing_locks.setdefault(images_path, threading.Lock())
+
+        with listing_lock:
+            listing = self._listings.get(images_path, None)
+            if listing is None:
+                try:
+                    with os.scandir(images_path if images_path != "" else ".") as entries:
+                        # Broken symbolic links don't count as existing
+                        listing = frozenset(
+                            entry.name
+                            for entry in entries
+                            if not entry.is_symlink() or os.path.exists(entry.path)
+                        )
+                except (FileNotFoundError, NotADirectoryError):
+                    listing = frozenset()
+                with self._lock:
+                    self.directory_scans += 1
+                    self._listings[images_path] = listing
+                    del self._listing_locks[images_path]
+
+        return listing
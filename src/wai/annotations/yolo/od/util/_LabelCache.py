@@ -0,0 +1,255 @@
+import os
+import sqlite3
+import struct
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .._format import YOLOObjectTable
+
+# The name of the cache database in the cache directory
+CACHE_FILENAME = "yolo-label-cache.sqlite"
+
+# Header of an encoded table: the number of annotations and of polygon vertices
+_TABLE_HEADER = struct.Struct("<II")
+
+
+class CachedLabels(NamedTuple):
+    """
+    The result of reading a label file: its annotations, and the location
+    and dimensions of its image.
+    """
+    image_path: str
+    image_size: Tuple[int, int]
+    objects: YOLOObjectTable
+
+
+class LabelFileStat(NamedTuple):
+    """
+    The state of a label file and its image when they were read, which
+    cache entries are validated against.
+    """
+    label_mtime_ns: int
+    label_size: int
+    image_mtime_ns: int
+    image_size: int
+
+
+def stat_label_file(label_path: str, image_path: str) -> Optional[LabelFileStat]:
+    """
+    Gets the current state of a label file and its image.
+
+    :param label_path:
+                The label file.
+    :param image_path:
+                The image associated with the label file.
+    :return:
+                The state of the files, or None if either doesn't exist.
+    """
+    try:
+        label_stat = os.stat(label_path)
+        image_stat = os.stat(image_path)
+    except OSError:
+        return None
+
+    return LabelFileStat(label_stat.st_mtime_ns, label_stat.st_size, image_stat.st_mtime_ns, image_stat.st_size)
+
+
+def encode_table(table: YOLOObjectTable) -> bytes:
+    """
+    Encodes a table of annotations as the raw bytes of its arrays.
+
+    :param table:
+                The table.
+    :return:
+                The encoded table.
+    """
+    return b"".join((
+        _TABLE_HEADER.pack(len(table), len(table.points)),
+        np.ascontiguousarray(table.class_indices, dtype="<i8").tobytes(),
+        np.ascontiguousarray(table.boxes, dtype="<f8").tobytes(),
+        np.ascontiguousarray(table.point_offsets, dtype="<i8").tobytes(),
+        np.ascontiguousarray(table.points, dtype="<f8").tobytes()
+    ))
+
+
+def decode_table(data: bytes) -> YOLOObjectTable:
+    """
+    Decodes a table of annotations encoded with encode_table.
+
+    :param data:
+                The encoded table.
+    :return:
+                The table (its arrays are read-only views of the data).
+    """
+    num_objects, num_points = _TABLE_HEADER.unpack_from(data)
+    offset = _TABLE_HEADER.size
+
+    class_indices = np.frombuffer(data, "<i8", num_objects, offset)
+    offset += class_indices.nbytes
+    boxes = np.frombuffer(data, "<f8", 4 * num_objects, offset).reshape(num_objects, 4)
+    offset += boxes.nbytes
+    point_offsets = np.frombuffer(data, "<i8", num_objects + 1, offset)
+    offset += point_offsets.nbytes
+    points = np.frombuffer(data, "<f8", 2 * num_points, offset).reshape(num_points, 2)
+
+    return YOLOObjectTable(class_indices, boxes, point_offsets, points)
+
+
+class LabelCache:
+    """
+    Persistent cache of parsed label files, holding the annotations of each
+    file (in binary form) along with the location and dimensions of its image.
+    Entries are only used while the modification times and sizes of both files
+    are unchanged, and the least-recently used entries are evicted when the
+    cache is closed if it has grown beyond its size limit.
+    """
+    def __init__(self, directory: str, max_size: int, options: str = "", batch_size: int = 1000):
+        # The maximum total size of the cached annotations, in bytes
+        self._max_size: int = max_size
+
+        # The reader options the cached results depend on
+        self._options: str = options
+
+        # The number of updates to buffer before committing them
+        self._batch_size: int = batch_size
+
+        # The entries to add, and the hit entries whose last use should be updated
+        self._pending_entries: List[tuple] = []
+        self._pending_uses: List[tuple] = []
+
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._connection: sqlite3.Connection = sqlite3.connect(os.path.join(directory, CACHE_FILENAME), timeout=60)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            "label_path TEXT NOT NULL, "
+            "options TEXT NOT NULL, "
+            "label_mtime_ns INTEGER NOT NULL, "
+            "label_size INTEGER NOT NULL, "
+            "image_path TEXT NOT NULL, "
+            "image_mtime_ns INTEGER NOT NULL, "
+            "image_size INTEGER NOT NULL, "
+            "image_width INTEGER NOT NULL, "
+            "image_height INTEGER NOT NULL, "
+            "objects BLOB NOT NULL, "
+            "last_used INTEGER NOT NULL, "
+            "PRIMARY KEY (label_path, options)"
+            ")"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS labels_last_used ON labels (last_used)")
+        self._connection.commit()
+
+    def get(self, label_path: str) -> Optional[CachedLabels]:
+        """
+        Gets the cached result of reading a label file, if it is still valid.
+
+        :param label_path:
+                    The label file.
+        :return:
+                    The cached result, or None if not cached or the label file
+                    or its image have changed since.
+        """
+        label_path = os.path.abspath(label_path)
+        row = self._connection.execute(
+            "SELECT label_mtime_ns, label_size, image_mtime_ns, image_size, "
+            "image_path, image_width, image_height, objects "
+            "FROM labels WHERE label_path = ? AND options = ?",
+            (label_path, self._options)
+        ).fetchone()
+
+        if row is None or LabelFileStat(*row[:4]) != stat_label_file(label_path, row[4]):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._pending_uses.append((time.time_ns(), label_path, self._options))
+        self._commit_if_full()
+
+        return CachedLabels(row[4], (row[5], row[6]), decode_table(row[7]))
+
+    def put(self, label_path: str, stat: LabelFileStat, labels: CachedLabels):
+        """
+        Adds the result of reading a label file to the cache.
+
+        :param label_path:
+                    The label file.
+        :param stat:
+                    The state of the label file and its image before they were read.
+        :param labels:
+                    The result of reading the label file.
+        """
+        self._pending_entries.append((
+            os.path.abspath(label_path),
+            self._options,
+            stat.label_mtime_ns,
+            stat.label_size,
+            os.path.abspath(labels.image_path),
+            stat.image_mtime_ns,
+            stat.image_size,
+            labels.image_size[0],
+            labels.image_size[1],
+            encode_table(labels.objects),
+            time.time_ns()
+        ))
+        self._commit_if_full()
+
+    def close(self):
+        """
+        Commits any outstanding updates, evicts entries beyond the size limit
+        and closes the cache.
+        """
+        self._commit()
+        self._evict()
+        self._connection.close()
+
+    def _commit_if_full(self):
+        """
+        Commits the buffered updates if enough have accumulated.
+        """
+        if len(self._pending_entries) + len(self._pending_uses) >= self._batch_size:
+            self._commit()
+
+    def _commit(self):
+        """
+        Commits the buffered updates.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending_entries
+            )
+            self._connection.executemany(
+                "UPDATE labels SET last_used = ? WHERE label_path = ? AND options = ?",
+                self._pending_uses
+            )
+
+        self._pending_entries = []
+        self._pending_uses = []
+
+    def _evict(self):
+        """
+        Removes the least-recently used entries until the cache is within its size limit.
+        """
+        total_size = self._connection.execute("SELECT COALESCE(SUM(LENGTH(objects)), 0) FROM labels").fetchone()[0]
+        if total_size <= self._max_size:
+            return
+
+        evicted = []
+        for label_path, options, size in self._connection.execute(
+                "SELECT label_path, options, LENGTH(objects) FROM labels ORDER BY last_used"
+        ).fetchall():
+            if total_size <= self._max_size:
+                break
+            evicted.append((label_path, options))
+            total_size -= size
+
+        with self._connection:
+            self._connection.executemany("DELETE FROM labels WHERE label_path = ? AND options = ?", evicted)
+
+        self.evictions += len(evicted)
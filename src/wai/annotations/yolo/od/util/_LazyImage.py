@@ -0,0 +1,75 @@
+import os
+import shutil
+from typing import Optional, Tuple
+
+from PIL import Image as PILImage
+
+from wai.annotations.domain.image import Image, ImageFormat
+
+
+def read_image_size(filename: str) -> Tuple[int, int]:
+    """
+    Reads the dimensions of an image from its header, without decoding
+    (or reading) the rest of the file.
+
+    :param filename:
+                The image file.
+    :return:
+                The (width, height) of the image.
+    """
+    with PILImage.open(filename) as image:
+        return image.size
+
+
+class LazyImage(Image):
+    """
+    Image which only reads its dimensions from disk up-front, and defers
+    reading its data until it is actually required.
+    """
+    def __init__(
+            self,
+            source_path: str,
+            format: Optional[ImageFormat] = None,
+            size: Optional[Tuple[int, int]] = None
+    ):
+        super().__init__(
+            source_path,
+            None,
+            format,
+            size if size is not None else read_image_size(source_path)
+        )
+
+        # The file the image data is read from
+        self._source_path: str = source_path
+
+    @property
+    def source_path(self) -> str:
+        """
+        The path to the file the image data is read from.
+        """
+        return self._source_path
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Whether the image data has been read from disk yet.
+        """
+        return self._data is not None
+
+    @property
+    def data(self) -> Optional[bytes]:
+        # Read the data on first access
+        if self._data is None:
+            with open(self._source_path, "rb") as file:
+                self._data = file.read()
+
+        return self._data
+
+    def write_data_if_present(self, path: str) -> bool:
+        # If the data hasn't been needed so far, copy the file directly
+        # rather than reading it into memory
+        if self._data is None:
+            shutil.copyfile(self._source_path, os.path.join(path, self.filename))
+            return True
+
+        return super().write_data_if_present(path)
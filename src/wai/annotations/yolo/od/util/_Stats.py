@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+
+# The environment variable which enables the instrumentation: "1" to log a
+# summary when each component finishes, or the name of a JSON file to also
+# write all components' statistics to
+STATS_ENVIRONMENT_VARIABLE = "WAI_YOLO_STATS"
+
+# The statistics of each instrumented component in this process, by name
+_registry: Dict[str, 'Stats'] = {}
+_registry_lock = threading.Lock()
+
+
+class _Timing:
+    """
+    Histogram of the durations of a step, in power-of-two microsecond buckets.
+    """
+    __slots__ = ("count", "total", "maximum", "buckets")
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.maximum: float = 0.0
+        self.buckets: List[int] = []
+
+    def add(self, seconds: float):
+        bucket = int(seconds * 1_000_000).bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimates a percentile of the durations, as the upper bound of the
+        bucket it falls in.
+
+        :param fraction:
+                    The percentile, as a fraction.
+        :return:
+                    The estimated duration, in seconds.
+        """
+        threshold = fraction * self.count
+        cumulative = 0
+        for bucket, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= threshold:
+                return min((1 << bucket) / 1_000_000, self.maximum)
+        return self.maximum
+
+    def to_json(self) -> dict:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count > 0 else 0.0,
+            "p50_s": self.percentile(0.5),
+            "p90_s": self.percentile(0.9),
+            "p99_s": self.percentile(0.99),
+            "max_s": self.maximum,
+            "histogram_us": {
+                f"<{1 << bucket}": count
+                for bucket, count in enumerate(self.buckets)
+                if count > 0
+            },
+        }
+
+
+class Stats:
+    """
+    Counters and timing histograms of the sub-steps of a component. Can be
+    updated from multiple threads.
+    """
+    def __init__(self, name: str):
+        # The name of the component
+        self.name: str = name
+
+        self.counters: Counter = Counter()
+        self.timings: Dict[str, _Timing] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        # The time the component started
+        self._start: float = time.perf_counter()
+
+    def count(self, counter: str, amount: int = 1):
+        """
+        Adds to a counter.
+
+        :param counter:
+                    The name of the counter.
+        :param amount:
+                    The amount to add.
+        """
+        with self._lock:
+            self.counters[counter] += amount
+
+    def record_time(self, step: str, seconds: float):
+        """
+        Records the duration of a step.
+
+        :param step:
+                    The name of the step.
+        :param seconds:
+                    The duration.
+        """
+        with self._lock:
+            timing = self.timings.get(step, None)
+            if timing is None:
+                timing = self.timings[step] = _Timing()
+            timing.add(seconds)
+
+    @contextmanager
+    def time(self, step: str):
+        """
+        Context manager which records the duration of a step.
+
+        :param step:
+                    The name of the step.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(step, time.perf_counter() - start)
+
+    def summary(self) -> str:
+        """
+        Formats the statistics as a human-readable summary.
+
+        :return:
+                    The summary.
+        """
+        elapsed = time.perf_counter() - self._start
+        lines = [f"{self.name} statistics ({elapsed:.3f}s since start):"]
+        for counter, value in sorted(self.counters.items()):
+            lines.append(f"  {counter}: {value} ({value / elapsed:.1f}/s)" if elapsed > 0 else f"  {counter}: {value}")
+        for step, timing in self.timings.items():
+            lines.append(
+                f"  {step}: {timing.count} x {timing.total / max(timing.count, 1) * 1000:.3f}ms "
+                f"= {timing.total:.3f}s (p50 {timing.percentile(0.5) * 1000:.3f}ms, "
+                f"p99 {timing.percentile(0.99) * 1000:.3f}ms, max {timing.maximum * 1000:.3f}ms)"
+            )
+        return "\n".join(lines)
+
+    def to_json(self) -> dict:
+        """
+        Gets the statistics as JSON-serialisable data.
+
+        :return:
+                    The statistics.
+        """
+        with self._lock:
+            return {
+                "elapsed_s": time.perf_counter() - self._start,
+                "counters": dict(self.counters),
+                "timings": {step: timing.to_json() for step, timing in self.timings.items()},
+            }
+
+
+class _NullTimer:
+    """
+    Context manager which does nothing, used by NullStats to time steps.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class NullStats:
+    """
+    Stand-in for Stats when instrumentation is disabled, which records nothing
+    (and times steps with a shared no-op context manager, to keep the overhead
+    of instrumented code to a method call).
+    """
+    __slots__ = ()
+
+    _TIMER = _NullTimer()
+
+    def count(self, counter: str, amount: int = 1):
+        pass
+
+    def record_time(self, step: str, seconds: float):
+        pass
+
+    def time(self, step: str) -> _NullTimer:
+        return self._TIMER
+
+
+# The shared instance of NullStats
+NULL_STATS = NullStats()
+
+
+def get_stats_setting() -> Optional[str]:
+    """
+    Gets the setting of the instrumentation environment variable.
+
+    :return:
+                The setting, or None if instrumentation is disabled.
+    """
+    setting = os.environ.get(STATS_ENVIRONMENT_VARIABLE, "")
+    return setting if setting not in ("", "0") else None
+
+
+def create_stats(name: str) -> Union[Stats, NullStats]:
+    """
+    Creates the statistics for a component, if instrumentation is enabled.
+
+    :param name:
+                The name of the component.
+    :return:
+                The statistics, or NULL_STATS if instrumentation is disabled.
+    """
+    if get_stats_setting() is None:
+        return NULL_STATS
+
+    stats = Stats(name)
+    with _registry_lock:
+        _registry[name] = stats
+    return stats
+
+
+def report_stats(stats: Union[Stats, NullStats], logger):
+    """
+    Reports the statistics of a component when it finishes: logs its summary,
+    and writes the statistics of all instrumented components in this process
+    to the JSON file, if one is configured.
+
+    :param stats:
+                The statistics of the component.
+    :param logger:
+                The logger to log the summary to.
+    """
+    if not isinstance(stats, Stats):
+        return
+
+    logger.info(stats.summary())
+
+    setting = get_stats_setting()
+    if setting is None or setting == "1":
+        return
+
+    with _registry_lock:
+        data = {name: registered.to_json() for name, registered in _registry.items()}
+
+    with open(setting, "w") as file:
+        json.dump({"components": data}, file, indent=2)
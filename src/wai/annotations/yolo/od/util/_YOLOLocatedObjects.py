@@ -0,0 +1,58 @@
+from typing import Iterable, List, Optional
+
+from wai.common.adams.imaging.locateobjects import LocatedObject, LocatedObjects
+
+from .._format import YOLOObjectTable
+from ._ClassLabels import ClassLabels
+from ._convert_coordinates import yolo_to_located_objects
+
+
+class YOLOLocatedObjects(LocatedObjects):
+    """
+    Located objects which were read from YOLO annotations, and are only
+    converted from them when first accessed. Until then, the YOLO annotations
+    are available via the table attribute, so they can be written back to
+    YOLO unchanged (without rounding to pixels and back). Any access to the
+    objects themselves converts them, after which the table is dropped, as
+    the objects may have been modified.
+    """
+    def __init__(
+            self,
+            objects: Optional[Iterable[LocatedObject]] = None,
+            *,
+            table: Optional[YOLOObjectTable] = None,
+            labels: Optional[ClassLabels] = None,
+            image_width: int = 0,
+            image_height: int = 0
+    ):
+        # Without a table (e.g. when UserList methods copy the objects) this is an ordinary list
+        self._objects: Optional[List[LocatedObject]] = None
+        if table is None:
+            super().__init__(objects)
+
+        # The YOLO annotations, until converted
+        self.table: Optional[YOLOObjectTable] = table
+
+        # The labels of the class indices of the table
+        self.labels: Optional[ClassLabels] = labels
+
+        # The dimensions of the image, to convert the normalised co-ordinates with
+        self.image_width: int = image_width
+        self.image_height: int = image_height
+
+    @property
+    def data(self) -> List[LocatedObject]:
+        if self._objects is None:
+            self._objects = yolo_to_located_objects(
+                self.table, self.labels, self.image_width, self.image_height
+            ).data
+            self.table = None
+        return self._objects
+
+    @data.setter
+    def data(self, objects: List[LocatedObject]):
+        self._objects = objects
+        self.table = None
+
+    def __len__(self) -> int:
+        return len(self.table) if self.table is not None else len(self.data)
@@ -0,0 +1,47 @@
+"""
+Utilities for working with the YOLO object detection format.
+"""
+from ._BackgroundWriter import BackgroundWriter
+from ._ClassLabels import MAX_ARRAY_CLASS_INDEX, ClassIndexError, ClassLabels
+from ._columnar import COLUMNAR_FILES_FILENAME, ColumnarDataset, ColumnarWriter, get_column_filename
+from ._convert_coordinates import box_outlines, located_objects_to_yolo, yolo_to_located_objects
+from ._dedup import DEDUP_POLICIES, FirstCopy, HashCache, hash_data, hash_file, merge_label_lines
+from ._format_yolo_labels import format_yolo_labels
+from ._ImageIndex import ImageIndex, get_images_path
+from ._labels_file import (
+    CLASSES_FILENAME,
+    LABELS_CSV_HEADER,
+    read_class_names,
+    read_label_indices,
+    read_labels_file,
+    write_labels_csv_file,
+    write_labels_file
+)
+from ._LabelCache import CachedLabels, LabelCache, LabelFileStat, stat_label_file
+from ._LazyImage import LazyImage, read_image_size
+from ._link_file import LINK_MODES, link_file
+from ._manifest import Manifest, SourceRecord, get_source_record, make_source_record, set_source_record
+from ._merge import (
+    OUTPUT_DIRECTORIES,
+    is_columnar_file,
+    list_output_files,
+    merge_columnar,
+    merge_file,
+    merge_label_indices,
+    remap_label_text
+)
+from ._parse_yolo_labels import (
+    split_label_lines,
+    parse_yolo_label_arrays,
+    parse_yolo_table,
+    parse_yolo_labels,
+    read_yolo_label_file,
+    read_yolo_label_files
+)
+from ._partition import SHARD_ROOT_DIRECTORIES, Partition, get_shard_index, get_shard_key
+from ._resize_image import get_resized_size, resize_image
+from ._scan import LabelFileScan, ScanIssue, ScanReport, scan_label_file, scan_label_files
+from ._simplify_polygons import MIN_POLYGON_VERTICES, polygon_vertex_significance, simplify_polygons
+from ._Stats import NULL_STATS, STATS_ENVIRONMENT_VARIABLE, NullStats, Stats, create_stats, report_stats
+from ._shards import LABELS_EXTENSION, add_shard_bytes, add_shard_entry, format_shard_filename, iterate_shard
+from ._YOLOLocatedObjects import YOLOLocatedObjects
@@ -0,0 +1,209 @@
+import os
+import shutil
+from typing import BinaryIO, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .._format import YOLOObject, YOLOObjectTable
+
+# The prefix of the columnar files of a split
+COLUMNAR_PREFIX = "yolo."
+
+# The file table, which columnar readers are given as input
+COLUMNAR_FILES_FILENAME = f"{COLUMNAR_PREFIX}files.npy"
+
+# The columns of the file table, with their dtypes and row shapes
+_IMAGE_COLUMNS: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "image_sizes": ("<i8", (2,)),
+    "object_offsets": ("<i8", ()),
+}
+
+# The columns of the annotations, with their dtypes and row shapes
+_OBJECT_COLUMNS: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "image_ids": ("<i8", ()),
+    "class_indices": ("<i8", ()),
+    "boxes": ("<f8", (4,)),
+    "point_offsets": ("<i8", ()),
+    "points": ("<f8", (2,)),
+}
+
+
+def get_column_filename(path: str, column: str) -> str:
+    """
+    Gets the filename of a column of a columnar dataset.
+
+    :param path:
+                The directory holding the columnar files.
+    :param column:
+                The name of the column.
+    :return:
+                The filename.
+    """
+    return os.path.join(path, f"{COLUMNAR_PREFIX}{column}.npy")
+
+
+class _ColumnFile:
+    """
+    A column being written to a .npy file. Rows are streamed to a temporary
+    file, and the .npy header is prepended once the number of rows is known.
+    """
+    def __init__(self, filename: str, dtype: str, row_shape: Tuple[int, ...]):
+        self._filename: str = filename
+        self._dtype: np.dtype = np.dtype(dtype)
+        self._row_shape: Tuple[int, ...] = row_shape
+        self._num_rows: int = 0
+        self._file: BinaryIO = open(f"{filename}.tmp", "wb")
+
+    def append(self, rows: np.ndarray):
+        """
+        Appends rows to the column.
+
+        :param rows:
+                    The rows to append.
+        """
+        self._file.write(np.ascontiguousarray(rows, dtype=self._dtype).tobytes())
+        self._num_rows += len(rows)
+
+    def close(self):
+        """
+        Writes the .npy file of the column.
+        """
+        self._file.close()
+        with open(self._filename, "wb") as file, open(f"{self._filename}.tmp", "rb") as data:
+            np.lib.format.write_array_header_1_0(
+                file,
+                {
+                    "descr": np.lib.format.dtype_to_descr(self._dtype),
+                    "fortran_order": False,
+                    "shape": (self._num_rows,) + self._row_shape
+                }
+            )
+            shutil.copyfileobj(data, file)
+        os.remove(f"{self._filename}.tmp")
+
+
+class ColumnarWriter:
+    """
+    Writes the annotations of a split as columnar .npy files, which can be
+    memory-mapped to access any image's annotations without parsing:
+
+    - yolo.files.npy: the filename of each image
+    - yolo.image_sizes.npy: the (width, height) of each image
+    - yolo.object_offsets.npy: the offsets of each image's annotations (one more than images)
+    - yolo.image_ids.npy: the image (index into the file table) of each annotation
+    - yolo.class_indices.npy: the class index of each annotation
+    - yolo.boxes.npy: the centre-x, centre-y, width, height of each annotation
+    - yolo.point_offsets.npy: the offsets of each annotation's polygon vertices (one more than annotations)
+    - yolo.points.npy: the x/y polygon vertices of all annotations
+
+    Annotation columns are streamed to disk as images are added, so memory
+    use doesn't grow with the number of annotations.
+    """
+    def __init__(self, path: str):
+        # The directory to write the columns to
+        self._path: str = path
+
+        # The filenames of the images (written when finished, at their maximum length)
+        self._filenames: List[str] = []
+
+        # The number of annotations/polygon vertices written so far
+        self._num_objects: int = 0
+        self._num_points: int = 0
+
+        self._columns: Dict[str, _ColumnFile] = {
+            column: _ColumnFile(get_column_filename(path, column), dtype, row_shape)
+            for column, (dtype, row_shape) in {**_IMAGE_COLUMNS, **_OBJECT_COLUMNS}.items()
+        }
+        self._columns["object_offsets"].append(np.zeros(1))
+        self._columns["point_offsets"].append(np.zeros(1))
+
+    def append(self, filename: str, image_size: Tuple[int, int], objects: Sequence[YOLOObject]):
+        """
+        Adds the annotations of an image.
+
+        :param filename:
+                    The filename of the image.
+        :param image_size:
+                    The (width, height) of the image.
+        :param objects:
+                    The annotations of the image.
+        """
+        if not isinstance(objects, YOLOObjectTable):
+            objects = YOLOObjectTable.from_objects(objects)
+
+        image_id = len(self._filenames)
+        self._filenames.append(filename)
+        self._columns["image_sizes"].append(np.array([image_size]))
+
+        if len(objects) > 0:
+            columns = self._columns
+            columns["image_ids"].append(np.full(len(objects), image_id))
+            columns["class_indices"].append(objects.class_indices)
+            columns["boxes"].append(objects.boxes)
+            columns["point_offsets"].append(objects.point_offsets[1:] - objects.point_offsets[0] + self._num_points)
+            columns["points"].append(objects.points)
+            self._num_objects += len(objects)
+            self._num_points += len(objects.points)
+
+        self._columns["object_offsets"].append(np.array([self._num_objects]))
+
+    def close(self):
+        """
+        Finishes writing the columnar files.
+        """
+        for column in self._columns.values():
+            column.close()
+
+        np.save(os.path.join(self._path, COLUMNAR_FILES_FILENAME), np.array(self._filenames, dtype=np.str_))
+
+
+class ColumnarDataset:
+    """
+    A split written by ColumnarWriter, with its columns memory-mapped so
+    opening it takes constant time and memory regardless of its size.
+    """
+    def __init__(self, files_filename: str):
+        path = os.path.dirname(files_filename)
+
+        # The directory holding the columnar files
+        self.path: str = path
+
+        # The file table
+        self.filenames: np.ndarray = np.load(files_filename, mmap_mode="r")
+        self.image_sizes: np.ndarray = np.load(get_column_filename(path, "image_sizes"), mmap_mode="r")
+        self.object_offsets: np.ndarray = np.load(get_column_filename(path, "object_offsets"), mmap_mode="r")
+
+        # The annotations
+        self.image_ids: np.ndarray = np.load(get_column_filename(path, "image_ids"), mmap_mode="r")
+        self.class_indices: np.ndarray = np.load(get_column_filename(path, "class_indices"), mmap_mode="r")
+        self.boxes: np.ndarray = np.load(get_column_filename(path, "boxes"), mmap_mode="r")
+        self.point_offsets: np.ndarray = np.load(get_column_filename(path, "point_offsets"), mmap_mode="r")
+        self.points: np.ndarray = np.load(get_column_filename(path, "points"), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    def objects(self, image_id: int) -> YOLOObjectTable:
+        """
+        Gets the annotations of an image.
+
+        :param image_id:
+                    The index of the image in the file table.
+        :return:
+                    The annotations, as views of the memory-mapped columns.
+        """
+        start, end = self.object_offsets[image_id:image_id + 2].tolist()
+        point_offsets = self.point_offsets[start:end + 1]
+        first_point, last_point = int(point_offsets[0]), int(point_offsets[-1])
+
+        return YOLOObjectTable(
+            self.class_indices[start:end],
+            self.boxes[start:end],
+            point_offsets - first_point,
+            self.points[first_point:last_point]
+        )
+
+    def __iter__(self) -> Iterator[Tuple[str, Tuple[int, int], YOLOObjectTable]]:
+        for image_id in range(len(self)):
+            width, height = self.image_sizes[image_id].tolist()
+            yield str(self.filenames[image_id]), (width, height), self.objects(image_id)
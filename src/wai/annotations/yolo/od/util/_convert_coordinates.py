@@ -0,0 +1,235 @@
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from wai.annotations.domain.image.object_detection.util import set_object_label
+
+from wai.common.adams.imaging.locateobjects import LocatedObjects, LocatedObject, constants
+
+from .._format import YOLOObject, YOLOObjectTable
+from ._ClassLabels import ClassLabels
+
+
+def yolo_to_located_objects(
+        objects: Sequence[YOLOObject],
+        labels: Union[ClassLabels, Sequence[str]],
+        image_width: int,
+        image_height: int
+) -> LocatedObjects:
+    """
+    Converts the YOLO annotations of an image to located objects. The pixel
+    co-ordinates of all boxes and polygon vertices are calculated in single
+    array operations, giving the same (round-half-to-even) results as
+    FromYOLOOD.to_located_object.
+
+    :param objects:
+                The YOLO annotations.
+    :param labels:
+                The mapping from class index to label, or empty to use the
+                class index as the label. Raises ClassIndexError for class
+                indices without a label.
+    :param image_width:
+                The width of the image.
+    :param image_height:
+                The height of the image.
+    :return:
+                The located objects.
+    """
+    table = objects if isinstance(objects, YOLOObjectTable) else YOLOObjectTable.from_objects(objects)
+    if not isinstance(labels, ClassLabels):
+        labels = ClassLabels(labels)
+
+    # Look up the labels first, so out-of-range class indices fail before any conversion
+    object_labels = labels.lookup(table.class_indices)
+
+    # Denormalise the boxes (x/y are calculated from the rounded width/height)
+    boxes = table.boxes
+    widths = np.rint(boxes[:, 2] * image_width)
+    heights = np.rint(boxes[:, 3] * image_height)
+    x_mins = np.rint(boxes[:, 0] * image_width - widths / 2)
+    y_mins = np.rint(boxes[:, 1] * image_height - heights / 2)
+    pixel_boxes = np.stack((x_mins, y_mins, widths, heights), axis=1).astype(np.int64).tolist()
+
+    # Denormalise the polygon vertices
+    points = np.rint(table.points * (image_width, image_height)).astype(np.int64)
+    xs = points[:, 0].tolist()
+    ys = points[:, 1].tolist()
+    point_offsets = table.point_offsets.tolist()
+
+    located_objects = LocatedObjects()
+    for index, (label, box) in enumerate(zip(object_labels, pixel_boxes)):
+        located_object = LocatedObject(*box)
+        set_object_label(located_object, label)
+
+        # Store the polygon as LocatedObject.set_polygon would
+        start, end = point_offsets[index], point_offsets[index + 1]
+        if start != end:
+            located_object.metadata[constants.KEY_POLY_X] = ",".join(map(str, xs[start:end]))
+            located_object.metadata[constants.KEY_POLY_Y] = ",".join(map(str, ys[start:end]))
+
+        located_objects.append(located_object)
+
+    return located_objects
+
+
+def located_objects_to_yolo(
+        located_objects: Sequence[LocatedObject],
+        class_indices: Sequence[int],
+        image_width: int,
+        image_height: int,
+        use_polygon_format: bool = False
+) -> YOLOObjectTable:
+    """
+    Converts the located objects of an image to YOLO annotations. The
+    normalised co-ordinates of all boxes and polygon vertices are calculated
+    in single array operations, giving the same results as converting each
+    object on its own (see benchmarks/coordinate_conversion.py).
+
+    :param located_objects:
+                The located objects.
+    :param class_indices:
+                The class index of each located object.
+    :param image_width:
+                The width of the image.
+    :param image_height:
+                The height of the image.
+    :param use_polygon_format:
+                Whether to include polygons (the box outline for objects without one).
+    :return:
+                The YOLO annotations.
+    """
+    if len(located_objects) == 0:
+        return YOLOObjectTable.empty()
+
+    # Gather the pixel boxes
+    pixel_boxes = np.array(
+        [(obj.x, obj.y, obj.width, obj.height) for obj in located_objects],
+        dtype=np.float64
+    )
+
+    # Normalise the boxes to centre-x, centre-y, width, height
+    boxes = np.empty_like(pixel_boxes)
+    boxes[:, 0] = (pixel_boxes[:, 0] + pixel_boxes[:, 2] / 2) / image_width
+    boxes[:, 1] = (pixel_boxes[:, 1] + pixel_boxes[:, 3] / 2) / image_height
+    boxes[:, 2] = pixel_boxes[:, 2] / image_width
+    boxes[:, 3] = pixel_boxes[:, 3] / image_height
+
+    # Gather the pixel polygon vertices, and normalise them all at once
+    point_offsets = np.zeros(len(located_objects) + 1, dtype=np.int64)
+    if use_polygon_format:
+        xs, ys = gather_polygon_coordinates(located_objects, point_offsets)
+        points = np.stack((xs, ys), axis=1) / (image_width, image_height)
+    else:
+        points = np.empty((0, 2), dtype=np.float64)
+
+    return YOLOObjectTable(
+        np.array(class_indices, dtype=np.int64),
+        boxes,
+        point_offsets,
+        points
+    )
+
+
+def box_outlines(boxes: np.ndarray, image_width: int, image_height: int) -> np.ndarray:
+    """
+    Gets the polygon outlines of YOLO boxes, as converting them to located
+    objects and back (with located_objects_to_yolo) gives for objects without
+    a polygon: the boxes are rounded to pixels as yolo_to_located_objects
+    rounds them, and the right/bottom edges are on the last pixel inside the box.
+
+    :param boxes:
+                The normalised boxes (centre-x, centre-y, width, height).
+    :param image_width:
+                The width of the image.
+    :param image_height:
+                The height of the image.
+    :return:
+                The normalised vertices of the outlines (top-left, top-right,
+                bottom-right, bottom-left for each box).
+    """
+    widths = np.rint(boxes[:, 2] * image_width)
+    heights = np.rint(boxes[:, 3] * image_height)
+    left = np.rint(boxes[:, 0] * image_width - widths / 2)
+    top = np.rint(boxes[:, 1] * image_height - heights / 2)
+    right, bottom = left + widths - 1, top + heights - 1
+
+    outlines = np.stack((left, top, right, top, right, bottom, left, bottom), axis=1).reshape(-1, 2)
+    return outlines / (image_width, image_height)
+
+
+def gather_polygon_coordinates(
+        located_objects: Sequence[LocatedObject],
+        point_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gathers the pixel polygon vertices of all located objects (the box outline
+    for objects without a polygon), parsing the polygon meta-data of all objects
+    in one operation. Gives the same co-ordinates as LocatedObject.get_polygon_x/y.
+
+    :param located_objects:
+                The located objects.
+    :param point_offsets:
+                Array to fill with the offset of each object's vertices (one
+                longer than the number of objects, starting with 0).
+    :return:
+                The x and y co-ordinates of all vertices.
+    """
+    x_strings: List[str] = []
+    y_strings: List[str] = []
+    for obj in located_objects:
+        if obj.has_polygon():
+            x_strings.append(obj.metadata[constants.KEY_POLY_X])
+            y_strings.append(obj.metadata[constants.KEY_POLY_Y])
+        else:
+            right, bottom = obj.x + obj.width - 1, obj.y + obj.height - 1
+            x_strings.append(f"{obj.x},{right},{right},{obj.x}")
+            y_strings.append(f"{obj.y},{obj.y},{bottom},{bottom}")
+
+    vertex_counts = [x_string.count(",") + 1 for x_string in x_strings]
+
+    try:
+        if vertex_counts != [y_string.count(",") + 1 for y_string in y_strings]:
+            raise ValueError("Mismatched polygon co-ordinates")
+        xs = np.rint(np.array(",".join(x_strings).split(","), dtype=np.float64))
+        ys = np.rint(np.array(",".join(y_strings).split(","), dtype=np.float64))
+        if not (np.isfinite(xs).all() and np.isfinite(ys).all()):
+            raise ValueError("Non-finite polygon co-ordinates")
+    except ValueError:
+        # Let the located objects parse (and report problems with) their own polygons
+        return gather_polygon_coordinates_per_object(located_objects, point_offsets)
+
+    np.cumsum(vertex_counts, out=point_offsets[1:])
+
+    return xs, ys
+
+
+def gather_polygon_coordinates_per_object(
+        located_objects: Sequence[LocatedObject],
+        point_offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Slow path of gather_polygon_coordinates, which gets the vertices of each
+    located object separately.
+
+    :param located_objects:
+                The located objects.
+    :param point_offsets:
+                Array to fill with the offset of each object's vertices.
+    :return:
+                The x and y co-ordinates of all vertices.
+    """
+    xs: List[int] = []
+    ys: List[int] = []
+    for index, obj in enumerate(located_objects):
+        if obj.has_polygon():
+            polygon_xs, polygon_ys = obj.get_polygon_x(), obj.get_polygon_y()
+            vertex_count = min(len(polygon_xs), len(polygon_ys))
+            xs.extend(polygon_xs[:vertex_count])
+            ys.extend(polygon_ys[:vertex_count])
+        else:
+            right, bottom = obj.x + obj.width - 1, obj.y + obj.height - 1
+            xs.extend((obj.x, right, right, obj.x))
+            ys.extend((obj.y, obj.y, bottom, bottom))
+        point_offsets[index + 1] = len(xs)
+
+    return np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64)
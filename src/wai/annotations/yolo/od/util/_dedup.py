@@ -0,0 +1,150 @@
+import hashlib
+import os
+import sqlite3
+from typing import List, NamedTuple, Optional, Tuple
+
+# The policies for writing duplicate images
+DEDUP_POLICIES = ("link", "skip", "merge")
+
+# The size of the chunks image files are hashed in
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_data(data: bytes) -> str:
+    """
+    Hashes the content of an image held in memory.
+
+    :param data:
+                The image data.
+    :return:
+                The hex digest of the content.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def hash_file(filename: str) -> str:
+    """
+    Hashes the content of an image file, reading it in chunks rather than
+    all at once. Gives the same digest as hash_data of the file's data.
+
+    :param filename:
+                The image file.
+    :return:
+                The hex digest of the content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """
+    SQLite database of the content hashes of image files, keyed by path and
+    holding the modification time and size of each file when it was hashed,
+    so unchanged files aren't read again to hash them the next time a
+    conversion is run. Entries are committed in batches.
+    """
+    def __init__(self, filename: str, batch_size: int = 1000):
+        # The number of entries to buffer before committing them
+        self._batch_size: int = batch_size
+
+        # The entries not yet committed
+        self._pending: List[Tuple[str, int, int, str]] = []
+
+        # The number of hashes found in/missing from the cache
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._connection: sqlite3.Connection = sqlite3.connect(filename, timeout=60)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, "
+            "mtime_ns INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "digest TEXT NOT NULL"
+            ")"
+        )
+        self._connection.commit()
+
+    def hash_file(self, filename: str) -> str:
+        """
+        Gets the content hash of an image file, from the cache if the file is
+        unchanged since it was hashed.
+
+        :param filename:
+                    The image file.
+        :return:
+                    The hex digest of the content.
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        row = self._connection.execute(
+            "SELECT digest FROM hashes WHERE path = ? AND mtime_ns = ? AND size = ?",
+            (path, stat.st_mtime_ns, stat.st_size)
+        ).fetchone()
+        if row is not None:
+            self.hits += 1
+            return row[0]
+
+        self.misses += 1
+        digest = hash_file(path)
+        self._pending.append((path, stat.st_mtime_ns, stat.st_size, digest))
+        if len(self._pending) >= self._batch_size:
+            self._commit()
+        return digest
+
+    def close(self):
+        """
+        Commits any outstanding entries and closes the cache.
+        """
+        self._commit()
+        self._connection.close()
+
+    def _commit(self):
+        """
+        Commits the pending entries.
+        """
+        if len(self._pending) == 0:
+            return
+
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)", self._pending)
+
+        self._pending = []
+
+
+class FirstCopy(NamedTuple):
+    """
+    Where the first copy of an image was written.
+    """
+    # The split it was written to
+    split: Optional[str]
+
+    # The image file
+    image_filename: str
+
+    # The label file (whether or not it was written, as the image may have been a negative)
+    labels_filename: str
+
+
+def merge_label_lines(text: str, extra_text: str) -> str:
+    """
+    Adds the annotations of a duplicate image to the contents of a label
+    file, leaving out annotations which are already there.
+
+    :param text:
+                The contents of the label file.
+    :param extra_text:
+                The annotations of the duplicate.
+    :return:
+                The combined contents.
+    """
+    lines = [line for line in text.split("\n") if line != ""]
+    seen = set(lines)
+    for line in extra_text.split("\n"):
+        if line != "" and line not in seen:
+            lines.append(line)
+            seen.add(line)
+    return "\n".join(lines)
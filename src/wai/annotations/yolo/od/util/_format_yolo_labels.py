@@ -0,0 +1,85 @@
+from itertools import chain
+from typing import Dict, List, Optional, Sequence
+
+from .._format import YOLOObject, YOLOObjectTable
+
+
+def format_yolo_labels(objects: Sequence[YOLOObject], precision: Optional[int] = None) -> str:
+    """
+    Formats all annotations of an image as the contents of a YOLO label file,
+    in a single formatting operation. Rather than formatting each annotation
+    separately, the values of all annotations are gathered into one flat buffer
+    and formatted with a template built for the whole file.
+
+    :param objects:
+                The annotations to format.
+    :param precision:
+                The number of decimal places to format co-ordinates with, or None
+                to match str(YOLOObject) (bounding-boxes at full precision,
+                polygons to 6 decimal places).
+    :return:
+                The label file contents (one annotation per line, no trailing newline).
+    """
+    if precision is not None and precision < 0:
+        raise ValueError(f"Precision must be non-negative, got {precision}")
+
+    templates = _LineTemplates(precision)
+    lines: List[str] = []
+    values: list = []
+
+    if isinstance(objects, YOLOObjectTable):
+        # Convert the table's buffers to Python values once, and slice each line's values from them
+        points = objects.points.ravel().tolist()
+        point_offsets = objects.point_offsets.tolist()
+        for index, (class_index, box) in enumerate(zip(objects.class_indices.tolist(), objects.boxes.tolist())):
+            start, end = point_offsets[index], point_offsets[index + 1]
+            values.append(class_index)
+            if start != end:
+                lines.append(templates.polygon(end - start))
+                values.extend(points[2 * start:2 * end])
+            else:
+                lines.append(templates.bbox)
+                values.extend(box)
+    else:
+        for obj in objects:
+            values.append(obj.class_index)
+            if obj.has_polygon():
+                lines.append(templates.polygon(len(obj.poly_x)))
+                values.extend(chain.from_iterable(zip(obj.poly_x, obj.poly_y)))
+            else:
+                lines.append(templates.bbox)
+                values.extend((obj.centre_x, obj.centre_y, obj.width, obj.height))
+
+    return "\n".join(lines) % tuple(values)
+
+
+class _LineTemplates:
+    """
+    Cache of the %-format templates for each type of line in a label file.
+    """
+    def __init__(self, precision: Optional[int]):
+        # Co-ordinate formats matching YOLOObject.to_bbox/to_polygon by default (%s
+        # rather than %r, so NumPy scalars are written as numbers as they are there)
+        bbox_coordinate = "%s" if precision is None else f"%.{precision}f"
+        self._polygon_coordinate: str = "%f" if precision is None else f"%.{precision}f"
+
+        # The template for bounding-box lines
+        self.bbox: str = "%d" + f" {bbox_coordinate}" * 4
+
+        # The templates for polygon lines, by number of vertices
+        self._polygons: Dict[int, str] = {}
+
+    def polygon(self, num_vertices: int) -> str:
+        """
+        Gets the template for a polygon line.
+
+        :param num_vertices:
+                    The number of vertices in the polygon.
+        :return:
+                    The template.
+        """
+        template = self._polygons.get(num_vertices, None)
+        if template is None:
+            template = "%d" + f" {self._polygon_coordinate}" * (2 * num_vertices)
+            self._polygons[num_vertices] = template
+        return template
@@ -0,0 +1,170 @@
+import os
+from typing import Dict, List, Optional
+
+# The header of labels CSV files (as written by to-yolo-od --labels-csv)
+LABELS_CSV_HEADER = "Index,Label"
+
+# The name of files holding one label per line (in the Darknet/YOLO convention)
+CLASSES_FILENAME = "classes.txt"
+
+# The extensions of YOLO dataset descriptions (data.yaml), whose 'names' are the labels
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+def read_labels_file(filename: str) -> List[str]:
+    """
+    Reads a labels file, the comma-separated labels in class-index order.
+
+    :param filename:
+                The labels file.
+    :return:
+                The labels.
+    """
+    with open(filename, "r") as labels_file:
+        return [x.strip() for x in labels_file.read().split(",")]
+
+
+def read_class_names(filename: str) -> List[Optional[str]]:
+    """
+    Reads the label of each class index from one of:
+
+    - a labels file (comma-separated labels)
+    - a labels CSV file (recognised by its 'Index,Label' header)
+    - a classes.txt file (one label per line; any file named classes.txt,
+      or with more than one line and no commas)
+    - a data.yaml file (the 'names' list, or mapping from class index to label)
+
+    :param filename:
+                The file to read.
+    :return:
+                The label of each class index, or None for indices without one.
+    """
+    if os.path.splitext(filename)[1].lower() in YAML_EXTENSIONS:
+        return read_yaml_class_names(filename)
+
+    with open(filename, "r") as labels_file:
+        text = labels_file.read()
+    lines = [line.strip() for line in text.splitlines()]
+    while len(lines) > 0 and lines[-1] == "":
+        lines.pop()
+
+    if len(lines) == 0:
+        return []
+
+    if lines[0] == LABELS_CSV_HEADER:
+        rows = [line.split(",", 1) for line in lines[1:] if line != ""]
+        if any(len(row) != 2 for row in rows):
+            raise ValueError(f"Expected 'index,label' rows in {filename}")
+        return _index_class_names(((index, label.strip()) for index, label in rows), filename)
+
+    # Labels files are only split at the commas (as read_labels_file does), even if they wrap onto more lines
+    is_classes_file = os.path.basename(filename).lower() == CLASSES_FILENAME
+    if not is_classes_file and (len(lines) == 1 or any("," in line for line in lines)):
+        return [x.strip() for x in text.split(",")]
+
+    return lines
+
+
+def read_yaml_class_names(filename: str) -> List[Optional[str]]:
+    """
+    Reads the labels from the 'names' of a YOLO dataset description (data.yaml).
+    Requires PyYAML.
+
+    :param filename:
+                The data.yaml file.
+    :return:
+                The label of each class index, or None for indices without one.
+    """
+    try:
+        import yaml
+    except ImportError as e:
+        raise Exception(f"Reading labels from {filename} requires PyYAML (pip install pyyaml)") from e
+
+    with open(filename, "r") as yaml_file:
+        description = yaml.safe_load(yaml_file)
+
+    names = description.get("names", None) if isinstance(description, dict) else None
+    if isinstance(names, list):
+        return [str(name) for name in names]
+    if isinstance(names, dict):
+        return _index_class_names(names.items(), filename)
+
+    raise Exception(f"No 'names' list or mapping in {filename}")
+
+
+def _index_class_names(items, filename: str) -> List[Optional[str]]:
+    """
+    Arranges (class index, label) pairs into the label of each class index.
+
+    :param items:
+                The class indices (which may be strings) and labels.
+    :param filename:
+                The file they were read from, for error messages.
+    :return:
+                The label of each class index, or None for indices without one.
+    """
+    indexed: Dict[int, str] = {}
+    for index, label in items:
+        try:
+            index = int(index)
+        except ValueError:
+            raise ValueError(f"Invalid class index '{index}' in {filename}")
+        if index < 0:
+            raise ValueError(f"Negative class index {index} in {filename}")
+        if index in indexed:
+            raise ValueError(f"Duplicate class index {index} in {filename}")
+        indexed[index] = str(label)
+
+    names: List[Optional[str]] = [None] * (max(indexed, default=-1) + 1)
+    for index, label in indexed.items():
+        names[index] = label
+    return names
+
+
+def read_label_indices(filename: str) -> Dict[str, int]:
+    """
+    Reads the label to class-index mapping from any of the files supported
+    by read_class_names.
+
+    :param filename:
+                The file to read.
+    :return:
+                The class index of each label, in class-index order.
+    """
+    indices: Dict[str, int] = {}
+    for index, label in enumerate(read_class_names(filename)):
+        if label is None:
+            continue
+        if label in indices:
+            raise ValueError(f"Duplicate label '{label}' in {filename}")
+        indices[label] = index
+    return indices
+
+
+def write_labels_file(filename: str, labels: Dict[str, int]):
+    """
+    Writes a labels file, the comma-separated labels (which should be in
+    class-index order, with indices contiguous from 0).
+
+    :param filename:
+                The labels file.
+    :param labels:
+                The class index of each label.
+    """
+    with open(filename, "w") as labels_file:
+        labels_file.write(",".join(labels.keys()))
+
+
+def write_labels_csv_file(filename: str, labels: Dict[str, int]):
+    """
+    Writes a labels CSV file, the class index and label of each label.
+
+    :param filename:
+                The labels CSV file.
+    :param labels:
+                The class index of each label.
+    """
+    with open(filename, "w") as labels_csv_file:
+        labels_csv_file.write(LABELS_CSV_HEADER)
+        for label, index in labels.items():
+            labels_csv_file.write(f"\n{index},{label}")
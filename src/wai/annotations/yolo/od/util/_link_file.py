@@ -0,0 +1,53 @@
+import os
+import shutil
+
+# The ways a file can be materialised at a new location
+LINK_MODES = ("copy", "hardlink", "symlink", "reflink")
+
+# The Linux ioctl request for cloning a file's extents (from linux/fs.h)
+_FICLONE = 0x40049409
+
+
+def link_file(source_path: str, destination_path: str, link_mode: str = "copy") -> str:
+    """
+    Materialises a file at a new location. Modes other than "copy" avoid
+    copying the file's data, but fall back to copying if the filesystem
+    doesn't support them (e.g. linking across devices).
+
+    :param source_path:
+                The file to materialise.
+    :param destination_path:
+                Where to materialise it. Replaced if it already exists.
+    :param link_mode:
+                One of LINK_MODES.
+    :return:
+                The mode that was actually used.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode '{link_mode}', expected one of: {', '.join(LINK_MODES)}")
+
+    # Nothing to do if the destination already is the source
+    if os.path.exists(destination_path) and os.path.samefile(source_path, destination_path):
+        return link_mode
+
+    # Linking can't replace an existing file
+    if link_mode != "copy" and os.path.lexists(destination_path):
+        os.remove(destination_path)
+
+    try:
+        if link_mode == "hardlink":
+            os.link(source_path, destination_path)
+            return link_mode
+        elif link_mode == "symlink":
+            os.symlink(os.path.abspath(source_path), destination_path)
+            return link_mode
+        elif link_mode == "reflink":
+            import fcntl
+            with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+                fcntl.ioctl(destination.fileno(), _FICLONE, source.fileno())
+            return link_mode
+    except (OSError, ImportError):
+        pass
+
+    shutil.copyfile(source_path, destination_path)
+    return "copy"
@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from wai.annotations.core.domain import Data
+
+# The attribute of a data-file which holds its source record
+_SOURCE_RECORD_ATTRIBUTE = "_yolo_source_record"
+
+
+class SourceRecord(NamedTuple):
+    """
+    The identity of the input files an element was read from: the label file
+    (or image, for negatives) and the associated image, with the modification
+    time and size of each when it was read.
+    """
+    source_path: str
+    source_mtime_ns: int
+    source_size: int
+    image_path: Optional[str] = None
+    image_mtime_ns: Optional[int] = None
+    image_size: Optional[int] = None
+
+
+def make_source_record(source_path: str, image_path: Optional[str] = None) -> SourceRecord:
+    """
+    Creates a source record for the current state of some input files.
+
+    :param source_path:
+                The label file (or image, for negatives).
+    :param image_path:
+                The image associated with the label file, if any.
+    :return:
+                The source record.
+    """
+    source_stat = os.stat(source_path)
+    if image_path is None:
+        return SourceRecord(os.path.abspath(source_path), source_stat.st_mtime_ns, source_stat.st_size)
+
+    image_stat = os.stat(image_path)
+    return SourceRecord(
+        os.path.abspath(source_path),
+        source_stat.st_mtime_ns,
+        source_stat.st_size,
+        os.path.abspath(image_path),
+        image_stat.st_mtime_ns,
+        image_stat.st_size
+    )
+
+
+def set_source_record(data_file: Data, record: Optional[SourceRecord]):
+    """
+    Attaches a source record to a data-file, so components further down the
+    pipeline know which input files it was read from.
+
+    :param data_file:
+                The data-file (e.g. image).
+    :param record:
+                The source record, or None to remove it.
+    """
+    setattr(data_file, _SOURCE_RECORD_ATTRIBUTE, record)
+
+
+def get_source_record(data_file: Data) -> Optional[SourceRecord]:
+    """
+    Gets the source record attached to a data-file.
+
+    :param data_file:
+                The data-file (e.g. image).
+    :return:
+                The source record, or None if none is attached.
+    """
+    return getattr(data_file, _SOURCE_RECORD_ATTRIBUTE, None)
+
+
+class Manifest:
+    """
+    SQLite database of the input files which have been converted, keyed by
+    source path and holding the modification time and size of the files when
+    they were read. Inputs whose files are unchanged since they were recorded
+    can be skipped when the conversion is run again. Records are committed in
+    batches, and can be added from multiple threads. So that the files written
+    by a later run are consistent with those already written, the manifest
+    also holds the class index of each label and the split each input file
+    was written to.
+    """
+    def __init__(self, filename: str, batch_size: int = 1000):
+        # The number of records to buffer before committing them
+        self._batch_size: int = batch_size
+
+        # The records not yet committed
+        self._pending: List[SourceRecord] = []
+
+        # The splits of input files not yet committed
+        self._pending_splits: List[Tuple[str, str]] = []
+
+        # The number of records added
+        self.num_recorded: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(filename, timeout=60, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "source_path TEXT PRIMARY KEY, "
+            "source_mtime_ns INTEGER NOT NULL, "
+            "source_size INTEGER NOT NULL, "
+            "image_path TEXT, "
+            "image_mtime_ns INTEGER, "
+            "image_size INTEGER"
+            ")"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            "label TEXT PRIMARY KEY, "
+            "class_index INTEGER NOT NULL"
+            ")"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS splits ("
+            "source_path TEXT PRIMARY KEY, "
+            "split TEXT NOT NULL"
+            ")"
+        )
+        self._connection.commit()
+
+    def is_unchanged(self, record: SourceRecord) -> bool:
+        """
+        Whether the input files of a source record are recorded in the manifest
+        with the same modification times and sizes.
+
+        :param record:
+                    The current source record of the input files.
+        :return:
+                    True if the files haven't changed since they were recorded.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM sources WHERE source_path = ?",
+                (record.source_path,)
+            ).fetchone()
+
+        return row is not None and SourceRecord(*row) == record
+
+    def record(self, record: SourceRecord):
+        """
+        Records that the input files of a source record have been converted.
+
+        :param record:
+                    The source record.
+        """
+        with self._lock:
+            self._pending.append(record)
+            self.num_recorded += 1
+            if len(self._pending) >= self._batch_size:
+                self._commit()
+
+    def read_labels(self) -> Dict[str, int]:
+        """
+        Reads the class index of each label used by the previous conversions.
+
+        :return:
+                    The label mapping, in class-index order.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT label, class_index FROM labels ORDER BY class_index").fetchall()
+
+        return dict(rows)
+
+    def record_label(self, label: str, class_index: int):
+        """
+        Records the class index of a label. Committed straight away, as the
+        label files using it may be recorded as written at any time.
+
+        :param label:
+                    The label.
+        :param class_index:
+                    Its class index.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO labels VALUES (?, ?)", (label, class_index))
+
+    def get_split(self, source_path: str) -> Optional[str]:
+        """
+        Gets the split the outputs of an input file were written to.
+
+        :param source_path:
+                    The label file (or image, for negatives).
+        :return:
+                    The name of the split, or None if it hasn't been written to one.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT split FROM splits WHERE source_path = ?",
+                (os.path.abspath(source_path),)
+            ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def record_split(self, source_path: str, split: str):
+        """
+        Records the split the outputs of an input file are written to.
+
+        :param source_path:
+                    The label file (or image, for negatives).
+        :param split:
+                    The name of the split.
+        """
+        with self._lock:
+            self._pending_splits.append((os.path.abspath(source_path), split))
+            if len(self._pending_splits) >= self._batch_size:
+                self._commit()
+
+    def close(self):
+        """
+        Commits any outstanding records and closes the manifest.
+        """
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+    def _commit(self):
+        """
+        Commits the pending records and splits. Must be called with the lock held.
+        """
+        if len(self._pending) == 0 and len(self._pending_splits) == 0:
+            return
+
+        # A file's split is recorded before its outputs are written, so it is never committed after its record
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO splits VALUES (?, ?)", self._pending_splits)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+
+        self._pending = []
+        self._pending_splits = []
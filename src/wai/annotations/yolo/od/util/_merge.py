@@ -0,0 +1,171 @@
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .._format import YOLOObjectTable
+from ._columnar import COLUMNAR_FILES_FILENAME, COLUMNAR_PREFIX, ColumnarDataset, ColumnarWriter
+from ._link_file import link_file
+
+# The sub-directories of a to-yolo-od output directory
+OUTPUT_DIRECTORIES = ("images", "labels")
+
+
+def merge_label_indices(mappings: Sequence[Dict[str, int]]) -> Tuple[Dict[str, int], List[Optional[np.ndarray]]]:
+    """
+    Combines the label to class-index mappings of several conversions into
+    one. The class indices of the first are kept, and labels the others add
+    are given the next class indices, in the order they are met.
+
+    :param mappings:
+                The class index of each label, for each conversion.
+    :return:
+                The combined mapping, and for each conversion, the combined
+                class index of each of its class indices (or None if they are
+                the same).
+    """
+    merged: Dict[str, int] = dict(mappings[0]) if len(mappings) > 0 else {}
+    for mapping in mappings[1:]:
+        for label in mapping:
+            if label not in merged:
+                merged[label] = max(merged.values(), default=-1) + 1
+
+    remaps: List[Optional[np.ndarray]] = []
+    for mapping in mappings:
+        remap = np.full(max(mapping.values(), default=-1) + 1, -1, dtype=np.int64)
+        for label, index in mapping.items():
+            remap[index] = merged[label]
+        is_known = remap >= 0
+        remaps.append(None if np.array_equal(remap[is_known], np.flatnonzero(is_known)) else remap)
+
+    return merged, remaps
+
+
+def remap_label_text(text: str, remap: np.ndarray, filename: str) -> str:
+    """
+    Changes the class indices of the annotations in the contents of a label
+    file, leaving the rest of each line as it is.
+
+    :param text:
+                The contents of the label file.
+    :param remap:
+                The new class index of each class index.
+    :param filename:
+                The label file, for error messages.
+    :return:
+                The new contents.
+    """
+    lines = text.split("\n")
+    for line_number, line in enumerate(lines):
+        if line.strip() == "":
+            continue
+        class_index, separator, rest = line.lstrip().partition(" ")
+        try:
+            new_index = int(remap[int(class_index)])
+        except (ValueError, IndexError):
+            new_index = -1
+        if new_index < 0:
+            raise ValueError(f"Class index '{class_index}' on line {line_number + 1} of {filename} has no label")
+        lines[line_number] = f"{new_index}{separator}{rest}"
+    return "\n".join(lines)
+
+
+def merge_columnar(paths: Sequence[str], remaps: Sequence[Optional[np.ndarray]], output_path: str) -> int:
+    """
+    Concatenates the columnar files of the same split of several conversions.
+
+    :param paths:
+                The directories holding the columnar files of each conversion.
+    :param remaps:
+                The combined class index of each class index of each conversion (or None).
+    :param output_path:
+                The directory to write the combined columnar files to.
+    :return:
+                The number of images in the combined files.
+    """
+    writer = ColumnarWriter(output_path)
+    num_images = 0
+    for path, remap in zip(paths, remaps):
+        for filename, image_size, table in ColumnarDataset(os.path.join(path, COLUMNAR_FILES_FILENAME)):
+            if remap is not None and len(table) > 0:
+                table = YOLOObjectTable(remap[table.class_indices], table.boxes, table.point_offsets, table.points)
+            writer.append(filename, image_size, table)
+            num_images += 1
+    writer.close()
+    return num_images
+
+
+def list_output_files(path: str) -> Tuple[List[Tuple[str, bool]], List[str]]:
+    """
+    Lists the files written by a conversion.
+
+    :param path:
+                The output directory of the conversion.
+    :return:
+                The images and label files, relative to the output directory
+                (with whether each is a label file), and the directories
+                holding columnar files (also relative).
+    """
+    files = []
+    columnar_paths = []
+    for directory in OUTPUT_DIRECTORIES:
+        for root, _, filenames in os.walk(os.path.join(path, directory)):
+            relative_root = os.path.relpath(root, path)
+            for filename in sorted(filenames):
+                if directory == "labels" and is_columnar_file(filename):
+                    if filename == COLUMNAR_FILES_FILENAME:
+                        columnar_paths.append(relative_root)
+                    continue
+                is_label_file = directory == "labels" and filename.endswith(".txt")
+                files.append((os.path.join(relative_root, filename), is_label_file))
+    return sorted(files), sorted(columnar_paths)
+
+
+def is_columnar_file(filename: str) -> bool:
+    """
+    Whether a file in a labels directory is one of the columnar files.
+
+    :param filename:
+                The name of the file.
+    :return:
+                True for columnar files.
+    """
+    return filename.startswith(COLUMNAR_PREFIX) and filename.endswith(".npy")
+
+
+def merge_file(
+        source_path: str,
+        destination_path: str,
+        is_label_file: bool,
+        remap: Optional[np.ndarray],
+        link_mode: str = "copy"
+) -> bool:
+    """
+    Copies (or links) a file of a conversion into the combined output,
+    changing the class indices of label files whose conversion used different ones.
+
+    :param source_path:
+                The file.
+    :param destination_path:
+                Where to put it.
+    :param is_label_file:
+                Whether the file is a label file (rather than an image).
+    :param remap:
+                The combined class index of each class index of the
+                conversion, or None if they are the same.
+    :param link_mode:
+                How to materialise files which aren't changed.
+    :return:
+                Whether the file's class indices were changed.
+    """
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+
+    if remap is None or not is_label_file:
+        link_file(source_path, destination_path, link_mode)
+        return False
+
+    with open(source_path, "r") as file:
+        text = file.read()
+    with open(destination_path, "w") as file:
+        file.write(remap_label_text(text, remap, source_path))
+    return True
@@ -0,0 +1,196 @@
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .._format import YOLOObject, YOLOObjectTable
+
+
+class _FallbackToLineParsing(Exception):
+    """
+    Raised internally when the bulk parser encounters input it can't
+    handle identically to YOLOObject.from_string.
+    """
+    pass
+
+
+def split_label_lines(text: str) -> List[str]:
+    """
+    Splits the contents of a label file into lines, in the same manner
+    as reading the file with readlines.
+
+    :param text:
+                The text contents of the label file.
+    :return:
+                The lines of the file.
+    """
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def parse_yolo_label_arrays(
+        lines: Sequence[str],
+        use_polygon_format: bool = False
+) -> Tuple[List[int], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses YOLO annotation lines in a single pass into NumPy arrays.
+
+    :param lines:
+                The annotation lines to parse.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :return:
+                The class index of each row, the (N, 4) centre-x/centre-y/width/height
+                matrix, a boolean array of which rows are polygons, the (N + 1) offsets
+                of each row into the points buffer and the (M, 2) buffer of polygon points.
+    """
+    # Strip each line and count its parts
+    stripped = [line.strip() for line in lines]
+    num_parts = np.array([line.count(" ") for line in stripped], dtype=np.int64) + 1
+
+    # Auto-detect the format of each row
+    is_polygon = (use_polygon_format | (num_parts > 5)) & (num_parts % 2 == 1) & (num_parts >= 3)
+    is_bbox = ~is_polygon & (num_parts == 5)
+    if not np.all(is_polygon | is_bbox):
+        raise _FallbackToLineParsing()
+
+    # Convert all tokens in one go
+    tokens = " ".join(stripped).split(" ")
+    try:
+        values = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        raise _FallbackToLineParsing()
+
+    # Python's min/max handle non-finite values differently to NumPy
+    if not np.all(np.isfinite(values)):
+        raise _FallbackToLineParsing()
+
+    # Extract the class indices from the start of each row
+    row_starts = np.cumsum(num_parts) - num_parts
+    try:
+        class_indices = [int(tokens[index]) for index in row_starts.tolist()]
+    except ValueError:
+        raise _FallbackToLineParsing()
+
+    # All rows have an even number of co-ordinates, so can be viewed as (x, y) pairs
+    is_coordinate = np.ones(len(values), dtype=bool)
+    is_coordinate[row_starts] = False
+    points = values[is_coordinate].reshape(-1, 2)
+    point_counts = (num_parts - 1) // 2
+    point_offsets = np.zeros(len(num_parts) + 1, dtype=np.int64)
+    np.cumsum(point_counts, out=point_offsets[1:])
+
+    boxes = np.empty((len(num_parts), 4), dtype=np.float64)
+
+    # Bbox rows store their values directly
+    if np.any(is_bbox):
+        boxes[is_bbox] = points[point_offsets[:-1][is_bbox, np.newaxis] + np.arange(2)].reshape(-1, 4)
+
+    # Polygon rows derive their bounds from the vertices
+    if np.any(is_polygon) and len(points) > 0:
+        minimums = np.minimum.reduceat(points, point_offsets[:-1], axis=0)[is_polygon]
+        maximums = np.maximum.reduceat(points, point_offsets[:-1], axis=0)[is_polygon]
+        sizes = maximums - minimums
+        boxes[is_polygon, :2] = minimums + sizes / 2
+        boxes[is_polygon, 2:] = sizes
+
+    return class_indices, boxes, is_polygon, point_offsets, points
+
+
+def parse_yolo_table(lines: Sequence[str], use_polygon_format: bool = False) -> YOLOObjectTable:
+    """
+    Parses YOLO annotation lines into a compact table, without creating
+    a Python object per annotation.
+
+    :param lines:
+                The annotation lines to parse.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :return:
+                The table of annotations.
+    """
+    if len(lines) == 0:
+        return YOLOObjectTable.empty()
+
+    try:
+        class_indices, boxes, is_polygon, point_offsets, points = parse_yolo_label_arrays(lines, use_polygon_format)
+    except _FallbackToLineParsing:
+        # Let the line-parser produce the result (or raise the appropriate error)
+        return YOLOObjectTable.from_objects(
+            YOLOObject.from_string(line, use_polygon_format=use_polygon_format) for line in lines
+        )
+
+    # Only keep the vertices of polygon rows (bbox rows store their values in the boxes)
+    point_counts = np.diff(point_offsets)
+    if not np.all(is_polygon):
+        points = points[np.repeat(is_polygon, point_counts)]
+        point_counts[~is_polygon] = 0
+        np.cumsum(point_counts, out=point_offsets[1:])
+
+    return YOLOObjectTable(np.array(class_indices, dtype=np.int64), boxes, point_offsets, points)
+
+
+def parse_yolo_labels(lines: Sequence[str], use_polygon_format: bool = False) -> Tuple[YOLOObject, ...]:
+    """
+    Parses YOLO annotation lines into YOLO objects. Gives the same results
+    as calling YOLOObject.from_string on each line, but processes all lines
+    in bulk.
+
+    :param lines:
+                The annotation lines to parse.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :return:
+                The YOLO objects.
+    """
+    # Bbox-only input has no vertex loops to vectorise, so the line-parser is quicker
+    if not use_polygon_format and all(line.count(" ") < 5 for line in lines):
+        return tuple(YOLOObject.from_string(line) for line in lines)
+
+    return parse_yolo_table(lines, use_polygon_format).to_objects()
+
+
+def read_yolo_label_file(filename: str, use_polygon_format: bool = False) -> YOLOObjectTable:
+    """
+    Reads all YOLO annotations from a label file.
+
+    :param filename:
+                The label file to read.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :return:
+                The table of annotations.
+    """
+    with open(filename, "r") as file:
+        return parse_yolo_table(split_label_lines(file.read()), use_polygon_format)
+
+
+def read_yolo_label_files(
+        filenames: Iterable[str],
+        use_polygon_format: bool = False
+) -> List[YOLOObjectTable]:
+    """
+    Reads a chunk of label files, parsing all of their lines in a single pass.
+
+    :param filenames:
+                The label files to read.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :return:
+                The table of annotations for each file, in order.
+    """
+    # Read all lines, remembering where each file's lines start
+    lines = []
+    line_offsets = [0]
+    for filename in filenames:
+        with open(filename, "r") as file:
+            lines += split_label_lines(file.read())
+        line_offsets.append(len(lines))
+
+    table = parse_yolo_table(lines, use_polygon_format)
+
+    return [
+        table[start:end]
+        for start, end in zip(line_offsets[:-1], line_offsets[1:])
+    ]
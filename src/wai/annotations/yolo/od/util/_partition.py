@@ -0,0 +1,75 @@
+import hashlib
+import os
+
+# The directories of the dataset layout which shard keys are taken relative to
+SHARD_ROOT_DIRECTORIES = ("labels", "images")
+
+
+def get_shard_key(filename: str) -> str:
+    """
+    Gets the key a file is assigned to a shard by: its path relative to the
+    innermost 'labels' (or, for negatives, 'images') directory it is in, or
+    the normalised path if it isn't in one. The key uses forward slashes, so
+    it is the same on every machine the dataset is mounted on, wherever it
+    is mounted.
+
+    :param filename:
+                The label file (or image, for negatives).
+    :return:
+                The shard key.
+    """
+    parts = os.path.normpath(filename).replace(os.sep, "/").split("/")
+    for index in range(len(parts) - 2, -1, -1):
+        if parts[index] in SHARD_ROOT_DIRECTORIES:
+            return "/".join(parts[index + 1:])
+    return "/".join(parts)
+
+
+def get_shard_index(filename: str, shard_count: int) -> int:
+    """
+    Gets the shard a file belongs to, from a stable hash of its shard key
+    (unlike hash(), the same in every process and on every machine).
+
+    :param filename:
+                The label file (or image, for negatives).
+    :param shard_count:
+                The number of shards.
+    :return:
+                The index of the shard.
+    """
+    digest = hashlib.blake2b(get_shard_key(filename).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+
+class Partition:
+    """
+    One of several disjoint slices of the input files, so a conversion can be
+    split across machines: each runs with the same inputs and a different
+    shard index, and the outputs are combined with yolo-od-merge.
+    """
+    def __init__(self, shard_index: int, shard_count: int):
+        if shard_count < 1:
+            raise ValueError(f"Shard count must be at least 1, got {shard_count}")
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Shard index must be in [0, {shard_count}), got {shard_index}")
+
+        self.shard_index: int = shard_index
+        self.shard_count: int = shard_count
+
+        # The number of files skipped for belonging to other shards
+        self.num_skipped: int = 0
+
+    def contains(self, filename: str) -> bool:
+        """
+        Whether a file belongs to this shard, counting those which don't.
+
+        :param filename:
+                    The label file (or image, for negatives).
+        :return:
+                    True if the file should be read.
+        """
+        if get_shard_index(filename, self.shard_count) == self.shard_index:
+            return True
+
+        self.num_skipped += 1
+        return False
@@ -0,0 +1,74 @@
+import io
+from typing import Optional, Tuple, Union
+
+from PIL import Image as PILImage
+
+# The image modes each output format can store without conversion
+_SUPPORTED_MODES = {
+    "JPEG": ("RGB", "L", "CMYK"),
+    "PNG": ("RGB", "RGBA", "L", "LA", "P", "I", "1"),
+    "BMP": ("RGB", "L", "P", "1"),
+}
+
+
+def get_resized_size(size: Tuple[int, int], max_size: Optional[int]) -> Tuple[int, int]:
+    """
+    Gets the size an image is scaled down to, so its longest side is at most
+    a maximum (keeping its aspect ratio). Images which are small enough keep
+    their size.
+
+    :param size:
+                The (width, height) of the image.
+    :param max_size:
+                The maximum length of the longest side, or None for no maximum.
+    :return:
+                The (width, height) to scale the image to.
+    """
+    width, height = size
+    if max_size is None or max(width, height) <= max_size:
+        return size
+
+    scale = max_size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def resize_image(
+        source: Union[bytes, str],
+        size: Tuple[int, int],
+        format_string: str,
+        quality: int
+) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Decodes an image, scales it to the given size and encodes it in the given
+    format. JPEG images being scaled down are decoded at a reduced scale,
+    which is much faster than decoding them in full. Runs in a worker process,
+    so it is given the image file where possible rather than its data.
+
+    :param source:
+                The image data, or the image file to read it from.
+    :param size:
+                The (width, height) to scale the image to (its own size to only re-encode it).
+    :param format_string:
+                The PIL format to encode the image in.
+    :param quality:
+                The quality of JPEG encoding (1 to 95).
+    :return:
+                The encoded image, and its (width, height).
+    """
+    with PILImage.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        if image.size != size:
+            image.draft(image.mode, size)
+            if image.mode in ("1", "P"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            image = image.resize(size, PILImage.LANCZOS, reducing_gap=3.0)
+
+        if image.mode not in _SUPPORTED_MODES.get(format_string, (image.mode,)):
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        if format_string == "JPEG":
+            image.save(output, format=format_string, quality=quality)
+        else:
+            image.save(output, format=format_string)
+
+        return output.getvalue(), image.size
@@ -0,0 +1,381 @@
+from collections import Counter
+from typing import List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .._format import YOLOObject, YOLOObjectTable
+from ._LazyImage import read_image_size
+from ._parse_yolo_labels import parse_yolo_table, split_label_lines
+
+# How far box edges may extend beyond the image before being reported,
+# allowing for rounding of co-ordinates written at limited precision
+COORDINATE_TOLERANCE = 1e-6
+
+
+class ScanIssue(NamedTuple):
+    """
+    A problem found in a label file (or its image).
+    """
+    # The kind of problem (e.g. 'malformed_line')
+    kind: str
+
+    # The line of the label file it was found on (1-based), if any
+    line: Optional[int]
+
+    # A description of the problem
+    message: str
+
+
+class LabelFileScan(NamedTuple):
+    """
+    The result of checking a single label file.
+    """
+    # The label file
+    filename: str
+
+    # The number of lines in the file
+    num_lines: int
+
+    # The class index of each valid annotation
+    class_indices: np.ndarray
+
+    # The number of valid annotations which are polygons
+    num_polygons: int
+
+    # The number of bytes in the label file
+    num_bytes: int
+
+    # The (width, height) of the image, if its header was read
+    image_size: Optional[Tuple[int, int]]
+
+    # The problems found
+    issues: Tuple[ScanIssue, ...]
+
+
+def parse_lines_checked(
+        lines: Sequence[str],
+        use_polygon_format: bool
+) -> Tuple[YOLOObjectTable, List[int], List[ScanIssue]]:
+    """
+    Parses the lines of a label file, reporting malformed lines rather than
+    failing on the first. All lines are parsed in bulk unless one is malformed.
+
+    :param lines:
+                The lines of the label file.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :return:
+                The valid annotations, the line number of each, and the problems found.
+    """
+    try:
+        return parse_yolo_table(lines, use_polygon_format), list(range(1, len(lines) + 1)), []
+    except Exception:
+        pass
+
+    objects = []
+    line_numbers = []
+    issues = []
+    for line_number, line in enumerate(lines, 1):
+        try:
+            objects.append(YOLOObject.from_string(line, use_polygon_format=use_polygon_format))
+            line_numbers.append(line_number)
+        except Exception as e:
+            issues.append(ScanIssue("malformed_line", line_number, str(e)))
+
+    return YOLOObjectTable.from_objects(objects), line_numbers, issues
+
+
+def check_annotations(
+        table: YOLOObjectTable,
+        line_numbers: Sequence[int],
+        num_labels: Optional[int]
+) -> List[ScanIssue]:
+    """
+    Checks the class indices and co-ordinates of the annotations of a label file.
+
+    :param table:
+                The annotations.
+    :param line_numbers:
+                The line each annotation was read from.
+    :param num_labels:
+                The number of labels, or None to accept any non-negative class index.
+    :return:
+                The problems found.
+    """
+    issues = []
+    if len(table) == 0:
+        return issues
+
+    class_indices = table.class_indices
+    bad_index = (class_indices < 0) | (class_indices >= num_labels if num_labels is not None else False)
+    for row in np.flatnonzero(bad_index).tolist():
+        issues.append(ScanIssue(
+            "class_index_out_of_range",
+            line_numbers[row],
+            f"Class index {int(class_indices[row])} is out of range"
+            + (f" for {num_labels} labels" if num_labels is not None else "")
+        ))
+
+    # Boxes must have positive size and lie within the image
+    boxes = table.boxes
+    half_sizes = boxes[:, 2:] / 2
+    minimums = boxes[:, :2] - half_sizes
+    maximums = boxes[:, :2] + half_sizes
+    degenerate = np.any(boxes[:, 2:] <= 0, axis=1)
+    out_of_range = (
+        np.any(minimums < -COORDINATE_TOLERANCE, axis=1)
+        | np.any(maximums > 1 + COORDINATE_TOLERANCE, axis=1)
+        | ~np.all(np.isfinite(boxes), axis=1)
+    )
+
+    # Polygon vertices must lie within the image
+    if len(table.points) > 0:
+        bad_points = np.any(
+            (table.points < -COORDINATE_TOLERANCE)
+            | (table.points > 1 + COORDINATE_TOLERANCE)
+            | ~np.isfinite(table.points),
+            axis=1
+        )
+        rows = np.repeat(np.arange(len(table)), np.diff(table.point_offsets))
+        out_of_range[rows[bad_points]] = True
+
+    for row in np.flatnonzero(degenerate).tolist():
+        issues.append(ScanIssue("degenerate_box", line_numbers[row], "Width or height is not positive"))
+    for row in np.flatnonzero(out_of_range).tolist():
+        issues.append(ScanIssue(
+            "coordinate_out_of_range",
+            line_numbers[row],
+            "Co-ordinates lie outside the image (normalised to [0, 1])"
+        ))
+
+    return issues
+
+
+def scan_label_file(
+        filename: str,
+        use_polygon_format: bool = False,
+        num_labels: Optional[int] = None,
+        image_filename: Optional[str] = None,
+        read_image_header: bool = False
+) -> LabelFileScan:
+    """
+    Checks a label file without converting its annotations, optionally also
+    reading the header of its image. Problems are reported rather than raised.
+
+    :param filename:
+                The label file.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :param num_labels:
+                The number of labels, or None to accept any non-negative class index.
+    :param image_filename:
+                The located image of the label file, if images are being checked.
+    :param read_image_header:
+                Whether to read the dimensions of the image from its header.
+    :return:
+                The result of the check.
+    """
+    issues = []
+
+    try:
+        with open(filename, "rb") as file:
+            data = file.read()
+        lines = split_label_lines(data.decode())
+    except (OSError, UnicodeDecodeError) as e:
+        return LabelFileScan(
+            filename, 0, np.empty(0, dtype=np.int64), 0, 0, None,
+            (ScanIssue("unreadable_label_file", None, str(e)),)
+        )
+
+    table, line_numbers, parse_issues = parse_lines_checked(lines, use_polygon_format)
+    issues += parse_issues
+    issues += check_annotations(table, line_numbers, num_labels)
+
+    image_size = None
+    if image_filename is not None and read_image_header:
+        try:
+            image_size = read_image_size(image_filename)
+        except Exception as e:
+            issues.append(ScanIssue("unreadable_image", None, f"{image_filename}: {e}"))
+
+    return LabelFileScan(
+        filename,
+        len(lines),
+        np.asarray(table.class_indices),
+        int(np.count_nonzero(np.diff(table.point_offsets))),
+        len(data),
+        image_size,
+        tuple(issues)
+    )
+
+
+def scan_label_files(
+        jobs: Sequence[Tuple[str, Optional[str]]],
+        use_polygon_format: bool,
+        num_labels: Optional[int],
+        read_image_headers: bool
+) -> List[LabelFileScan]:
+    """
+    Checks a chunk of label files (so workers are handed files in batches).
+
+    :param jobs:
+                Each label file, with its located image if images are being checked.
+    :param use_polygon_format:
+                Whether to force polygon format or use auto-detection.
+    :param num_labels:
+                The number of labels, or None to accept any non-negative class index.
+    :param read_image_headers:
+                Whether to read the dimensions of the images from their headers.
+    :return:
+                The result of checking each label file.
+    """
+    return [
+        scan_label_file(filename, use_polygon_format, num_labels, image_filename, read_image_headers)
+        for filename, image_filename in jobs
+    ]
+
+
+class ScanReport:
+    """
+    Aggregates the results of checking the label files of a dataset.
+    """
+    def __init__(self, labels: Optional[Sequence[Optional[str]]] = None, max_issues: int = 1000):
+        # The labels, to name the classes in the histogram
+        self._labels: Optional[Sequence[Optional[str]]] = labels
+
+        # The maximum number of problems to list individually
+        self._max_issues: int = max_issues
+
+        self.num_label_files: int = 0
+        self.num_empty_label_files: int = 0
+        self.num_files_with_issues: int = 0
+        self.num_lines: int = 0
+        self.num_bytes: int = 0
+        self.num_objects: int = 0
+        self.num_polygons: int = 0
+        self.num_images_checked: int = 0
+        self.class_counts: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.issue_counts: Counter = Counter()
+        self.issues: List[dict] = []
+        self.image_sizes: Counter = Counter()
+
+        # The label files whose image couldn't be located, which haven't been added yet
+        self._missing_images: Set[str] = set()
+
+    def add_missing_image(self, filename: str, reason: Optional[str] = None):
+        """
+        Records that the image of a label file couldn't be located (before
+        the result of checking the label file is added).
+
+        :param filename:
+                    The label file.
+        :param reason:
+                    Why the images directory couldn't be worked out for the label
+                    file, or None if the image just isn't there.
+        """
+        self._missing_images.add(filename)
+        if reason is None:
+            self.add_issue(filename, ScanIssue("missing_image", None, "No image found for the label file"))
+        else:
+            self.add_issue(filename, ScanIssue("unlocatable_image", None, reason))
+
+    def add_issue(self, filename: str, issue: ScanIssue):
+        """
+        Records a problem with a label file.
+
+        :param filename:
+                    The label file.
+        :param issue:
+                    The problem.
+        """
+        self.issue_counts[issue.kind] += 1
+        if len(self.issues) < self._max_issues:
+            self.issues.append({"file": filename, "line": issue.line, "kind": issue.kind, "message": issue.message})
+
+    def add(self, scan: LabelFileScan, image_checked: bool):
+        """
+        Adds the result of checking a label file.
+
+        :param scan:
+                    The result.
+        :param image_checked:
+                    Whether images are being checked.
+        """
+        is_missing_image = scan.filename in self._missing_images
+        self._missing_images.discard(scan.filename)
+
+        self.num_label_files += 1
+        self.num_lines += scan.num_lines
+        self.num_bytes += scan.num_bytes
+        self.num_objects += len(scan.class_indices)
+        self.num_polygons += scan.num_polygons
+        if scan.num_lines == 0:
+            self.num_empty_label_files += 1
+        if image_checked and not is_missing_image:
+            self.num_images_checked += 1
+        if scan.image_size is not None:
+            self.image_sizes[scan.image_size] += 1
+
+        # Accumulate the class histogram, ignoring out-of-range (negative) indices
+        class_indices = scan.class_indices[scan.class_indices >= 0]
+        if len(class_indices) > 0:
+            counts = np.bincount(class_indices)
+            if len(counts) > len(self.class_counts):
+                self.class_counts = np.pad(self.class_counts, (0, len(counts) - len(self.class_counts)))
+            self.class_counts[:len(counts)] += counts
+
+        if len(scan.issues) > 0 or is_missing_image:
+            self.num_files_with_issues += 1
+            for issue in scan.issues:
+                self.add_issue(scan.filename, issue)
+
+    @property
+    def num_issues(self) -> int:
+        """
+        The total number of problems found.
+        """
+        return sum(self.issue_counts.values())
+
+    def get_class_name(self, class_index: int) -> str:
+        """
+        Gets the name of a class in the histogram.
+
+        :param class_index:
+                    The class index.
+        :return:
+                    Its label, or the index if it has none.
+        """
+        if self._labels is not None and class_index < len(self._labels) and self._labels[class_index] is not None:
+            return self._labels[class_index]
+        return str(class_index)
+
+    def to_json(self) -> dict:
+        """
+        Gets the report as JSON-serialisable data.
+
+        :return:
+                    The report.
+        """
+        return {
+            "label_files": self.num_label_files,
+            "empty_label_files": self.num_empty_label_files,
+            "label_files_with_issues": self.num_files_with_issues,
+            "lines": self.num_lines,
+            "label_bytes": self.num_bytes,
+            "objects": self.num_objects,
+            "bboxes": self.num_objects - self.num_polygons,
+            "polygons": self.num_polygons,
+            "images_checked": self.num_images_checked,
+            "image_sizes": {
+                f"{width}x{height}": count
+                for (width, height), count in self.image_sizes.most_common()
+            },
+            "class_histogram": {
+                self.get_class_name(class_index): count
+                for class_index, count in enumerate(self.class_counts.tolist())
+                if count > 0
+            },
+            "issue_counts": dict(self.issue_counts.most_common()),
+            "issues": self.issues,
+            "issues_truncated": self.num_issues > len(self.issues),
+        }
@@ -0,0 +1,96 @@
+import io
+import os
+import tarfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# The extension of the label entries in a shard
+LABELS_EXTENSION = ".txt"
+
+
+def format_shard_filename(prefix: str, index: int) -> str:
+    """
+    Formats the filename of a shard.
+
+    :param prefix:
+                The prefix of all shards in the set.
+    :param index:
+                The index of the shard in the set.
+    :return:
+                The shard filename.
+    """
+    return f"{prefix}-{index:06d}.tar"
+
+
+def add_shard_entry(shard: tarfile.TarFile, name: str, file: BinaryIO, size: int):
+    """
+    Adds a file entry to a shard. Entry metadata is fixed so that writing the
+    same data always produces the same shard.
+
+    :param shard:
+                The shard to add the entry to.
+    :param name:
+                The name of the entry.
+    :param file:
+                The file to read the entry's data from.
+    :param size:
+                The number of bytes to read from the file.
+    """
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    shard.addfile(info, file)
+
+
+def add_shard_bytes(shard: tarfile.TarFile, name: str, data: bytes):
+    """
+    Adds an in-memory file entry to a shard.
+
+    :param shard:
+                The shard to add the entry to.
+    :param name:
+                The name of the entry.
+    :param data:
+                The data of the entry.
+    """
+    add_shard_entry(shard, name, io.BytesIO(data), len(data))
+
+
+def iterate_shard(filename: str) -> Iterator[Tuple[str, Optional[str], Optional[bytes], Optional[bytes]]]:
+    """
+    Iterates through the samples in a shard, in a single sequential pass over the
+    file. Entries for the same sample (an image and its label entry) are stored
+    consecutively, and share the same name up to the extension.
+
+    :param filename:
+                The shard file.
+    :return:
+                An iterator of (key, image name, image data, label data) tuples. The
+                image name/data are None if the sample has no image entry, and the label
+                data is None if it has no label entry.
+    """
+    key = None
+    image_name, image_data, label_data = None, None, None
+
+    # Open in streaming mode so the shard is read strictly front-to-back
+    with tarfile.open(filename, "r|*") as shard:
+        for member in shard:
+            if not member.isfile():
+                continue
+
+            member_key, extension = os.path.splitext(member.name)
+
+            # Yield the previous sample once all of its entries have been read
+            if member_key != key:
+                if key is not None:
+                    yield key, image_name, image_data, label_data
+                key = member_key
+                image_name, image_data, label_data = None, None, None
+
+            data = shard.extractfile(member).read()
+            if extension == LABELS_EXTENSION:
+                label_data = data
+            else:
+                image_name, image_data = os.path.basename(member.name), data
+
+    if key is not None:
+        yield key, image_name, image_data, label_data
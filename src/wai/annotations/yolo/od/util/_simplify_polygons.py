@@ -0,0 +1,160 @@
+from typing import Optional
+
+import numpy as np
+
+from .._format import YOLOObjectTable
+
+# The fewest vertices a simplified polygon is left with
+MIN_POLYGON_VERTICES = 3
+
+
+def simplify_polygons(
+        table: YOLOObjectTable,
+        tolerance: float = 0.0,
+        max_vertices: Optional[int] = None
+) -> YOLOObjectTable:
+    """
+    Simplifies the polygons of a table of annotations with the Douglas-Peucker
+    algorithm, removing vertices which lie within a tolerance of the
+    simplified outline and/or keeping only the most significant vertices of
+    each polygon. The polygons of all annotations are simplified together, one
+    level of the algorithm's recursion at a time. The boxes are left as they
+    are, and polygons are never reduced below 3 vertices.
+
+    :param table:
+                The annotations.
+    :param tolerance:
+                The distance (in normalised co-ordinates) vertices may lie from
+                the simplified outline.
+    :param max_vertices:
+                The maximum number of vertices to keep per polygon, or None for no limit.
+    :return:
+                The annotations with simplified polygons.
+    """
+    if tolerance < 0:
+        raise ValueError(f"Simplification tolerance must be non-negative, got {tolerance}")
+    if max_vertices is not None and max_vertices < MIN_POLYGON_VERTICES:
+        raise ValueError(f"Maximum vertices must be at least {MIN_POLYGON_VERTICES}, got {max_vertices}")
+
+    point_counts = np.diff(table.point_offsets)
+    if not np.any(point_counts > MIN_POLYGON_VERTICES):
+        return table
+
+    significance = polygon_vertex_significance(table.points, table.point_offsets, tolerance)
+
+    # Rank the vertices of each polygon from most to least significant
+    # (ties are broken by position, as the sort is stable)
+    polygon_of_point = np.repeat(np.arange(len(table)), point_counts)
+    order = np.lexsort((-significance, polygon_of_point))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - table.point_offsets[:-1][polygon_of_point[order]]
+
+    keep = (significance > tolerance) | (rank < MIN_POLYGON_VERTICES)
+    if max_vertices is not None:
+        keep &= rank < max_vertices
+    if np.all(keep):
+        return table
+
+    point_offsets = np.zeros(len(table) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(polygon_of_point[keep], minlength=len(table)), out=point_offsets[1:])
+
+    return YOLOObjectTable(table.class_indices, table.boxes, point_offsets, table.points[keep])
+
+
+def polygon_vertex_significance(points: np.ndarray, point_offsets: np.ndarray, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Calculates the significance of each polygon vertex to the shape of its
+    polygon, as the distance at which Douglas-Peucker simplification would
+    remove it: the vertex's distance from the segment it splits, limited to
+    the significance of the vertex which split off that segment (so a vertex
+    is never more significant than the vertices it depends on). Removing the
+    vertices with significance at most a tolerance is the same as simplifying
+    with that tolerance.
+
+    Each polygon is treated as closed: the first vertex is always kept, and
+    the initial segment runs from it, around the polygon, back to it.
+
+    :param points:
+                The (M, 2) vertices of all polygons.
+    :param point_offsets:
+                The offsets of each polygon's vertices.
+    :param tolerance:
+                Segments whose vertices are all within this distance aren't
+                split further (their vertices are only known to be at most
+                this significant, and are given 0).
+    :return:
+                The (M,) significance of each vertex (infinite for the first
+                vertex of each polygon, and for polygons of 3 vertices or fewer).
+    """
+    point_counts = np.diff(point_offsets)
+    significance = np.zeros(len(points), dtype=np.float64)
+
+    # Close each polygon by repeating its first vertex after its last (so the
+    # vertices of the k-th polygon are shifted k places along in the closed buffer)
+    polygons = np.flatnonzero(point_counts > 0)
+    shifts = np.arange(len(polygons))
+    first_indices = point_offsets[:-1][polygons] + shifts
+    closing_indices = point_offsets[1:][polygons] + shifts
+    is_original = np.ones(len(points) + len(polygons), dtype=bool)
+    is_original[closing_indices] = False
+    xs = np.empty(len(is_original), dtype=np.float64)
+    ys = np.empty(len(is_original), dtype=np.float64)
+    xs[is_original], ys[is_original] = points[:, 0], points[:, 1]
+    xs[closing_indices], ys[closing_indices] = xs[first_indices], ys[first_indices]
+    to_original = np.full(len(is_original), -1, dtype=np.int64)
+    to_original[is_original] = np.arange(len(points))
+
+    # Small polygons are kept as they are
+    significance[np.repeat(point_counts <= MIN_POLYGON_VERTICES, point_counts)] = np.inf
+    significance[point_offsets[:-1][polygons]] = np.inf
+
+    # The segments still to split: their end-points (in the closed buffer) and the significance they inherit
+    large = point_counts[polygons] > MIN_POLYGON_VERTICES
+    starts = first_indices[large]
+    ends = closing_indices[large]
+    inherited = np.full(len(starts), np.inf)
+
+    while len(starts) > 0:
+        # Each vertex strictly inside a segment, and the segment it's inside
+        interior_counts = ends - starts - 1
+        segment_offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(interior_counts, out=segment_offsets[1:])
+        segments = np.repeat(np.arange(len(starts)), interior_counts)
+        indices = np.arange(segment_offsets[-1]) + np.repeat(starts + 1 - segment_offsets[:-1], interior_counts)
+
+        # Distance of each vertex from the line through its segment's end-points
+        # (or from the start, for segments whose end-points coincide, such as the initial ones)
+        direction_xs = xs[ends] - xs[starts]
+        direction_ys = ys[ends] - ys[starts]
+        lengths = np.hypot(direction_xs, direction_ys)
+        offset_xs = xs[indices] - np.repeat(xs[starts], interior_counts)
+        offset_ys = ys[indices] - np.repeat(ys[starts], interior_counts)
+        distances = np.abs(
+            np.repeat(direction_xs, interior_counts) * offset_ys
+            - np.repeat(direction_ys, interior_counts) * offset_xs
+        )
+        distances *= np.repeat(1 / np.where(lengths == 0, 1, lengths), interior_counts)
+        is_degenerate = np.repeat(lengths == 0, interior_counts)
+        if np.any(is_degenerate):
+            distances[is_degenerate] = np.hypot(offset_xs[is_degenerate], offset_ys[is_degenerate])
+
+        # The furthest vertex of each segment (the first, if several are equally far)
+        maximums = np.maximum.reduceat(distances, segment_offsets[:-1])
+        furthest = np.flatnonzero(distances == np.repeat(maximums, interior_counts))
+        furthest_segments = segments[furthest]
+        furthest = furthest[np.concatenate(([True], furthest_segments[1:] != furthest_segments[:-1]))]
+
+        # Split the segments whose furthest vertex is beyond the tolerance at it
+        split = maximums > tolerance
+        splits = indices[furthest[split]]
+        split_significance = np.minimum(maximums[split], inherited[split])
+        significance[to_original[splits]] = split_significance
+
+        new_starts = np.concatenate((starts[split], splits))
+        new_ends = np.concatenate((splits, ends[split]))
+        has_interior = new_ends - new_starts > 1
+        starts = new_starts[has_interior]
+        ends = new_ends[has_interior]
+        inherited = np.tile(split_significance, 2)[has_interior]
+
+    return significance